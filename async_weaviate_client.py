@@ -0,0 +1,587 @@
+"""
+Async Weaviate Cloud Client
+
+This module provides an asyncio counterpart to WeaviateCloudClient. It talks to the
+Weaviate REST and GraphQL APIs with non-blocking HTTP (aiohttp), so hundreds of
+queries can be in flight from one process without a thread per query. A per-client
+semaphore bounds the number of concurrent requests.
+
+Usage:
+    import asyncio
+    from async_weaviate_client import AsyncWeaviateCloudClient
+
+    async def main():
+        async with AsyncWeaviateCloudClient(max_concurrency=200) as client:
+            results = await client.gather_search(
+                "Article", ["vector databases", "language models"], properties=["title"]
+            )
+            for hits in results:
+                print(hits)
+
+    asyncio.run(main())
+"""
+
+import os
+import asyncio
+import random
+import uuid
+import logging
+import aiohttp
+from itertools import islice
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+from dotenv import load_dotenv
+
+from weaviate_client_v4 import (
+    build_class_definition,
+    build_get_query,
+    build_near_text_query,
+    build_hybrid_query,
+    build_near_vector_query,
+    build_batch_object,
+    is_transient_object_error,
+    parse_batch_results,
+)
+from weaviate_transport import RETRY_STATUS_CODES
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncWeaviateCloudClient:
+    """
+    Asyncio client for Weaviate Cloud with the same method surface as WeaviateCloudClient.
+    """
+
+    def __init__(self,
+                 url: Optional[str] = None,
+                 api_key: Optional[str] = None,
+                 openai_api_key: Optional[str] = None,
+                 openrouter_api_key: Optional[str] = None,
+                 max_concurrency: int = 100,
+                 pool_size: int = 100,
+                 timeout: float = 30.0,
+                 max_retries: int = 3,
+                 backoff_factor: float = 0.5,
+                 max_backoff: float = 10.0):
+        """
+        Initialize the async Weaviate Cloud client.
+
+        Args:
+            url: The URL of the Weaviate Cloud instance. If None, it will be loaded from the environment.
+            api_key: The API key for the Weaviate Cloud instance. If None, it will be loaded from the environment.
+            openai_api_key: The OpenAI API key for generative search. If None, it will be loaded from the environment.
+            openrouter_api_key: The OpenRouter API key for generative search. If None, it will be loaded from the environment.
+            max_concurrency: Maximum number of requests in flight for this client.
+            pool_size: Maximum number of keep-alive connections to the instance.
+            timeout: Total timeout in seconds for a single request.
+            max_retries: Number of retries for 429/5xx responses and connection errors.
+            backoff_factor: Base delay in seconds for the exponential backoff.
+            max_backoff: Upper bound in seconds for a single backoff delay.
+        """
+        # Load environment variables
+        load_dotenv()
+
+        self.url = url or os.getenv("WEAVIATE_URL")
+        self.api_key = api_key or os.getenv("WEAVIATE_API_KEY")
+        self.openai_api_key = openai_api_key or os.getenv("OPENAI_API_KEY")
+        self.openrouter_api_key = openrouter_api_key or os.getenv("OPENROUTER_API_KEY")
+
+        # Validate required parameters
+        if not self.url:
+            raise ValueError("Weaviate URL is required. Set it in the environment or pass it to the constructor.")
+        if not self.api_key:
+            raise ValueError("Weaviate API key is required. Set it in the environment or pass it to the constructor.")
+
+        self.base_url = self.url if self.url.startswith(("http://", "https://")) else f"https://{self.url}"
+        self.max_concurrency = max_concurrency
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+
+        self.headers = {"Authorization": f"Bearer {self.api_key}"}
+        if self.openai_api_key:
+            self.headers["X-OpenAI-Api-Key"] = self.openai_api_key
+        elif self.openrouter_api_key:
+            self.headers["X-OpenAI-Api-Key"] = self.openrouter_api_key
+
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        logger.info(f"Initialized async Weaviate Cloud client for URL: {self.url}")
+
+    async def __aenter__(self) -> "AsyncWeaviateCloudClient":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def connect(self) -> bool:
+        """
+        Open the HTTP session used by all requests.
+
+        Returns:
+            True once the session is ready.
+        """
+        if self.session is None or self.session.closed:
+            # Created here rather than in __init__ so they bind to the running event loop
+            self.session = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            logger.info(f"Connected to Weaviate Cloud at {self.url}")
+        return True
+
+    async def close(self) -> None:
+        """
+        Close the HTTP session.
+        """
+        if self.session and not self.session.closed:
+            await self.session.close()
+            logger.info("Closed connection to Weaviate Cloud")
+
+    async def _request(self, method: str, path: str, json: Any = None) -> Tuple[int, Any]:
+        """
+        Send a request under the concurrency limit, retrying throttled and transient failures.
+
+        Returns:
+            Tuple of the status code and the decoded JSON body (None if the body is empty).
+        """
+        if self.session is None or self.session.closed:
+            await self.connect()
+
+        url = f"{self.base_url}{path}"
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                async with self._semaphore:
+                    async with self.session.request(method, url, json=json) as response:
+                        if response.status not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                            if response.status >= 400:
+                                text = await response.text()
+                                raise aiohttp.ClientResponseError(
+                                    response.request_info,
+                                    response.history,
+                                    status=response.status,
+                                    message=text
+                                )
+                            body = await response.read()
+                            return response.status, (await response.json(content_type=None) if body else None)
+                        retry_after = response.headers.get("Retry-After")
+                        status = response.status
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(f"{method} {path} failed: {e!r}. Retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            delay = self._backoff(attempt, retry_after)
+            logger.warning(f"{method} {path} returned {status}. Retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+        # Not reached: the last attempt always returns or raises
+        raise RuntimeError(f"{method} {path} exhausted all retries")
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        Compute the delay before the next attempt using full jitter.
+        """
+        if retry_after:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** attempt))
+
+    async def get_meta_info(self) -> Dict[str, Any]:
+        """
+        Get meta information about the Weaviate Cloud instance.
+
+        Returns:
+            Dict containing meta information.
+        """
+        try:
+            _, meta_info = await self._request("GET", "/v1/meta")
+            return meta_info
+        except Exception as e:
+            logger.error(f"Failed to get meta information: {e}", exc_info=True)
+            raise
+
+    async def list_collections(self) -> List[str]:
+        """
+        List all collections in the Weaviate Cloud instance.
+
+        Returns:
+            List of collection names.
+        """
+        try:
+            _, schema = await self._request("GET", "/v1/schema")
+            return [c["class"] for c in schema.get("classes", [])]
+        except Exception as e:
+            logger.error(f"Failed to list collections: {e}", exc_info=True)
+            raise
+
+    async def create_collection(self, name: str, properties: List[Dict[str, Any]]) -> bool:
+        """
+        Create a new collection in the Weaviate Cloud instance.
+
+        Args:
+            name: The name of the collection.
+            properties: List of property definitions.
+
+        Returns:
+            True if the collection was created successfully.
+        """
+        try:
+            try:
+                await self._request("POST", "/v1/schema", json=build_class_definition(name, properties))
+            except aiohttp.ClientResponseError as e:
+                if e.status != 422:
+                    raise
+                # Try with a simpler schema, as WeaviateCloudClient does
+                logger.info(f"Trying with simpler schema for {name}")
+                await self._request("POST", "/v1/schema", json={"class": name, "vectorizer": "none"})
+
+            logger.info(f"Created collection {name} using REST API")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to create collection {name}: {e}", exc_info=True)
+            raise
+
+    async def delete_collection(self, name: str) -> bool:
+        """
+        Delete a collection from the Weaviate Cloud instance.
+
+        Args:
+            name: The name of the collection.
+
+        Returns:
+            True if the collection was deleted successfully.
+        """
+        try:
+            await self._request("DELETE", f"/v1/schema/{name}")
+            logger.info(f"Deleted collection: {name}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to delete collection {name}: {e}", exc_info=True)
+            raise
+
+    async def insert_object(self, collection_name: str, data: Dict[str, Any]) -> str:
+        """
+        Insert an object into a collection.
+
+        Args:
+            collection_name: The name of the collection.
+            data: The data to insert.
+
+        Returns:
+            The ID of the inserted object.
+        """
+        try:
+            # A client-generated ID keeps retries from creating duplicates
+            _, result = await self._request(
+                "POST",
+                "/v1/objects",
+                json={"class": collection_name, "id": str(uuid.uuid4()), "properties": data}
+            )
+            object_id = result.get("id")
+            logger.info(f"Inserted object into {collection_name} with ID: {object_id}")
+            return object_id
+        except Exception as e:
+            logger.error(f"Failed to insert object into {collection_name}: {e}", exc_info=True)
+            raise
+
+    async def insert_objects_batch(self,
+                                   collection_name: str,
+                                   objects: Iterable[Dict[str, Any]],
+                                   batch_size: int = 100,
+                                   workers: int = 4,
+                                   max_retries: int = 3) -> Dict[str, Any]:
+        """
+        Insert many objects into a collection using the REST batch endpoint.
+
+        See WeaviateCloudClient.insert_objects_batch for the accepted object formats.
+
+        Args:
+            collection_name: The name of the collection.
+            objects: Iterable of objects to insert.
+            batch_size: Maximum number of objects per batch request.
+            workers: Maximum number of batch requests in flight.
+            max_retries: Number of times an object that failed with a transient error is retried.
+
+        Returns:
+            Dict with the IDs of the inserted objects ("ids") and a list of failures ("errors").
+        """
+        if batch_size < 1 or workers < 1:
+            raise ValueError("batch_size and workers must be at least 1.")
+
+        ids: List[str] = []
+        errors: List[Dict[str, str]] = []
+        iterator = iter(objects)
+        exhausted = False
+        pending = set()
+
+        while True:
+            while not exhausted and len(pending) < workers:
+                chunk = [build_batch_object(collection_name, obj) for obj in islice(iterator, batch_size)]
+                if not chunk:
+                    exhausted = True
+                    break
+                pending.add(asyncio.ensure_future(self._send_batch(chunk, max_retries)))
+
+            if not pending:
+                break
+
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                batch_ids, batch_errors = task.result()
+                ids.extend(batch_ids)
+                errors.extend(batch_errors)
+
+        logger.info(f"Batch inserted {len(ids)} objects into {collection_name} ({len(errors)} failed)")
+        return {"ids": ids, "errors": errors}
+
+    async def _send_batch(self, batch: List[Dict[str, Any]], max_retries: int) -> Tuple[List[str], List[Dict[str, str]]]:
+        """
+        Send one batch to /v1/batch/objects, retrying the objects that failed transiently.
+
+        A failed request is not retried here, since _request already retries throttled
+        and 5xx responses.
+        """
+        ids: List[str] = []
+        failures: Dict[str, str] = {}
+        remaining = batch
+
+        for attempt in range(max_retries + 1):
+            if attempt:
+                await asyncio.sleep(0.5 * 2 ** (attempt - 1))
+
+            try:
+                _, results = await self._request("POST", "/v1/batch/objects", json={"objects": remaining})
+                inserted, object_failures = parse_batch_results(remaining, results)
+            except Exception as e:
+                logger.error(f"Batch request with {len(remaining)} objects failed: {e}")
+                failures.update({obj["id"]: str(e) for obj in remaining})
+                break
+
+            ids.extend(inserted)
+            retryable = {object_id for object_id, error in object_failures.items()
+                         if attempt < max_retries and is_transient_object_error(error)}
+            failures.update({object_id: error for object_id, error in object_failures.items()
+                             if object_id not in retryable})
+            remaining = [obj for obj in remaining if obj["id"] in retryable]
+            if not remaining:
+                break
+            logger.warning(f"{len(remaining)} objects failed transiently in batch "
+                           f"(attempt {attempt + 1}/{max_retries + 1})")
+
+        return ids, [{"id": object_id, "error": error} for object_id, error in failures.items()]
+
+    async def query_objects(self,
+                            collection_name: str,
+                            properties: List[str] = None,
+                            limit: int = 10,
+                            where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Query objects from a collection.
+
+        Args:
+            collection_name: The name of the collection.
+            properties: List of properties to return. If None, all properties are returned.
+            limit: Maximum number of objects to return.
+            where: Filter on properties; see metadata_filter for the supported operators.
+
+        Returns:
+            List of objects.
+        """
+        try:
+            query = build_get_query(collection_name, properties, limit, where)
+            _, result = await self._request("POST", "/v1/graphql", json={"query": query})
+
+            objects = result.get("data", {}).get("Get", {}).get(collection_name, [])
+            logger.info(f"Retrieved {len(objects)} objects from {collection_name}")
+            return objects
+        except Exception as e:
+            logger.error(f"Failed to query objects from {collection_name}: {e}", exc_info=True)
+            raise
+
+    async def search_objects(self,
+                             collection_name: str,
+                             query: str,
+                             properties: List[str] = None,
+                             limit: int = 10,
+                             where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Search objects in a collection using a text query.
+
+        Args:
+            collection_name: The name of the collection.
+            query: The search query.
+            properties: List of properties to return. The ID and distance are always
+                returned under "_additional".
+            limit: Maximum number of objects to return.
+            where: Filter on properties, applied before the vector search.
+
+        Returns:
+            List of objects.
+        """
+        try:
+            graphql_query = build_near_text_query(collection_name, query, properties, limit, where)
+            _, result = await self._request("POST", "/v1/graphql", json={"query": graphql_query})
+
+            objects = result.get("data", {}).get("Get", {}).get(collection_name, [])
+            logger.info(f"Search for '{query}' returned {len(objects)} objects from {collection_name}")
+            return objects
+        except Exception as e:
+            logger.error(f"Failed to search objects in {collection_name}: {e}", exc_info=True)
+            raise
+
+    async def search_by_vector(self,
+                               collection_name: str,
+                               vector: Any,
+                               properties: List[str] = None,
+                               limit: int = 10,
+                               where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Search objects in a collection that are nearest to a query vector.
+
+        Args:
+            collection_name: The name of the collection.
+            vector: The query vector, as a list or a NumPy array.
+            properties: List of properties to return. The ID, distance and certainty are
+                always returned under "_additional".
+            limit: Maximum number of objects to return.
+            where: Filter on properties, applied before the vector search.
+
+        Returns:
+            List of objects, nearest first.
+        """
+        try:
+            graphql_query = build_near_vector_query(collection_name, [vector], properties, limit, aliased=False, where=where)
+            _, result = await self._request("POST", "/v1/graphql", json={"query": graphql_query})
+
+            objects = result.get("data", {}).get("Get", {}).get(collection_name, [])
+            logger.info(f"Vector search returned {len(objects)} objects from {collection_name}")
+            return objects
+        except Exception as e:
+            logger.error(f"Failed to search objects by vector in {collection_name}: {e}", exc_info=True)
+            raise
+
+    async def hybrid_search(self,
+                            collection_name: str,
+                            query: str,
+                            properties: List[str] = None,
+                            limit: int = 10,
+                            alpha: float = 0.5,
+                            fusion: str = "rrf",
+                            where: Optional[Dict[str, Any]] = None,
+                            vector: Optional[Any] = None) -> List[Dict[str, Any]]:
+        """
+        Search objects by combining a vector search with a BM25 keyword search.
+
+        Args:
+            collection_name: The name of the collection.
+            query: The search query.
+            properties: List of properties to return. The ID and fused score are always
+                returned under "_additional".
+            limit: Maximum number of objects to return.
+            alpha: Weight of the vector search, from 0 (keyword only) to 1 (vector only).
+            fusion: "rrf" (ranked fusion) or "relative_score" (relative score fusion).
+            where: Filter on properties, applied to both searches.
+            vector: Query vector, for collections without a vectorizer.
+
+        Returns:
+            List of objects, best first.
+        """
+        try:
+            graphql_query = build_hybrid_query(collection_name, query, properties, limit, alpha, fusion, where, vector)
+            _, result = await self._request("POST", "/v1/graphql", json={"query": graphql_query})
+
+            objects = result.get("data", {}).get("Get", {}).get(collection_name, [])
+            logger.info(f"Hybrid search for '{query}' returned {len(objects)} objects from {collection_name}")
+            return objects
+        except Exception as e:
+            logger.error(f"Failed to run hybrid search in {collection_name}: {e}", exc_info=True)
+            raise
+
+    async def search_by_vectors(self,
+                                collection_name: str,
+                                vectors: Iterable[Any],
+                                properties: List[str] = None,
+                                limit: int = 10,
+                                queries_per_request: int = 50,
+                                where: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Run many vector searches as aliased sub-queries of a few GraphQL requests.
+
+        The requests for each group of queries_per_request vectors are sent concurrently.
+
+        Args:
+            collection_name: The name of the collection.
+            vectors: The query vectors, as lists or as the rows of a 2-D NumPy array.
+            properties: List of properties to return.
+            limit: Maximum number of objects to return per query.
+            queries_per_request: Maximum number of sub-queries per GraphQL request.
+            where: Filter on properties, applied to every query.
+
+        Returns:
+            One list of objects per query vector, in the same order as the vectors.
+
+        Raises:
+            RuntimeError: If a request returns GraphQL errors and no results, e.g. for an
+                unknown collection or an invalid filter.
+        """
+        if queries_per_request < 1:
+            raise ValueError("queries_per_request must be at least 1.")
+
+        async def run_chunk(chunk: List[Any]) -> List[List[Dict[str, Any]]]:
+            graphql_query = build_near_vector_query(collection_name, chunk, properties, limit, where=where)
+            _, result = await self._request("POST", "/v1/graphql", json={"query": graphql_query})
+            data = (result.get("data") or {}).get("Get")
+            if result.get("errors"):
+                if data is None or all(data.get(f"q{i}") is None for i in range(len(chunk))):
+                    raise RuntimeError(f"Vector search on {collection_name} failed: {result['errors']}")
+                logger.error(f"Vector search on {collection_name} returned errors: {result['errors']}")
+            data = data or {}
+            return [data.get(f"q{i}") or [] for i in range(len(chunk))]
+
+        try:
+            vectors = list(vectors)
+            chunks = [vectors[i:i + queries_per_request] for i in range(0, len(vectors), queries_per_request)]
+            chunk_results = await asyncio.gather(*(run_chunk(chunk) for chunk in chunks))
+            results = [objects for chunk_result in chunk_results for objects in chunk_result]
+            logger.info(f"Ran {len(results)} vector searches on {collection_name}")
+            return results
+        except Exception as e:
+            logger.error(f"Failed to search objects by vectors in {collection_name}: {e}", exc_info=True)
+            raise
+
+    async def gather_search(self,
+                            collection_name: str,
+                            queries: List[str],
+                            properties: List[str] = None,
+                            limit: int = 10,
+                            return_exceptions: bool = False) -> List[Any]:
+        """
+        Run many searches concurrently, bounded by the client's concurrency limit.
+
+        Args:
+            collection_name: The name of the collection.
+            queries: The search queries.
+            properties: List of properties to return. If None, all properties are returned.
+            limit: Maximum number of objects to return per query.
+            return_exceptions: If True, a failed search yields its exception in place of
+                its results instead of failing the whole call.
+
+        Returns:
+            One list of objects per query, in the same order as the queries.
+        """
+        return await asyncio.gather(
+            *(self.search_objects(collection_name, query, properties, limit) for query in queries),
+            return_exceptions=return_exceptions
+        )
@@ -0,0 +1,541 @@
+"""
+Benchmark Suite
+
+This module measures the throughput and latency of the vector database code paths in
+this repository, so a change can be checked for regressions before it is released:
+
+    weaviate  WeaviateCloudClient against a MockWeaviateServer with injected latency
+    federated FederatedWeaviateClient over --shards mock servers, waiting for every
+              shard, hedging stragglers, or returning at a quorum of all shards but one
+    local     LocalVectorStore on a temporary directory, including BM25 keyword and
+              hybrid search
+    faiss     the FAISS notebook search path (IndexFlatIP)
+    chroma    the Chroma notebook search path (an in-memory chromadb collection)
+    quantized LocalCollection with flat, SQ8 and PQ indexes, reporting recall@k against
+              exact search and the index memory per vector, to choose compression settings
+
+Each workload runs at every combination of data size and concurrency. Results are
+written as JSON with throughput and p50/p95/p99 latency per workload, and two result
+files can be compared to show what changed between releases.
+
+The Weaviate workloads do not call connect(), since the mock server has no gRPC port.
+The transport manager keeps the SDK paths marked down, so every call goes over REST.
+
+Usage:
+    python benchmark_suite.py --sizes 1000,10000 --concurrency 1,8,32 --output bench.json
+    python benchmark_suite.py --output new.json --compare bench.json
+    python benchmark_suite.py --backends federated --shards 4 --jitter 0.05 --concurrency 8
+    python benchmark_suite.py --backends quantized --sizes 100000 --pq-code-sizes 96,48,24 --rerank 4
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import platform
+import argparse
+import tempfile
+import uuid
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("weaviate", "federated", "local", "faiss", "chroma", "quantized")
+
+WORDS = ("vector", "database", "search", "embedding", "model", "language", "index", "query",
+         "cloud", "cluster", "semantic", "retrieval", "neural", "network", "latency", "storage")
+
+
+def summarize(latencies: List[float], duration: float, errors: int) -> Dict[str, Any]:
+    """
+    Summarize the latencies of one workload run.
+
+    Args:
+        latencies: Latency of each successful operation, in seconds.
+        duration: Wall-clock time of the whole run, in seconds.
+        errors: Number of operations that raised.
+
+    Returns:
+        Dict with the operation counts, throughput in operations per second, and latency
+        percentiles in milliseconds.
+    """
+    summary: Dict[str, Any] = {
+        "ops": len(latencies),
+        "errors": errors,
+        "duration_s": round(duration, 6),
+        "throughput_ops_s": round(len(latencies) / duration, 3) if duration else 0.0
+    }
+    if latencies:
+        ms = np.asarray(latencies) * 1000
+        summary["latency_ms"] = {
+            "mean": round(float(ms.mean()), 4),
+            "p50": round(float(np.percentile(ms, 50)), 4),
+            "p95": round(float(np.percentile(ms, 95)), 4),
+            "p99": round(float(np.percentile(ms, 99)), 4),
+            "max": round(float(ms.max()), 4)
+        }
+    return summary
+
+
+def run_workload(operation: Callable[[int], Any], ops: int, concurrency: int) -> Dict[str, Any]:
+    """
+    Call operation(i) for i in range(ops) with `concurrency` calls in flight, timing each call.
+    """
+    def timed(i: int) -> Optional[float]:
+        start = time.perf_counter()
+        try:
+            operation(i)
+        except Exception as e:
+            logger.debug(f"Operation {i} failed: {e}")
+            return None
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    if concurrency == 1:
+        timings = [timed(i) for i in range(ops)]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            timings = list(executor.map(timed, range(ops)))
+    duration = time.perf_counter() - start
+
+    latencies = [t for t in timings if t is not None]
+    return summarize(latencies, duration, len(timings) - len(latencies))
+
+
+def make_dataset(size: int, dimensions: int, seed: int = 0) -> Dict[str, Any]:
+    """
+    Build a synthetic collection of articles with normalized random vectors.
+    """
+    rng = random.Random(seed)
+    vectors = np.random.default_rng(seed).standard_normal((size, dimensions)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    articles = [
+        {
+            "title": f"Article {i}",
+            "content": " ".join(rng.choice(WORDS) for _ in range(20)),
+            "category": rng.choice(("tech", "science", "business"))
+        }
+        for i in range(size)
+    ]
+    return {"articles": articles, "vectors": vectors}
+
+
+def make_queries(count: int, dimensions: int, seed: int = 1) -> Dict[str, Any]:
+    """
+    Build query texts and normalized query vectors.
+    """
+    rng = random.Random(seed)
+    vectors = np.random.default_rng(seed).standard_normal((count, dimensions)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return {"texts": [" ".join(rng.sample(WORDS, 3)) for _ in range(count)], "vectors": vectors}
+
+
+def bench_weaviate(args: argparse.Namespace, size: int, dataset: Dict[str, Any], queries: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Drive WeaviateCloudClient through insert, query and search workloads against a mock server.
+    """
+    from mock_weaviate_server import MockWeaviateServer
+    from weaviate_client_v4 import WeaviateCloudClient
+
+    results = []
+    articles, vectors = dataset["articles"], dataset["vectors"]
+    with MockWeaviateServer(latency=args.latency, jitter=args.jitter) as server:
+        client = WeaviateCloudClient(url=server.url, api_key="benchmark", pool_size=max(args.concurrency))
+        try:
+            for concurrency in args.concurrency:
+                name = f"Bench{size}c{concurrency}"
+                client.create_collection(name, [{"name": "title"}, {"name": "content"}, {"name": "category"}])
+
+                batch_size = args.batch_size
+                chunks = [
+                    [{"properties": articles[i], "vector": vectors[i]} for i in range(start, min(start + batch_size, size))]
+                    for start in range(0, size, batch_size)
+                ]
+                result = run_workload(
+                    lambda i: client.insert_objects_batch(name, chunks[i], batch_size=batch_size, workers=1),
+                    len(chunks), concurrency
+                )
+                result["objects_per_s"] = round(size / result["duration_s"], 3) if result["duration_s"] else 0.0
+                results.append({"workload": "batch_insert", "concurrency": concurrency, **result})
+
+                workloads = {
+                    "insert": lambda i: client.insert_object(name, articles[i % size]),
+                    "query": lambda i: client.query_objects(name, ["title", "category"], limit=args.k),
+                    "search": lambda i: client.search_objects(name, queries["texts"][i % len(queries["texts"])],
+                                                              ["title"], limit=args.k),
+                    "vector_search": lambda i: client.search_by_vector(name, queries["vectors"][i % len(queries["vectors"])],
+                                                                       ["title"], limit=args.k),
+                    "hybrid_search": lambda i: client.hybrid_search(name, queries["texts"][i % len(queries["texts"])],
+                                                                    ["title"], limit=args.k,
+                                                                    vector=queries["vectors"][i % len(queries["vectors"])])
+                }
+                for workload, operation in workloads.items():
+                    results.append({"workload": workload, "concurrency": concurrency,
+                                    **run_workload(operation, args.ops, concurrency)})
+                client.delete_collection(name)
+        finally:
+            client.close()
+    return results
+
+
+def bench_federated(args: argparse.Namespace, size: int, dataset: Dict[str, Any], queries: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Compare scatter-gather vector search over several mock shards: waiting for every
+    shard, hedging stragglers, and returning at a quorum of all shards but one.
+
+    The mock shards share this process's CPU, so --latency and --jitter should dominate
+    the per-request work for the comparison to reflect separate clusters.
+    """
+    from contextlib import ExitStack
+    from mock_weaviate_server import MockWeaviateServer
+    from weaviate_client_v4 import WeaviateCloudClient
+    from federated_client import FederatedWeaviateClient
+
+    results = []
+    articles, vectors = dataset["articles"], dataset["vectors"]
+    with ExitStack() as stack:
+        servers = [stack.enter_context(MockWeaviateServer(latency=args.latency, jitter=args.jitter))
+                   for _ in range(args.shards)]
+        clients = {f"shard{i}": WeaviateCloudClient(url=server.url, api_key="benchmark",
+                                                    pool_size=4 * max(args.concurrency))
+                   for i, server in enumerate(servers)}
+        for i, client in enumerate(clients.values()):
+            client.create_collection("Bench", [{"name": "title"}, {"name": "content"}, {"name": "category"}])
+            client.insert_objects_batch("Bench", [{"properties": articles[j], "vector": vectors[j]}
+                                                  for j in range(i, size, args.shards)],
+                                        batch_size=args.batch_size)
+
+        variants = {
+            "scatter": FederatedWeaviateClient(clients, timeout=10, max_hedges=0),
+            "hedged": FederatedWeaviateClient(clients, timeout=10, max_hedges=1),
+            "quorum": FederatedWeaviateClient(clients, timeout=10, quorum=max(1, args.shards - 1), max_hedges=0)
+        }
+        try:
+            for concurrency in args.concurrency:
+                for variant, federated in variants.items():
+                    operation = lambda i: federated.search_by_vector(
+                        "Bench", queries["vectors"][i % len(queries["vectors"])], ["title"], limit=args.k)
+                    results.append({"workload": f"{variant}_search", "concurrency": concurrency,
+                                    **run_workload(operation, args.ops, concurrency)})
+        finally:
+            # The variants share the shard clients; closing a client twice is harmless
+            for federated in variants.values():
+                federated.close()
+    return results
+
+
+def bench_local(args: argparse.Namespace, size: int, dataset: Dict[str, Any], queries: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Drive LocalVectorStore through the same workloads as the Weaviate client.
+    """
+    from local_vector_store import LocalVectorStore
+
+    results = []
+    articles, vectors = dataset["articles"], dataset["vectors"]
+    with tempfile.TemporaryDirectory() as path:
+        store = LocalVectorStore(path)
+        store.connect()
+        for concurrency in args.concurrency:
+            name = f"Bench{size}c{concurrency}"
+            store.create_collection(name, [{"name": "title"}, {"name": "content"}, {"name": "category"}])
+
+            start = time.perf_counter()
+            store.insert_objects_batch(
+                name, ({"properties": articles[i], "vector": vectors[i]} for i in range(size)), batch_size=args.batch_size
+            )
+            duration = time.perf_counter() - start
+            result = summarize([duration], duration, 0)
+            result["objects_per_s"] = round(size / duration, 3)
+            results.append({"workload": "batch_insert", "concurrency": 1, **result})
+
+            # The keyword index is built on the first hybrid search; time that separately
+            start = time.perf_counter()
+            store.hybrid_search(name, queries["texts"][0], limit=1, alpha=0.0)
+            duration = time.perf_counter() - start
+            results.append({"workload": "keyword_index", "concurrency": 1, **summarize([duration], duration, 0)})
+
+            workloads = {
+                "query": lambda i: store.query_objects(name, ["title", "category"], limit=args.k),
+                "vector_search": lambda i: store.search_by_vector(name, queries["vectors"][i % len(queries["vectors"])],
+                                                                  ["title"], limit=args.k),
+                "keyword_search": lambda i: store.hybrid_search(name, queries["texts"][i % len(queries["texts"])],
+                                                                ["title"], limit=args.k, alpha=0.0),
+                "hybrid_search": lambda i: store.hybrid_search(name, queries["texts"][i % len(queries["texts"])],
+                                                               ["title"], limit=args.k,
+                                                               vector=queries["vectors"][i % len(queries["vectors"])])
+            }
+            for workload, operation in workloads.items():
+                results.append({"workload": workload, "concurrency": concurrency,
+                                **run_workload(operation, args.ops, concurrency)})
+            store.delete_collection(name)
+        store.close()
+    return results
+
+
+def bench_faiss(args: argparse.Namespace, size: int, dataset: Dict[str, Any], queries: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Time the FAISS notebook path: IndexFlatIP over normalized vectors, one query at a time.
+    """
+    import faiss
+
+    start = time.perf_counter()
+    index = faiss.IndexFlatIP(dataset["vectors"].shape[1])
+    index.add(dataset["vectors"])
+    duration = time.perf_counter() - start
+
+    build = summarize([duration], duration, 0)
+    build["objects_per_s"] = round(size / duration, 3) if duration else 0.0
+    results = [{"workload": "build_index", "concurrency": 1, **build}]
+
+    query_vectors = queries["vectors"]
+    for concurrency in args.concurrency:
+        operation = lambda i: index.search(query_vectors[i % len(query_vectors)].reshape(1, -1), args.k)
+        results.append({"workload": "search", "concurrency": concurrency,
+                        **run_workload(operation, args.ops, concurrency)})
+    return results
+
+
+def bench_chroma(args: argparse.Namespace, size: int, dataset: Dict[str, Any], queries: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Time the Chroma notebook path: an in-memory collection queried by embedding.
+    """
+    import chromadb
+
+    client = chromadb.Client()
+    collection = client.create_collection(f"bench{size}", metadata={"hnsw:space": "cosine"})
+
+    start = time.perf_counter()
+    # Chroma limits the size of a single add, so load in batches
+    for offset in range(0, size, 5000):
+        end = min(offset + 5000, size)
+        collection.add(
+            ids=[str(i) for i in range(offset, end)],
+            embeddings=dataset["vectors"][offset:end].tolist(),
+            documents=[article["content"] for article in dataset["articles"][offset:end]],
+            metadatas=[{"category": article["category"]} for article in dataset["articles"][offset:end]]
+        )
+    duration = time.perf_counter() - start
+
+    build = summarize([duration], duration, 0)
+    build["objects_per_s"] = round(size / duration, 3) if duration else 0.0
+    results = [{"workload": "build_index", "concurrency": 1, **build}]
+
+    query_vectors = queries["vectors"]
+    for concurrency in args.concurrency:
+        operation = lambda i: collection.query(query_embeddings=[query_vectors[i % len(query_vectors)].tolist()],
+                                               n_results=args.k)
+        results.append({"workload": "search", "concurrency": concurrency,
+                        **run_workload(operation, args.ops, concurrency)})
+    client.delete_collection(f"bench{size}")
+    return results
+
+
+def bench_quantized(args: argparse.Namespace, size: int, dataset: Dict[str, Any], queries: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Measure recall@k, index memory and search latency of the flat, SQ8 and PQ index types.
+
+    Recall is measured against exact search over the same vectors. index_bytes is the
+    serialized size of the FAISS index, which is what a collection keeps in RAM; the
+    full vectors stay on disk and are only read for re-ranking.
+    """
+    import faiss
+    from local_vector_store import LocalCollection
+
+    vectors, query_vectors = dataset["vectors"], queries["vectors"]
+    dimensions = vectors.shape[1]
+    k = min(args.k, size)
+
+    exact_index = faiss.IndexFlatIP(dimensions)
+    exact_index.add(vectors)
+    _, exact = exact_index.search(query_vectors, k)
+
+    nlist = args.nlist or max(1, int(4 * np.sqrt(size)))
+    common = {"nlist": nlist, "nprobe": min(args.nprobe, nlist), "rerank": args.rerank, "train_size": min(size, nlist * 39)}
+    settings = [("flat", "flat", {}), ("sq8", "sq8", common)]
+    for code_size in args.pq_code_sizes or [max(1, dimensions // 8), max(1, dimensions // 16)]:
+        settings.append((f"pq{code_size}", "pq", {**common, "code_size": code_size,
+                                                    "train_size": min(size, max(nlist, 256) * 39)}))
+
+    results = []
+    for label, index_type, options in settings:
+        with tempfile.TemporaryDirectory() as path:
+            try:
+                collection = LocalCollection.create(os.path.join(path, label), label, [], dimensions, index_type, options)
+            except ValueError as e:
+                logger.warning(f"Skipping {label}: {e}")
+                continue
+
+            start = time.perf_counter()
+            for offset in range(0, size, args.batch_size):
+                end = min(offset + args.batch_size, size)
+                collection.add([(str(uuid.uuid4()), {}, vectors[i]) for i in range(offset, end)])
+            duration = time.perf_counter() - start
+
+            found = collection.search(query_vectors, k)
+            recall = float(np.mean([
+                len({row for row, _ in hits} & set(expected.tolist())) / k
+                for hits, expected in zip(found, exact)
+            ]))
+            index_bytes = int(faiss.serialize_index(collection.index).size) if collection.index is not None else 0
+            quality = {
+                "recall_at_k": round(recall, 4),
+                "index_bytes": index_bytes,
+                "index_bytes_per_vector": round(index_bytes / size, 2),
+                "vectors_file_bytes": size * dimensions * 4,
+                "trained": collection.index is not None and collection.index.is_trained
+            }
+
+            build = summarize([duration], duration, 0)
+            build["objects_per_s"] = round(size / duration, 3) if duration else 0.0
+            results.append({"workload": f"build[{label}]", "concurrency": 1, **build, **quality})
+
+            for concurrency in args.concurrency:
+                operation = lambda i: collection.search(query_vectors[i % len(query_vectors)].reshape(1, -1), k)
+                results.append({"workload": f"search[{label}]", "concurrency": concurrency,
+                                **run_workload(operation, args.ops, concurrency), **quality})
+    return results
+
+
+BENCHMARKS: Dict[str, Callable[..., List[Dict[str, Any]]]] = {
+    "weaviate": bench_weaviate,
+    "federated": bench_federated,
+    "local": bench_local,
+    "faiss": bench_faiss,
+    "chroma": bench_chroma,
+    "quantized": bench_quantized
+}
+
+
+def run_benchmarks(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Run every selected backend at every data size.
+
+    Backends whose optional dependencies are not installed are skipped and listed
+    under "skipped".
+    """
+    report: Dict[str, Any] = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "settings": {key: value for key, value in vars(args).items() if key not in ("output", "compare")}
+        },
+        "results": [],
+        "skipped": {}
+    }
+    queries = make_queries(max(args.ops, 1), args.dimensions)
+
+    for size in args.sizes:
+        dataset = make_dataset(size, args.dimensions)
+        for backend in args.backends:
+            try:
+                results = BENCHMARKS[backend](args, size, dataset, queries)
+            except ImportError as e:
+                logger.warning(f"Skipping {backend} benchmark: {e}")
+                report["skipped"][backend] = str(e)
+                continue
+            for result in results:
+                report["results"].append({"backend": backend, "size": size, **result})
+                logger.info(f"{backend:8} size={size:<8} {result['workload']:14} c={result['concurrency']:<4} "
+                            f"{result['throughput_ops_s']:>10.1f} ops/s  "
+                            f"p99={result.get('latency_ms', {}).get('p99', float('nan')):.2f}ms"
+                            + (f"  recall@k={result['recall_at_k']:.3f}  {result['index_bytes_per_vector']:.1f} B/vector"
+                               if "recall_at_k" in result else ""))
+    return report
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Compare two benchmark reports, matching results by backend, workload, size and concurrency.
+
+    Returns:
+        One entry per matched result with the relative change in throughput and in
+        p50/p95/p99 latency (positive means higher in `new`).
+    """
+    def key(result: Dict[str, Any]) -> tuple:
+        return result["backend"], result["workload"], result["size"], result["concurrency"]
+
+    def change(before: Optional[float], after: Optional[float]) -> Optional[float]:
+        if not before or after is None:
+            return None
+        return round((after - before) / before, 4)
+
+    old_results = {key(result): result for result in old.get("results", [])}
+    changes = []
+    for result in new.get("results", []):
+        before = old_results.get(key(result))
+        if before is None:
+            continue
+        entry = dict(zip(("backend", "workload", "size", "concurrency"), key(result)))
+        entry["throughput_change"] = change(before["throughput_ops_s"], result["throughput_ops_s"])
+        for percentile in ("p50", "p95", "p99"):
+            entry[f"{percentile}_change"] = change(before.get("latency_ms", {}).get(percentile),
+                                                   result.get("latency_ms", {}).get(percentile))
+        if "recall_at_k" in result and "recall_at_k" in before:
+            entry["recall_at_k_change"] = round(result["recall_at_k"] - before["recall_at_k"], 4)
+        changes.append(entry)
+    return changes
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the vector database code paths.")
+    parser.add_argument("--backends", default=",".join(BACKENDS),
+                        help=f"Comma-separated backends to run, from {', '.join(BACKENDS)}.")
+    parser.add_argument("--sizes", type=_int_list, default=[1000, 10000], help="Comma-separated collection sizes.")
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 8, 32], help="Comma-separated concurrency levels.")
+    parser.add_argument("--ops", type=int, default=200, help="Operations per query workload.")
+    parser.add_argument("--dimensions", type=int, default=384, help="Vector dimensionality.")
+    parser.add_argument("--k", type=int, default=10, help="Results per query.")
+    parser.add_argument("--batch-size", type=int, default=100, help="Objects per batch insert.")
+    parser.add_argument("--latency", type=float, default=0.002, help="Mock server latency per request, in seconds.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Mock server random extra latency, in seconds.")
+    parser.add_argument("--shards", type=int, default=4, help="Mock servers for the federated backend.")
+    parser.add_argument("--pq-code-sizes", type=_int_list, default=None,
+                        help="Comma-separated PQ code sizes in bytes for the quantized backend "
+                             "(default: dimensions/8 and dimensions/16).")
+    parser.add_argument("--rerank", type=int, default=4,
+                        help="Candidates fetched per result for exact re-ranking in the quantized backend.")
+    parser.add_argument("--nlist", type=int, default=None,
+                        help="IVF lists for the quantized backend (default: 4 * sqrt(size)).")
+    parser.add_argument("--nprobe", type=int, default=16, help="IVF lists probed per query in the quantized backend.")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout.")
+    parser.add_argument("--compare", help="Previous JSON report to compare the new results against.")
+    args = parser.parse_args(argv)
+
+    args.backends = [backend for backend in args.backends.split(",") if backend]
+    unknown = set(args.backends) - set(BACKENDS)
+    if unknown:
+        parser.error(f"Unknown backends: {', '.join(sorted(unknown))}")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    args = parse_args(argv)
+    report = run_benchmarks(args)
+
+    if args.compare:
+        with open(args.compare) as f:
+            report["comparison"] = {"baseline": args.compare, "changes": compare(json.load(f), report)}
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+        logger.info(f"Wrote benchmark report to {args.output}")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
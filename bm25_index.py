@@ -0,0 +1,521 @@
+"""
+BM25 Keyword Index and Hybrid Ranking
+
+This module provides BM25Index, an incremental keyword index that is kept next to a
+vector index, and the functions that fuse keyword and vector rankings into one hybrid
+ranking. Dense search alone misses exact matches on rare terms such as model names
+("GPT-4", "YOLO"); BM25 finds them, and fusion keeps the semantic matches as well.
+
+Postings are array-backed. Each segment of the index is a CSR layout over term IDs:
+one offsets array and contiguous uint32 document and uint16 frequency arrays. New
+documents go into a new small segment, and segments are merged as they grow, so
+adding documents never rewrites the whole index and a query reads a handful of
+contiguous slices per term. Scoring is vectorized with NumPy and uses MaxScore
+pruning: rare query terms are scored first, and once the top results are settled,
+common terms are only looked up for those candidates instead of scanned in full.
+
+Tokens are lowercased words; compound terms like "gpt-4" or "gpt-3.5" are indexed
+both whole and as their parts, so "GPT-4" ranks documents with the exact term first.
+
+Fusion follows Weaviate's hybrid search, with alpha weighting the vector side
+(1 = vector only, 0 = keyword only):
+
+    rrf             reciprocal rank fusion: sum of weight / (60 + rank)
+    relative_score  scores normalized to [0, 1] per ranking, then a weighted sum
+
+Usage:
+    from bm25_index import BM25Index, hybrid_rank
+
+    index = BM25Index()
+    index.add(["GPT-4 is a language model.", "YOLO detects objects."])
+    print(index.search("gpt-4", limit=5))
+
+    ranked = hybrid_rank(
+        dense=lambda: vector_hits,              # [(doc, similarity), ...], best first
+        keyword=lambda: index.search(query, 20),
+        limit=5,
+        fusion="rrf",
+        alpha=0.5
+    )
+"""
+
+import os
+import re
+import json
+import math
+import logging
+import threading
+import numpy as np
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Callable, Hashable, Iterable, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+FUSION_METHODS = ("rrf", "relative_score")
+
+# Rank offset of reciprocal rank fusion, as in Weaviate and the original paper
+RRF_K = 60
+
+# Words too common to be worth a posting list
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or that the this to was were "
+    "will with".split()
+)
+
+TOKEN_PATTERN = re.compile(r"\w+(?:[-.+]\w+)*")
+COMPOUND_SEPARATORS = re.compile(r"[-.+]")
+
+# Segments are merged when there are more than this many, or when a segment is at
+# least half the size of the one before it
+MAX_SEGMENTS = 8
+
+# Term frequencies are stored as uint16
+MAX_TERM_FREQUENCY = np.iinfo(np.uint16).max
+
+# Shared by hybrid_rank for the keyword side, so no thread is started per query
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase index terms, adding the parts of compound terms.
+    """
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(text.lower()):
+        token = match.group()
+        if token in STOPWORDS:
+            continue
+        tokens.append(token)
+        if not token.isalnum():
+            tokens.extend(part for part in COMPOUND_SEPARATORS.split(token) if part and part not in STOPWORDS)
+    return tokens
+
+
+class _Segment:
+    """
+    Immutable postings in CSR layout: the postings of term t are docs[offsets[t]:offsets[t + 1]].
+
+    Terms added to the vocabulary after the segment was built have no postings in it.
+    """
+
+    def __init__(self, offsets: np.ndarray, docs: np.ndarray, freqs: np.ndarray):
+        self.offsets = offsets
+        self.docs = docs
+        self.freqs = freqs
+
+    @property
+    def size(self) -> int:
+        return len(self.docs)
+
+    @classmethod
+    def build(cls, terms: np.ndarray, docs: np.ndarray, freqs: np.ndarray, vocabulary_size: int) -> "_Segment":
+        """
+        Build a segment from (term, doc, freq) triples that are in document order.
+        """
+        # A stable sort by term keeps each term's documents in ascending order
+        order = np.argsort(terms, kind="stable")
+        offsets = np.zeros(vocabulary_size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(terms, minlength=vocabulary_size), out=offsets[1:])
+        return cls(offsets, docs[order], freqs[order])
+
+    def terms(self) -> np.ndarray:
+        """The term ID of every posting."""
+        return np.repeat(np.arange(len(self.offsets) - 1, dtype=np.uint32), np.diff(self.offsets))
+
+    def postings(self, term: int) -> Tuple[np.ndarray, np.ndarray]:
+        if term + 1 >= len(self.offsets):
+            return self.docs[:0], self.freqs[:0]
+        start, end = self.offsets[term], self.offsets[term + 1]
+        return self.docs[start:end], self.freqs[start:end]
+
+    @classmethod
+    def merge(cls, segments: Sequence["_Segment"], vocabulary_size: int) -> "_Segment":
+        """
+        Merge segments, oldest first, into one.
+        """
+        return cls.build(
+            np.concatenate([segment.terms() for segment in segments]),
+            np.concatenate([segment.docs for segment in segments]),
+            np.concatenate([segment.freqs for segment in segments]),
+            vocabulary_size
+        )
+
+
+class BM25Index:
+    """
+    Incremental BM25 index over documents numbered 0, 1, 2, ... in the order they are added.
+
+    Thread-safe: additions and searches can run concurrently.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """
+        Initialize an empty index.
+
+        Args:
+            k1: Term frequency saturation.
+            b: Strength of document length normalization.
+        """
+        self.k1 = k1
+        self.b = b
+        self.vocabulary: Dict[str, int] = {}
+        self.segments: List[_Segment] = []
+        # Document frequency per term ID, kept alongside the postings so IDF is one lookup
+        self._document_frequencies = np.zeros(1024, dtype=np.int64)
+        self._lengths = np.zeros(1024, dtype=np.uint32)
+        self.doc_count = 0
+        self.total_length = 0
+        self.lock = threading.Lock()
+
+    @property
+    def posting_count(self) -> int:
+        """Number of (term, document) postings."""
+        return sum(segment.size for segment in self.segments)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the postings and document lengths."""
+        return (sum(s.offsets.nbytes + s.docs.nbytes + s.freqs.nbytes for s in self.segments)
+                + self._lengths[:self.doc_count].nbytes)
+
+    @staticmethod
+    def _grow(array: np.ndarray, size: int) -> np.ndarray:
+        """Return the array, or a copy with doubled capacity if it is shorter than size."""
+        if size <= len(array):
+            return array
+        grown = np.zeros(max(size, 2 * len(array)), dtype=array.dtype)
+        grown[:len(array)] = array
+        return grown
+
+    def add(self, texts: Iterable[str]) -> int:
+        """
+        Index documents; they are numbered after the documents already in the index.
+
+        Returns:
+            The number of the first added document.
+        """
+        terms: List[int] = []
+        docs: List[int] = []
+        freqs: List[int] = []
+        lengths: List[int] = []
+
+        with self.lock:
+            first = self.doc_count
+            for doc, text in enumerate(texts, first):
+                tokens = tokenize(text or "")
+                lengths.append(len(tokens))
+                for token, count in Counter(tokens).items():
+                    term = self.vocabulary.get(token)
+                    if term is None:
+                        term = self.vocabulary[token] = len(self.vocabulary)
+                    terms.append(term)
+                    docs.append(doc)
+                    freqs.append(min(count, MAX_TERM_FREQUENCY))
+            if not lengths:
+                return first
+
+            count = len(lengths)
+            self._lengths = self._grow(self._lengths, first + count)
+            self._lengths[first:first + count] = lengths
+            terms_array = np.asarray(terms, dtype=np.uint32)
+            self._document_frequencies = self._grow(self._document_frequencies, len(self.vocabulary))
+            np.add.at(self._document_frequencies, terms_array, 1)
+
+            # Segments are immutable, so searches holding the old list stay consistent
+            segment = _Segment.build(terms_array, np.asarray(docs, dtype=np.uint32),
+                                     np.asarray(freqs, dtype=np.uint16), len(self.vocabulary))
+            segments = self.segments + [segment]
+            while len(segments) > 1 and (len(segments) > MAX_SEGMENTS or 2 * segments[-1].size >= segments[-2].size):
+                segments[-2:] = [_Segment.merge(segments[-2:], len(self.vocabulary))]
+            self.segments = segments
+            self.doc_count += count
+            self.total_length += sum(lengths)
+        return first
+
+    def search(self, query: str, limit: int = 10, allowed: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        """
+        Rank documents by their BM25 score for a query.
+
+        Args:
+            query: The query text.
+            limit: Maximum number of documents to return.
+            allowed: Optional boolean mask over documents; others are skipped, e.g. deleted rows.
+                Documents past the end of the mask are skipped too.
+
+        Returns:
+            List of (document, score) pairs, best first. Documents without a query term are not returned.
+        """
+        with self.lock:
+            terms = [self.vocabulary[token] for token in dict.fromkeys(tokenize(query)) if token in self.vocabulary]
+            segments = self.segments
+            doc_count = self.doc_count
+            average_length = self.total_length / doc_count if doc_count else 0.0
+            lengths = self._lengths[:doc_count]
+            frequencies = self._document_frequencies[terms]
+        if not terms or limit < 1:
+            return []
+        if allowed is not None and len(allowed) < doc_count:
+            # Documents added after the mask was made are not allowed
+            allowed = np.concatenate([allowed, np.zeros(doc_count - len(allowed), dtype=bool)])
+
+        length_scale = np.float32(self.k1 * self.b / (average_length or 1.0))
+        length_base = np.float32(self.k1 * (1 - self.b))
+
+        def contributions(idf: float, docs: np.ndarray, freqs: np.ndarray) -> np.ndarray:
+            tf = freqs.astype(np.float32)
+            return np.float32(idf * (self.k1 + 1)) * tf / (tf + lengths[docs] * length_scale + length_base)
+
+        # A term adds at most idf * (k1 + 1) to a score; terms are visited rarest first
+        query_terms = []
+        for term, df in zip(terms, frequencies):
+            idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+            parts = [part for part in (segment.postings(term) for segment in segments) if len(part[0])]
+            if parts:
+                query_terms.append((idf * (self.k1 + 1), idf, parts))
+        if not query_terms:
+            return []
+        query_terms.sort(key=lambda entry: -entry[0])
+        remaining_bounds = np.cumsum([bound for bound, _, _ in query_terms][::-1])[::-1]
+
+        docs = np.zeros(0, dtype=np.uint32)
+        scores = np.zeros(0, dtype=np.float32)
+        for i, (_, idf, parts) in enumerate(query_terms):
+            # MaxScore: once the limit-th best score so far is above what the remaining terms
+            # can add up to, no other document can reach the top, so the remaining (common)
+            # terms are only looked up for the candidates instead of scanned in full
+            threshold = self._threshold(docs, scores, limit, allowed) if i else -math.inf
+            if threshold > remaining_bounds[i]:
+                # Candidates that cannot reach the threshold either are dropped first
+                keep = scores + remaining_bounds[i] >= threshold
+                if allowed is not None:
+                    keep &= allowed[docs]
+                docs, scores = docs[keep], scores[keep]
+                for _, idf, parts in query_terms[i:]:
+                    for part_docs, part_freqs in parts:
+                        position = np.minimum(np.searchsorted(part_docs, docs), len(part_docs) - 1)
+                        hit = part_docs[position] == docs
+                        scores[hit] += contributions(idf, docs[hit], part_freqs[position[hit]])
+                break
+            docs, scores = self._accumulate(
+                [docs] + [part_docs for part_docs, _ in parts],
+                [scores] + [contributions(idf, part_docs, part_freqs) for part_docs, part_freqs in parts],
+                doc_count
+            )
+
+        if allowed is not None:
+            keep = allowed[docs]
+            docs, scores = docs[keep], scores[keep]
+        if len(docs) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+        else:
+            top = np.arange(len(docs))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(docs[i]), float(scores[i])) for i in top]
+
+    @staticmethod
+    def _threshold(docs: np.ndarray, scores: np.ndarray, limit: int, allowed: Optional[np.ndarray]) -> float:
+        """The limit-th best score among allowed candidates, or -inf if there are fewer."""
+        if allowed is not None:
+            scores = scores[allowed[docs]]
+        if len(scores) < limit:
+            return -math.inf
+        return float(np.partition(scores, len(scores) - limit)[len(scores) - limit])
+
+    @staticmethod
+    def _accumulate(doc_parts: List[np.ndarray], score_parts: List[np.ndarray], doc_count: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Sum scores per document over parts that each hold a document at most once.
+        """
+        doc_parts = [part for part in doc_parts if len(part)]
+        score_parts = [part for part in score_parts if len(part)]
+        if len(doc_parts) == 1:
+            return doc_parts[0], score_parts[0]
+
+        # With few postings, sort them; with many, add them up in an accumulator over all
+        # documents, which avoids the sort
+        if 8 * sum(len(part) for part in doc_parts) < doc_count:
+            docs, inverse = np.unique(np.concatenate(doc_parts), return_inverse=True)
+            return docs, np.bincount(inverse, weights=np.concatenate(score_parts)).astype(np.float32)
+        accumulator = np.zeros(doc_count, dtype=np.float32)
+        for part_docs, part_scores in zip(doc_parts, score_parts):
+            accumulator[part_docs] += part_scores
+        docs = np.flatnonzero(accumulator)
+        return docs, accumulator[docs]
+
+    def save(self, path: str) -> None:
+        """
+        Write the index to a directory as one merged segment of .npy arrays and the vocabulary.
+
+        The arrays are written under a new generation number and the vocabulary, which
+        names that generation, is replaced last. A crash leaves the previous save intact,
+        and readers that memory-mapped its arrays keep them until they close.
+        """
+        with self.lock:
+            if len(self.segments) > 1:
+                self.segments = [_Segment.merge(self.segments, len(self.vocabulary))]
+            segment = self.segments[0] if self.segments else _Segment.build(
+                np.zeros(0, dtype=np.uint32), np.zeros(0, dtype=np.uint32), np.zeros(0, dtype=np.uint16), 0)
+            os.makedirs(path, exist_ok=True)
+            generation = _saved_generation(path) + 1
+            arrays = {"offsets": segment.offsets, "docs": segment.docs, "freqs": segment.freqs,
+                      "lengths": self._lengths[:self.doc_count]}
+            for name, array in arrays.items():
+                np.save(os.path.join(path, _array_filename(name, generation)), array)
+            terms = sorted(self.vocabulary, key=self.vocabulary.get)
+            with open(os.path.join(path, "vocabulary.json.tmp"), "w") as f:
+                json.dump({"k1": self.k1, "b": self.b, "terms": terms, "generation": generation}, f)
+            os.replace(os.path.join(path, "vocabulary.json.tmp"), os.path.join(path, "vocabulary.json"))
+
+            current = {_array_filename(name, generation) for name in arrays}
+            for filename in os.listdir(path):
+                if filename.endswith(".npy") and filename not in current:
+                    os.remove(os.path.join(path, filename))
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = False) -> "BM25Index":
+        """
+        Read an index written by save().
+
+        Args:
+            path: The index directory.
+            mmap: Whether to memory-map the postings instead of reading them into RAM.
+        """
+        with open(os.path.join(path, "vocabulary.json")) as f:
+            saved = json.load(f)
+        mode = "r" if mmap else None
+        generation = saved.get("generation")
+        index = cls(saved["k1"], saved["b"])
+        index.vocabulary = {term: i for i, term in enumerate(saved["terms"])}
+        segment = _Segment(*(np.load(os.path.join(path, _array_filename(name, generation)), mmap_mode=mode)
+                             for name in ("offsets", "docs", "freqs")))
+        if segment.size:
+            index.segments = [segment]
+        index._document_frequencies = np.diff(np.asarray(segment.offsets))
+        index._lengths = np.array(np.load(os.path.join(path, _array_filename("lengths", generation))), dtype=np.uint32)
+        index.doc_count = len(index._lengths)
+        index.total_length = int(index._lengths.sum())
+        return index
+
+
+def _array_filename(name: str, generation: Optional[int]) -> str:
+    """File name of a saved array; indexes saved before generations were added have none."""
+    return f"{name}.npy" if generation is None else f"{name}.{generation}.npy"
+
+
+def _saved_generation(path: str) -> int:
+    """Generation of the index saved in a directory, or 0 if there is none."""
+    try:
+        with open(os.path.join(path, "vocabulary.json")) as f:
+            return json.load(f).get("generation") or 0
+    except (OSError, ValueError):
+        return 0
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Tuple[Hashable, float]]],
+                           weights: Sequence[float],
+                           k: int = RRF_K) -> List[Tuple[Hashable, float]]:
+    """
+    Fuse rankings by summing weight / (k + rank) per item, with ranks starting at 1.
+    """
+    scores: Dict[Hashable, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, (item, _) in enumerate(ranking, 1):
+            scores[item] = scores.get(item, 0.0) + weight / (k + rank)
+    return sorted(scores.items(), key=lambda entry: -entry[1])
+
+
+def relative_score_fusion(rankings: Sequence[Sequence[Tuple[Hashable, float]]],
+                          weights: Sequence[float]) -> List[Tuple[Hashable, float]]:
+    """
+    Fuse rankings by min-max normalizing each ranking's scores to [0, 1] and summing them with weights.
+    """
+    scores: Dict[Hashable, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        if not ranking:
+            continue
+        values = [score for _, score in ranking]
+        low, high = min(values), max(values)
+        for item, score in ranking:
+            normalized = (score - low) / (high - low) if high > low else 1.0
+            scores[item] = scores.get(item, 0.0) + weight * normalized
+    return sorted(scores.items(), key=lambda entry: -entry[1])
+
+
+def fuse(dense: Sequence[Tuple[Hashable, float]],
+         keyword: Sequence[Tuple[Hashable, float]],
+         limit: int,
+         fusion: str = "rrf",
+         alpha: float = 0.5) -> List[Tuple[Hashable, float]]:
+    """
+    Fuse a vector ranking and a keyword ranking, each best first.
+
+    Args:
+        dense: (item, similarity) pairs from the vector search.
+        keyword: (item, score) pairs from the keyword search.
+        limit: Maximum number of items to return.
+        fusion: "rrf" or "relative_score".
+        alpha: Weight of the vector ranking; the keyword ranking gets 1 - alpha.
+
+    Returns:
+        (item, fused score) pairs, best first.
+    """
+    _check_fusion(fusion, alpha)
+    weights = (alpha, 1.0 - alpha)
+    if fusion == "rrf":
+        return reciprocal_rank_fusion((dense, keyword), weights)[:limit]
+    return relative_score_fusion((dense, keyword), weights)[:limit]
+
+
+def _check_fusion(fusion: str, alpha: float) -> None:
+    if fusion not in FUSION_METHODS:
+        raise ValueError(f"fusion must be one of {FUSION_METHODS}, got {fusion!r}")
+    if not 0.0 <= alpha <= 1.0:
+        raise ValueError("alpha must be between 0 and 1.")
+
+
+def _shared_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 4, thread_name_prefix="hybrid")
+        return _executor
+
+
+def hybrid_rank(dense: Callable[[], Sequence[Tuple[Hashable, float]]],
+                keyword: Callable[[], Sequence[Tuple[Hashable, float]]],
+                limit: int,
+                fusion: str = "rrf",
+                alpha: float = 0.5,
+                executor: Optional[ThreadPoolExecutor] = None) -> List[Tuple[Hashable, float]]:
+    """
+    Run a vector search and a keyword search in parallel and fuse their rankings.
+
+    The keyword search runs on a worker thread while the vector search (often including
+    the query embedding) runs on the calling thread. With alpha at 0 or 1 only the side
+    that counts is run.
+
+    Args:
+        dense: Runs the vector search and returns (item, similarity) pairs, best first.
+        keyword: Runs the keyword search and returns (item, score) pairs, best first.
+        limit: Maximum number of items to return.
+        fusion: "rrf" or "relative_score".
+        alpha: Weight of the vector ranking; the keyword ranking gets 1 - alpha.
+        executor: Pool for the keyword search. Defaults to a shared module-level pool.
+
+    Returns:
+        (item, fused score) pairs, best first.
+    """
+    _check_fusion(fusion, alpha)
+    if alpha == 1.0:
+        return fuse(dense(), [], limit, fusion, alpha)
+    if alpha == 0.0:
+        return fuse([], keyword(), limit, fusion, alpha)
+
+    keyword_future = (executor or _shared_executor()).submit(keyword)
+    try:
+        dense_hits = dense()
+    finally:
+        keyword_hits = keyword_future.result()
+    return fuse(dense_hits, keyword_hits, limit, fusion, alpha)
@@ -0,0 +1,306 @@
+"""
+Client Metrics
+
+This module provides per-operation metrics for WeaviateCloudClient: call counts, error
+counts, transport fallback counts and latency histograms per method, plus optional span
+hooks that wrap each phase of a request (the attempt over each transport,
+serialization, network, decoding) so the time can be sent to a tracer.
+
+Metrics are read through exporters. An exporter is any callable that takes a snapshot
+dict; snapshot() itself is the in-process view and prometheus_text renders the
+Prometheus text exposition format.
+
+A client created without metrics skips all of this, so the overhead when disabled is
+one attribute check per call.
+
+Usage:
+    from client_metrics import ClientMetrics, prometheus_text
+    from weaviate_client_v4 import WeaviateCloudClient
+
+    metrics = ClientMetrics()
+    # Optional: forward spans to OpenTelemetry
+    metrics.add_span_hook(lambda method, phase: tracer.start_as_current_span(f"weaviate.{method}.{phase}"))
+
+    client = WeaviateCloudClient(metrics=metrics)
+    client.connect()
+    client.query_objects("Article", ["title"])
+
+    print(metrics.snapshot()["methods"]["query_objects"])
+    print(metrics.export(prometheus_text))
+"""
+
+import time
+import bisect
+import logging
+import threading
+import functools
+from contextlib import ExitStack, contextmanager, nullcontext
+from typing import Dict, List, Any, Callable, ContextManager, Iterator, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds of the latency histogram buckets; the last bucket is +Inf
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+SpanHook = Callable[[str, str], ContextManager[Any]]
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram. Not thread-safe; ClientMetrics holds the lock.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile by linear interpolation within its bucket.
+
+        Returns:
+            The estimate in seconds, the largest finite bucket bound if it falls in the
+            +Inf bucket, or None if nothing was observed.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+
+class MethodStats:
+    """
+    Counters and latency histogram for one client method.
+    """
+
+    def __init__(self, buckets: Sequence[float]):
+        self.calls = 0
+        self.errors = 0
+        self.fallbacks = 0
+        self.latency = LatencyHistogram(buckets)
+        self.phases: Dict[str, LatencyHistogram] = {}
+
+
+class ClientMetrics:
+    """
+    Thread-safe metrics registry shared by one or more clients.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS, record_phases: bool = True):
+        """
+        Initialize the registry.
+
+        Args:
+            buckets: Upper bounds in seconds of the latency histogram buckets.
+            record_phases: Whether to keep a latency histogram per request phase as well as per method.
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.record_phases = record_phases
+        self.methods: Dict[str, MethodStats] = {}
+        self.span_hooks: List[SpanHook] = []
+        self._lock = threading.Lock()
+
+    def _stats(self, method: str) -> MethodStats:
+        """Return the stats of a method. The caller must hold the lock."""
+        stats = self.methods.get(method)
+        if stats is None:
+            stats = self.methods[method] = MethodStats(self.buckets)
+        return stats
+
+    def record_call(self, method: str, seconds: float, error: bool = False) -> None:
+        """
+        Record one call of a method and how long it took.
+        """
+        with self._lock:
+            stats = self._stats(method)
+            stats.calls += 1
+            stats.latency.observe(seconds)
+            if error:
+                stats.errors += 1
+
+    def record_fallback(self, method: str) -> None:
+        """
+        Record that a method fell back from a failed transport to the next one.
+        """
+        with self._lock:
+            self._stats(method).fallbacks += 1
+
+    def record_phase(self, method: str, phase: str, seconds: float) -> None:
+        """
+        Record the duration of one phase of a request.
+        """
+        with self._lock:
+            phases = self._stats(method).phases
+            histogram = phases.get(phase)
+            if histogram is None:
+                histogram = phases[phase] = LatencyHistogram(self.buckets)
+            histogram.observe(seconds)
+
+    def add_span_hook(self, hook: SpanHook) -> None:
+        """
+        Register a span hook.
+
+        A hook is called with the method name and phase ("call", the transport attempted:
+        "grpc", "sdk" or "rest", then "serialize", "network", "decode") at the start of each phase and must return a
+        context manager, which is exited when the phase ends.
+        """
+        self.span_hooks.append(hook)
+
+    @contextmanager
+    def _timed_span(self, method: str, phase: str) -> Iterator[None]:
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for hook in self.span_hooks:
+                try:
+                    stack.enter_context(hook(method, phase))
+                except Exception as e:
+                    logger.warning(f"Span hook failed for {method}.{phase}: {e}")
+            try:
+                yield
+            finally:
+                if self.record_phases and phase != "call":
+                    self.record_phase(method, phase, time.perf_counter() - start)
+
+    def span(self, method: str, phase: str) -> ContextManager[None]:
+        """
+        Return a context manager that times a request phase and runs the span hooks around it.
+        """
+        if not self.span_hooks and not (self.record_phases and phase != "call"):
+            return nullcontext()
+        return self._timed_span(method, phase)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Return a copy of all metrics.
+
+        Returns:
+            Dict with the histogram bucket bounds ("buckets") and per-method ("methods")
+            counts, errors, fallbacks, latency sum, bucket counts and p50/p95/p99 estimates
+            in seconds, plus the same latency summary per phase.
+        """
+        def summary(histogram: LatencyHistogram) -> Dict[str, Any]:
+            return {
+                "count": histogram.count,
+                "sum": histogram.sum,
+                "bucket_counts": list(histogram.counts),
+                "p50": histogram.quantile(0.50),
+                "p95": histogram.quantile(0.95),
+                "p99": histogram.quantile(0.99)
+            }
+
+        with self._lock:
+            return {
+                "buckets": list(self.buckets),
+                "methods": {
+                    method: {
+                        "calls": stats.calls,
+                        "errors": stats.errors,
+                        "fallbacks": stats.fallbacks,
+                        "latency": summary(stats.latency),
+                        "phases": {phase: summary(h) for phase, h in stats.phases.items()}
+                    }
+                    for method, stats in self.methods.items()
+                }
+            }
+
+    def export(self, exporter: Callable[[Dict[str, Any]], Any] = None) -> Any:
+        """
+        Pass a snapshot to an exporter and return its result.
+
+        Args:
+            exporter: Callable that takes a snapshot dict. If None, the snapshot is returned.
+        """
+        snapshot = self.snapshot()
+        return exporter(snapshot) if exporter else snapshot
+
+    def reset(self) -> None:
+        """
+        Drop all recorded metrics. Span hooks are kept.
+        """
+        with self._lock:
+            self.methods.clear()
+
+
+def prometheus_text(snapshot: Dict[str, Any], prefix: str = "weaviate_client") -> str:
+    """
+    Render a metrics snapshot in the Prometheus text exposition format.
+    """
+    buckets = snapshot["buckets"]
+    lines = [
+        f"# HELP {prefix}_calls_total Calls per client method.",
+        f"# TYPE {prefix}_calls_total counter"
+    ]
+    methods = snapshot["methods"]
+    lines += [f'{prefix}_calls_total{{method="{m}"}} {s["calls"]}' for m, s in methods.items()]
+    lines += [f"# HELP {prefix}_errors_total Calls that raised, per client method.",
+              f"# TYPE {prefix}_errors_total counter"]
+    lines += [f'{prefix}_errors_total{{method="{m}"}} {s["errors"]}' for m, s in methods.items()]
+    lines += [f"# HELP {prefix}_fallbacks_total Failed transport attempts that fell back to the next transport, per client method.",
+              f"# TYPE {prefix}_fallbacks_total counter"]
+    lines += [f'{prefix}_fallbacks_total{{method="{m}"}} {s["fallbacks"]}' for m, s in methods.items()]
+
+    def histogram(name: str, labels: str, summary: Dict[str, Any]) -> List[str]:
+        rows = []
+        cumulative = 0
+        for bound, count in zip(buckets + ["+Inf"], summary["bucket_counts"]):
+            cumulative += count
+            rows.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        rows.append(f"{name}_sum{{{labels}}} {summary['sum']}")
+        rows.append(f"{name}_count{{{labels}}} {summary['count']}")
+        return rows
+
+    lines += [f"# HELP {prefix}_latency_seconds Latency per client method.",
+              f"# TYPE {prefix}_latency_seconds histogram"]
+    for method, stats in methods.items():
+        lines += histogram(f"{prefix}_latency_seconds", f'method="{method}"', stats["latency"])
+
+    if any(stats["phases"] for stats in methods.values()):
+        lines += [f"# HELP {prefix}_phase_latency_seconds Latency per request phase.",
+                  f"# TYPE {prefix}_phase_latency_seconds histogram"]
+        for method, stats in methods.items():
+            for phase, summary in stats["phases"].items():
+                lines += histogram(f"{prefix}_phase_latency_seconds", f'method="{method}",phase="{phase}"', summary)
+
+    return "\n".join(lines) + "\n"
+
+
+def instrumented(method: str) -> Callable:
+    """
+    Decorate a client method so its calls, errors and latency are recorded in self.metrics.
+
+    When the client has no metrics the method is called directly.
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+            metrics: Optional[ClientMetrics] = self.metrics
+            if metrics is None:
+                return func(self, *args, **kwargs)
+
+            start = time.perf_counter()
+            error = False
+            try:
+                with metrics.span(method, "call"):
+                    return func(self, *args, **kwargs)
+            except BaseException:
+                error = True
+                raise
+            finally:
+                metrics.record_call(method, time.perf_counter() - start, error)
+        return wrapper
+    return decorator
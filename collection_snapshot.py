@@ -0,0 +1,445 @@
+"""
+Collection Snapshots
+
+This module moves whole collections between backends through a columnar snapshot on
+disk. export_snapshot() streams a collection's IDs, properties and vectors out of a
+WeaviateCloudClient or LocalVectorStore, and the import functions bulk-load a snapshot
+into Weaviate, a LocalVectorStore, a Chroma collection or a FAISS index. A snapshot
+directory holds:
+
+    manifest.json           collection name, property definitions, dimensions and row count
+    ids.bin                 16-byte UUID per row
+    vectors.f32             float32 vectors as one contiguous row-major block
+    columns/<prop>.jsonl    one JSON value per row for each property
+
+The manifest is written last, so a directory without one is an interrupted export and
+is refused by open_snapshot(). Vectors are read back through a memory map: the import
+functions hand slices of the map straight to the target, so a snapshot is never copied
+into RAM as a whole and FAISS reads its rows from the page cache without conversion.
+
+Usage:
+    from weaviate_client_v4 import WeaviateCloudClient
+    from collection_snapshot import export_snapshot, open_snapshot, import_to_faiss
+
+    client = WeaviateCloudClient(url, api_key)
+    client.connect()
+    export_snapshot(client, "Article", "snapshots/article")
+
+    snapshot = open_snapshot("snapshots/article")
+    index = import_to_faiss(snapshot)
+    ids = snapshot.ids()
+"""
+
+import os
+import json
+import uuid
+import logging
+import numpy as np
+import faiss
+from itertools import islice
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+from local_vector_store import LocalVectorStore, normalize_rows
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = "collection-snapshot"
+SNAPSHOT_VERSION = 1
+
+# Objects read per cursor page when exporting from Weaviate
+EXPORT_PAGE_SIZE = 1000
+
+# Rows handed to the target per call when importing
+IMPORT_BATCH_SIZE = 1000
+
+# Chroma rejects add() calls above roughly 5000 records
+CHROMA_BATCH_SIZE = 5000
+
+# Rows passed to FAISS per add() call; each call reads one slice of the memory map
+FAISS_BATCH_ROWS = 100000
+
+
+class SnapshotWriter:
+    """
+    Appends rows to a new snapshot directory and writes its manifest on close.
+    """
+
+    def __init__(self, path: str, collection_name: str, properties: List[Dict[str, Any]]):
+        """
+        Create the snapshot directory.
+
+        Args:
+            path: Directory of the new snapshot. It must not exist or be empty.
+            collection_name: Name of the exported collection.
+            properties: Property definitions; one column is written per property.
+        """
+        if os.path.isdir(path) and os.listdir(path):
+            raise ValueError(f"Snapshot directory {path} is not empty.")
+        os.makedirs(os.path.join(path, "columns"), exist_ok=True)
+
+        self.path = path
+        self.collection_name = collection_name
+        self.properties = [prop if "dataType" in prop else {**prop, "dataType": ["text"]} for prop in properties]
+        self.dimensions: Optional[int] = None
+        self.count = 0
+
+        self._ids = open(os.path.join(path, "ids.bin"), "wb")
+        self._vectors = open(os.path.join(path, "vectors.f32"), "wb")
+        self._columns = {prop["name"]: open(os.path.join(path, "columns", f"{prop['name']}.jsonl"), "w")
+                         for prop in self.properties}
+
+    def append(self, ids: List[str], columns: Dict[str, List[Any]], vectors: Any) -> None:
+        """
+        Append a block of rows.
+
+        Args:
+            ids: Object IDs (UUID strings).
+            columns: Values per property name, each a list as long as ids. Missing
+                properties are written as null.
+            vectors: 2-D array-like with one vector per ID.
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or vectors.shape[0] != len(ids):
+            raise ValueError(f"Expected {len(ids)} vectors, got an array of shape {vectors.shape}.")
+        if self.dimensions is None:
+            self.dimensions = int(vectors.shape[1])
+        elif vectors.shape[1] != self.dimensions:
+            raise ValueError(f"Snapshot has {self.dimensions} dimensions, got {vectors.shape[1]}.")
+
+        for name, f in self._columns.items():
+            values = columns.get(name)
+            f.writelines(json.dumps(value) + "\n" for value in (values if values is not None else [None] * len(ids)))
+        self._vectors.write(np.ascontiguousarray(vectors).tobytes())
+        self._ids.write(b"".join(uuid.UUID(object_id).bytes for object_id in ids))
+        self.count += len(ids)
+
+    def close(self) -> Dict[str, Any]:
+        """
+        Close the data files and write the manifest, which completes the snapshot.
+
+        Returns:
+            The manifest.
+        """
+        for f in [self._ids, self._vectors, *self._columns.values()]:
+            f.close()
+
+        manifest = {
+            "format": SNAPSHOT_FORMAT,
+            "version": SNAPSHOT_VERSION,
+            "collection": self.collection_name,
+            "properties": self.properties,
+            "dimensions": self.dimensions,
+            "count": self.count
+        }
+        manifest_path = os.path.join(self.path, "manifest.json")
+        with open(f"{manifest_path}.tmp", "w") as f:
+            json.dump(manifest, f)
+        os.replace(f"{manifest_path}.tmp", manifest_path)
+        return manifest
+
+
+class Snapshot:
+    """
+    A snapshot opened for reading, with its vectors behind a memory map.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open a snapshot written by export_snapshot.
+
+        Args:
+            path: The snapshot directory.
+        """
+        manifest_path = os.path.join(path, "manifest.json")
+        if not os.path.exists(manifest_path):
+            raise ValueError(f"{path} is not a complete snapshot; manifest.json is missing.")
+        with open(manifest_path) as f:
+            self.manifest: Dict[str, Any] = json.load(f)
+        if self.manifest.get("format") != SNAPSHOT_FORMAT or self.manifest.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot format in {path}.")
+
+        self.path = path
+        self.collection_name: str = self.manifest["collection"]
+        self.properties: List[Dict[str, Any]] = self.manifest["properties"]
+        self.dimensions: Optional[int] = self.manifest["dimensions"]
+        self.count: int = self.manifest["count"]
+
+        ids_path = os.path.join(path, "ids.bin")
+        vectors_path = os.path.join(path, "vectors.f32")
+        if os.path.getsize(ids_path) != self.count * 16 or \
+                os.path.getsize(vectors_path) != self.count * (self.dimensions or 0) * 4:
+            raise ValueError(f"Snapshot {path} does not match its manifest.")
+
+        if self.count:
+            self.raw_ids = np.memmap(ids_path, dtype=np.uint8, mode="r", shape=(self.count, 16))
+            self.vectors = np.memmap(vectors_path, dtype=np.float32, mode="r", shape=(self.count, self.dimensions))
+        else:
+            self.raw_ids = np.zeros((0, 16), dtype=np.uint8)
+            self.vectors = np.zeros((0, self.dimensions or 0), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def property_names(self) -> List[str]:
+        return [prop["name"] for prop in self.properties]
+
+    def ids(self, start: int = 0, stop: Optional[int] = None) -> List[str]:
+        """
+        Return the object IDs of rows start to stop; row i holds vectors[i].
+        """
+        raw = self.raw_ids[start:stop].tobytes()
+        return [str(uuid.UUID(bytes=raw[i:i + 16])) for i in range(0, len(raw), 16)]
+
+    def column(self, name: str) -> List[Any]:
+        """
+        Read every value of one property.
+        """
+        with open(os.path.join(self.path, "columns", f"{name}.jsonl")) as f:
+            return [json.loads(line) for line in f]
+
+    def batches(self,
+                batch_size: int = IMPORT_BATCH_SIZE,
+                properties: Optional[List[str]] = None) -> Iterator[Tuple[List[str], List[Dict[str, Any]], np.ndarray]]:
+        """
+        Read the snapshot in blocks of rows, streaming the property columns side by side.
+
+        Args:
+            batch_size: Number of rows per block.
+            properties: Properties to read. If None, all properties are read.
+
+        Yields:
+            Tuples of (ids, property dicts, vectors), where vectors is a read-only view
+            into the memory map rather than a copy.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1.")
+
+        names = self.property_names if properties is None else properties
+        files = {name: open(os.path.join(self.path, "columns", f"{name}.jsonl")) for name in names}
+        try:
+            for start in range(0, self.count, batch_size):
+                stop = min(start + batch_size, self.count)
+                columns = {name: [json.loads(line) for line in islice(f, stop - start)] for name, f in files.items()}
+                rows = [{name: values[i] for name, values in columns.items()} for i in range(stop - start)]
+                yield self.ids(start, stop), rows, self.vectors[start:stop]
+        finally:
+            for f in files.values():
+                f.close()
+
+
+def open_snapshot(path: str) -> Snapshot:
+    """
+    Open a snapshot directory for reading.
+    """
+    return Snapshot(path)
+
+
+def export_snapshot(source: Any,
+                    collection_name: str,
+                    path: str,
+                    properties: Optional[List[Dict[str, Any]]] = None,
+                    page_size: int = EXPORT_PAGE_SIZE) -> Dict[str, Any]:
+    """
+    Stream a collection into a new snapshot directory.
+
+    Objects are read with source.iter_objects(include_vector=True) and written page by
+    page, so memory use stays at one page whatever the collection size. A
+    LocalVectorStore collection is copied straight from its columns and vector map.
+
+    Args:
+        source: A WeaviateCloudClient or LocalVectorStore.
+        collection_name: The collection to export.
+        path: Directory of the new snapshot. It must not exist or be empty.
+        properties: Property definitions to export. If None, they are read from the
+            collection's schema.
+        page_size: Number of objects read and written at a time.
+
+    Returns:
+        The snapshot manifest.
+    """
+    if page_size < 1:
+        raise ValueError("page_size must be at least 1.")
+    if properties is None:
+        properties = _schema_properties(source, collection_name)
+
+    writer = SnapshotWriter(path, collection_name, properties)
+    names = [prop["name"] for prop in writer.properties]
+    if isinstance(source, LocalVectorStore):
+        _export_local(source, collection_name, writer, names, page_size)
+    else:
+        objects = source.iter_objects(collection_name, properties=names, page_size=page_size, include_vector=True)
+        while True:
+            page = list(islice(objects, page_size))
+            if not page:
+                break
+            if any(not obj["_additional"].get("vector") for obj in page):
+                raise ValueError(f"Collection {collection_name} has objects without a vector.")
+            writer.append([obj["_additional"]["id"] for obj in page],
+                          {name: [obj.get(name) for obj in page] for name in names},
+                          [obj["_additional"]["vector"] for obj in page])
+
+    manifest = writer.close()
+    logger.info(f"Exported {manifest['count']} objects from {collection_name} to {path}")
+    return manifest
+
+
+def _export_local(store: LocalVectorStore, collection_name: str, writer: SnapshotWriter,
+                  names: List[str], page_size: int) -> None:
+    """
+    Copy the live rows of a local collection into a snapshot, one block of rows at a time.
+    """
+    collection = store._get_collection(collection_name)
+    with collection.lock:
+        rows = np.flatnonzero(~collection.deleted)
+    for start in range(0, len(rows), page_size):
+        block = rows[start:start + page_size]
+        with collection.lock:
+            writer.append([collection.ids[row] for row in block],
+                          {name: [collection.columns[name][row] for row in block]
+                           for name in names if name in collection.columns},
+                          collection.vectors[block])
+
+
+def _schema_properties(source: Any, collection_name: str) -> List[Dict[str, Any]]:
+    """
+    Read the property definitions of a collection from a LocalVectorStore or Weaviate schema.
+    """
+    if isinstance(source, LocalVectorStore):
+        return source._get_collection(collection_name).meta["properties"]
+
+    response = source.transport.get("/v1/schema")
+    response.raise_for_status()
+    for class_obj in response.json().get("classes", []):
+        if class_obj["class"] == collection_name:
+            return [{"name": prop["name"], "dataType": prop.get("dataType", ["text"])}
+                    for prop in class_obj.get("properties", [])]
+    raise KeyError(f"Collection {collection_name} does not exist")
+
+
+def import_to_store(snapshot: Snapshot,
+                    target: Any,
+                    collection_name: Optional[str] = None,
+                    batch_size: int = IMPORT_BATCH_SIZE,
+                    workers: int = 4) -> Dict[str, Any]:
+    """
+    Load a snapshot into a WeaviateCloudClient or LocalVectorStore collection.
+
+    The collection is created from the snapshot's property definitions if it does not
+    exist. Objects keep their IDs, so an interrupted import into Weaviate can be rerun.
+
+    Args:
+        snapshot: The snapshot to load.
+        target: A WeaviateCloudClient or LocalVectorStore.
+        collection_name: Name of the target collection. Defaults to the exported name.
+        batch_size: Number of objects per batch request.
+        workers: Maximum number of batch requests in flight (Weaviate only).
+
+    Returns:
+        Dict with the IDs of the inserted objects ("ids") and a list of failures ("errors").
+    """
+    name = collection_name or snapshot.collection_name
+    if name not in target.list_collections():
+        if isinstance(target, LocalVectorStore):
+            target.create_collection(name, snapshot.properties, dimensions=snapshot.dimensions)
+        else:
+            target.create_collection(name, snapshot.properties)
+
+    if isinstance(target, LocalVectorStore):
+        # Skip per-object parsing: normalize each block and append it in one write
+        collection = target._get_collection(name)
+        ids: List[str] = []
+        for batch_ids, rows, vectors in snapshot.batches(batch_size):
+            ids.extend(collection.add(list(zip(batch_ids, rows, normalize_rows(vectors)))))
+        result = {"ids": ids, "errors": []}
+    else:
+        objects = ({"id": object_id, "properties": properties, "vector": vector}
+                   for batch_ids, rows, vectors in snapshot.batches(batch_size)
+                   for object_id, properties, vector in zip(batch_ids, rows, vectors))
+        result = target.insert_objects_batch(name, objects, batch_size=batch_size, workers=workers)
+
+    logger.info(f"Imported {len(result['ids'])} objects from {snapshot.path} into {name} "
+                f"({len(result['errors'])} errors)")
+    return result
+
+
+def import_to_chroma(snapshot: Snapshot,
+                     collection: Any,
+                     batch_size: int = CHROMA_BATCH_SIZE,
+                     document_property: Optional[str] = None) -> int:
+    """
+    Load a snapshot into a Chroma collection with its own embeddings.
+
+    Args:
+        snapshot: The snapshot to load.
+        collection: A chromadb Collection.
+        batch_size: Number of records per add() call.
+        document_property: Property stored as the Chroma document. The other properties
+            are stored as metadata.
+
+    Returns:
+        The number of records added.
+    """
+    added = 0
+    for ids, rows, vectors in snapshot.batches(batch_size):
+        documents = [row.pop(document_property, None) or "" for row in rows] if document_property else None
+        metadatas = [chroma_metadata(row) for row in rows]
+        collection.add(ids=ids,
+                       embeddings=vectors,
+                       documents=documents,
+                       metadatas=metadatas if any(metadatas) else None)
+        added += len(ids)
+
+    logger.info(f"Imported {added} records from {snapshot.path} into Chroma collection {collection.name}")
+    return added
+
+
+def chroma_metadata(properties: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Convert object properties to Chroma metadata, which only holds scalar values.
+
+    Null values are dropped and lists or objects are stored as JSON strings.
+    """
+    metadata = {}
+    for key, value in properties.items():
+        if value is None:
+            continue
+        metadata[key] = value if isinstance(value, (str, int, float, bool)) else json.dumps(value)
+    return metadata or None
+
+
+def import_to_faiss(snapshot: Snapshot,
+                    index: Optional[faiss.Index] = None,
+                    normalize: bool = False,
+                    batch_size: int = FAISS_BATCH_ROWS) -> faiss.Index:
+    """
+    Add the vectors of a snapshot to a FAISS index.
+
+    Each block of rows is passed to FAISS as a view into the memory map, so no copy is
+    made unless normalize is set. Row i of the index is snapshot.ids()[i].
+
+    Args:
+        snapshot: The snapshot to load.
+        index: The index to add to. If None, an IndexFlatIP is created.
+        normalize: Whether to L2-normalize the vectors, for cosine similarity.
+        batch_size: Number of rows per add() call.
+
+    Returns:
+        The index.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1.")
+    if index is None:
+        index = faiss.IndexFlatIP(snapshot.dimensions)
+    elif snapshot.count and index.d != snapshot.dimensions:
+        raise ValueError(f"Index has {index.d} dimensions, snapshot has {snapshot.dimensions}.")
+
+    if snapshot.count and not index.is_trained:
+        sample = snapshot.vectors[:FAISS_BATCH_ROWS]
+        index.train(normalize_rows(sample) if normalize else sample)
+    for start in range(0, snapshot.count, batch_size):
+        vectors = snapshot.vectors[start:start + batch_size]
+        index.add(normalize_rows(vectors) if normalize else vectors)
+
+    logger.info(f"Added {snapshot.count} vectors from {snapshot.path} to a FAISS index")
+    return index
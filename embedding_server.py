@@ -0,0 +1,635 @@
+"""
+Embedding Server
+
+This module provides EmbeddingServer, a local daemon that loads an embedding model
+once and serves every process on the machine over a Unix socket, and EmbeddingClient,
+which plugs in wherever LocalEmbedder is used (encode_many, get_embedding, dimensions)
+and also has the LangChain embeddings methods (embed_documents, embed_query), so it
+can replace HuggingFaceEmbeddings in a Chroma vector store.
+
+Concurrent requests from all clients are merged into micro-batches: the batcher takes
+the first waiting request, adds the requests that arrive within max_wait seconds, up
+to max_batch texts, and encodes them in one model call. A lone query waits at most
+max_wait longer than it would on its own; under load the model sees full batches.
+
+Requests and responses are length-prefixed JSON frames. Vectors are not sent over
+the socket: each client connection owns a shared memory buffer (a memory-mapped file
+in /dev/shm), named in its requests, and the server writes the float32 vectors
+straight into it. The server must run as the same user as its clients.
+
+Usage:
+    # Once per machine
+    python embedding_server.py --socket /tmp/embedding_server.sock --cache-dir .embedding_cache
+
+    # In every process
+    from embedding_server import EmbeddingClient
+
+    embedder = EmbeddingClient("/tmp/embedding_server.sock")
+    vectors = embedder.encode_many(texts)
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import socket
+import struct
+import logging
+import uuid
+import mmap
+import weakref
+import argparse
+import tempfile
+import threading
+import socketserver
+import numpy as np
+from concurrent.futures import Future
+from typing import Dict, List, Any, Callable, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET = "/tmp/embedding_server.sock"
+
+# Frames are a 4-byte big-endian length followed by that many bytes of JSON
+FRAME_HEADER = struct.Struct("!I")
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+
+# Smallest shared memory buffer a client allocates: 64 vectors of 768 dimensions
+MIN_BUFFER_BYTES = 64 * 768 * 4
+
+# Client buffers are files in a RAM-backed directory where there is one
+SHARED_MEMORY_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+BUFFER_PREFIX = "embedding-buffer-"
+
+
+def send_frame(sock: socket.socket, payload: Dict[str, Any]) -> None:
+    """
+    Send one JSON frame.
+    """
+    data = json.dumps(payload).encode("utf-8")
+    sock.sendall(FRAME_HEADER.pack(len(data)) + data)
+
+
+def recv_frame(sock: socket.socket) -> Optional[Dict[str, Any]]:
+    """
+    Receive one JSON frame, or None if the peer closed the connection between frames.
+    """
+    header = _recv_exact(sock, FRAME_HEADER.size)
+    if header is None:
+        return None
+    (size,) = FRAME_HEADER.unpack(header)
+    if size > MAX_FRAME_BYTES:
+        raise ValueError(f"Frame of {size} bytes exceeds the limit of {MAX_FRAME_BYTES}")
+    data = _recv_exact(sock, size)
+    if data is None:
+        raise ConnectionError("Connection closed in the middle of a frame")
+    return json.loads(data)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = sock.recv(size - len(buffer))
+        if not chunk:
+            if buffer:
+                raise ConnectionError("Connection closed in the middle of a frame")
+            return None
+        buffer += chunk
+    return bytes(buffer)
+
+
+class SharedBuffer:
+    """
+    A memory-mapped file in SHARED_MEMORY_DIR, which both the client and the server map.
+
+    Plain files are used rather than multiprocessing.shared_memory, whose resource
+    tracker would unlink a client's buffer when a server in the same process tree exits.
+    """
+
+    def __init__(self, name: str, size: Optional[int] = None):
+        """
+        Map a buffer, creating it if a size is given.
+
+        Args:
+            name: File name of the buffer; must start with BUFFER_PREFIX.
+            size: Size in bytes of a new buffer. None maps an existing one.
+        """
+        if os.path.basename(name) != name or not name.startswith(BUFFER_PREFIX):
+            raise ValueError(f"Invalid buffer name {name!r}")
+
+        self.name = name
+        self.path = os.path.join(SHARED_MEMORY_DIR, name)
+        if size is None:
+            fd = os.open(self.path, os.O_RDWR)
+        else:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o600)
+        try:
+            if size is not None:
+                os.ftruncate(fd, size)
+            self.size = os.fstat(fd).st_size
+            self.map = mmap.mmap(fd, self.size)
+        finally:
+            os.close(fd)
+
+    @classmethod
+    def create(cls, size: int) -> "SharedBuffer":
+        return cls(f"{BUFFER_PREFIX}{os.getpid()}-{uuid.uuid4().hex[:12]}", size)
+
+    def array(self, rows: int, dimensions: int) -> np.ndarray:
+        """A float32 (rows, dimensions) view of the start of the buffer."""
+        return np.ndarray((rows, dimensions), dtype=np.float32, buffer=self.map)
+
+    def close(self) -> None:
+        self.map.close()
+
+    def unlink(self) -> None:
+        _remove_file(self.path)
+
+
+def _remove_file(path: str) -> None:
+    if os.path.exists(path):
+        os.remove(path)
+
+
+class MicroBatcher:
+    """
+    Merges concurrent encode requests into batches, encoded one at a time on a worker thread.
+    """
+
+    def __init__(self, encode: Callable[[List[str]], np.ndarray], max_batch: int = 64, max_wait: float = 0.002):
+        """
+        Initialize the batcher and start its worker thread.
+
+        Args:
+            encode: Encodes a list of texts into a 2-D array, e.g. LocalEmbedder.encode_many.
+            max_batch: Number of texts at which a batch is encoded without waiting further.
+            max_wait: Maximum time in seconds a batch waits for more requests after its first.
+        """
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1.")
+
+        self.encode = encode
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.requests = 0
+        self.batches = 0
+        self.texts = 0
+        self._stopped = False
+        self._queue: "queue.Queue[Optional[Tuple[List[str], Future]]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, texts: List[str]) -> Future:
+        """
+        Queue texts for encoding.
+
+        Returns:
+            Future resolving to the float32 vectors of the texts, in order.
+        """
+        if self._stopped:
+            raise RuntimeError("The embedding server is shutting down")
+        future: Future = Future()
+        self._queue.put((texts, future))
+        return future
+
+    def stop(self) -> None:
+        """
+        Encode the requests already queued, then stop the worker thread.
+        """
+        self._stopped = True
+        self._queue.put(None)
+        self._thread.join(timeout=30)
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            count = len(item[0])
+            deadline = time.monotonic() + self.max_wait
+            while count < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    # Requests already waiting are taken even once the deadline has passed
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+                count += len(item[0])
+            self._encode(batch)
+
+        # Requests that raced with stop()
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item[1].set_exception(RuntimeError("The embedding server is shutting down"))
+
+    def _encode(self, batch: List[Tuple[List[str], Future]]) -> None:
+        texts = [text for request_texts, _ in batch for text in request_texts]
+        try:
+            vectors = np.asarray(self.encode(texts), dtype=np.float32) if texts else np.zeros((0, 0), dtype=np.float32)
+        except Exception as e:
+            logger.error(f"Encoding a batch of {len(texts)} texts failed: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        self.requests += len(batch)
+        self.batches += 1
+        self.texts += len(texts)
+        start = 0
+        for request_texts, future in batch:
+            future.set_result(vectors[start:start + len(request_texts)])
+            start += len(request_texts)
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+class _EmbeddingHandler(socketserver.BaseRequestHandler):
+    """
+    Serves the requests of one client connection, in order.
+    """
+
+    def handle(self) -> None:
+        server: EmbeddingServer = self.server.embedding_server
+        self.buffer: Optional[SharedBuffer] = None
+        server.connections.add(self.request)
+        try:
+            while True:
+                request = recv_frame(self.request)
+                if request is None:
+                    break
+                try:
+                    response = server.respond(request, self)
+                except Exception as e:
+                    response = {"error": str(e)}
+                send_frame(self.request, response)
+        except (ConnectionError, OSError, ValueError) as e:
+            logger.debug(f"Embedding client connection closed: {e}")
+        finally:
+            server.connections.discard(self.request)
+            if self.buffer is not None:
+                self.buffer.close()
+
+    def attach(self, name: str) -> SharedBuffer:
+        """Return the connection's shared memory buffer, attaching again if the client replaced it."""
+        if self.buffer is None or self.buffer.name != name:
+            if self.buffer is not None:
+                self.buffer.close()
+            self.buffer = SharedBuffer(name)
+        return self.buffer
+
+
+class EmbeddingServer:
+    """
+    Local embedding daemon: one model, shared by every client through a Unix socket.
+    """
+
+    def __init__(self,
+                 socket_path: str = DEFAULT_SOCKET,
+                 embedder: Optional[Any] = None,
+                 model_name: str = "all-MiniLM-L6-v2",
+                 cache_dir: Optional[str] = None,
+                 max_batch: int = 64,
+                 max_wait: float = 0.002):
+        """
+        Initialize the server and load the model. It starts listening on start() or
+        when used as a context manager.
+
+        Args:
+            socket_path: Path of the Unix socket.
+            embedder: Object with encode_many(texts) and dimensions. Defaults to a
+                LocalEmbedder for model_name.
+            model_name: The sentence-transformers model to load when no embedder is given.
+            cache_dir: Directory for LocalEmbedder's persistent embedding cache. Only this
+                process writes to it, so one cache serves all clients.
+            max_batch: Number of texts at which a batch is encoded without waiting further.
+            max_wait: Maximum time in seconds a request waits for others to join its batch.
+        """
+        if embedder is None:
+            from local_embedder import LocalEmbedder
+            embedder = LocalEmbedder(model_name, cache_dir=cache_dir, batch_size=max_batch)
+
+        self.socket_path = socket_path
+        self.embedder = embedder
+        self.model_name = getattr(embedder, "model_name", model_name)
+        self.dimensions = int(embedder.dimensions)
+        self.batcher = MicroBatcher(embedder.encode_many, max_batch, max_wait)
+        # Sockets of the open client connections, closed by stop()
+        self.connections: Set[socket.socket] = set()
+        self._server: Optional[_UnixServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "EmbeddingServer":
+        """
+        Start serving on a background thread.
+
+        Raises:
+            RuntimeError: If another server is already listening on the socket.
+        """
+        if os.path.exists(self.socket_path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.socket_path)
+            except OSError:
+                # Left behind by a server that did not shut down cleanly
+                os.remove(self.socket_path)
+            else:
+                raise RuntimeError(f"An embedding server is already listening on {self.socket_path}")
+            finally:
+                probe.close()
+
+        self._server = _UnixServer(self.socket_path, _EmbeddingHandler)
+        self._server.embedding_server = self
+        self._thread = threading.Thread(target=self._server.serve_forever, name="embedding-server", daemon=True)
+        self._thread.start()
+        logger.info(f"Embedding server for {self.model_name} listening on {self.socket_path}")
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop serving, close the client connections, remove the socket and stop the batcher.
+
+        Clients reconnect on their next request, e.g. to a restarted server.
+        """
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            for connection in list(self.connections):
+                try:
+                    connection.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+            _remove_file(self.socket_path)
+        self.batcher.stop()
+
+    def __enter__(self) -> "EmbeddingServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def serve_forever(self) -> None:
+        """
+        Serve until interrupted.
+        """
+        self.start()
+        try:
+            while self._thread.is_alive():
+                self._thread.join(1.0)
+        except KeyboardInterrupt:
+            logger.info("Shutting down the embedding server")
+        finally:
+            self.stop()
+
+    def respond(self, request: Dict[str, Any], connection: _EmbeddingHandler) -> Dict[str, Any]:
+        """
+        Answer one request: "info", "stats", or "encode" with "texts" and the "buffer" to
+        write the vectors into.
+        """
+        op = request.get("op")
+        if op == "info":
+            return {"model_name": self.model_name, "dimensions": self.dimensions}
+        if op == "stats":
+            return self.stats()
+        if op != "encode":
+            return {"error": f"Unknown op {op!r}"}
+
+        texts = request.get("texts") or []
+        if not all(isinstance(text, str) for text in texts):
+            return {"error": "texts must be a list of strings"}
+        vectors = self.batcher.submit(list(texts)).result()
+        buffer = connection.attach(request["buffer"])
+        if buffer.size < vectors.nbytes:
+            return {"error": f"Buffer of {buffer.size} bytes cannot hold {vectors.nbytes} bytes of vectors"}
+        buffer.array(*vectors.shape)[:] = vectors
+        return {"rows": len(vectors)}
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the request and batch counters.
+        """
+        batcher = self.batcher
+        return {
+            "requests": batcher.requests,
+            "batches": batcher.batches,
+            "texts": batcher.texts,
+            "mean_batch_texts": round(batcher.texts / batcher.batches, 3) if batcher.batches else 0.0
+        }
+
+
+class _Connection:
+    """
+    One client connection to the server, with its shared memory buffer.
+    """
+
+    def __init__(self, socket_path: str, timeout: float, connect_timeout: float):
+        deadline = time.monotonic() + connect_timeout
+        delay = 0.05
+        while True:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                self.sock.connect(socket_path)
+                break
+            except OSError as e:
+                self.sock.close()
+                # The server may still be loading its model
+                if time.monotonic() + delay > deadline:
+                    raise ConnectionError(f"Cannot connect to the embedding server at {socket_path}: {e}") from e
+                time.sleep(delay)
+                delay = min(delay * 2, 1.0)
+        self.sock.settimeout(timeout)
+        self.buffer: Optional[SharedBuffer] = None
+
+    def request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        send_frame(self.sock, payload)
+        response = recv_frame(self.sock)
+        if response is None:
+            raise ConnectionError("The embedding server closed the connection")
+        if "error" in response:
+            raise RuntimeError(f"Embedding server error: {response['error']}")
+        return response
+
+    def reserve(self, nbytes: int) -> SharedBuffer:
+        """Return a buffer of at least nbytes, replacing the current one if it is too small."""
+        if self.buffer is None or self.buffer.size < nbytes:
+            size = max(nbytes, MIN_BUFFER_BYTES, 2 * self.buffer.size if self.buffer is not None else 0)
+            self.release()
+            self.buffer = SharedBuffer.create(size)
+            # Removed at exit if the client is never closed
+            self._finalizer = weakref.finalize(self, _remove_file, self.buffer.path)
+        return self.buffer
+
+    def release(self) -> None:
+        if self.buffer is not None:
+            self._finalizer.detach()
+            self.buffer.close()
+            self.buffer.unlink()
+            self.buffer = None
+
+    def close(self) -> None:
+        self.sock.close()
+        self.release()
+
+
+class EmbeddingClient:
+    """
+    Client of an EmbeddingServer with the methods of LocalEmbedder and LangChain embeddings.
+
+    Thread-safe: each thread has its own connection, so requests from the threads of one
+    process are batched together by the server like requests from separate processes.
+    """
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET, timeout: float = 60.0, connect_timeout: float = 30.0):
+        """
+        Connect to the server and read the model name and dimensions.
+
+        Args:
+            socket_path: Path of the server's Unix socket.
+            timeout: Maximum time in seconds to wait for a response.
+            connect_timeout: Maximum time in seconds to wait for the server to accept
+                connections, e.g. while it loads its model.
+        """
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self._local = threading.local()
+        self._connections: List[_Connection] = []
+        self._lock = threading.Lock()
+
+        info, _ = self._request({"op": "info"})
+        self.model_name: str = info["model_name"]
+        self.dimensions: int = info["dimensions"]
+        # For code written against LocalEmbedder; the server keeps the cache
+        self.cache = None
+
+    def _connection(self) -> _Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = _Connection(self.socket_path, self.timeout, self.connect_timeout)
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def _drop_connection(self) -> None:
+        connection = self._local.__dict__.pop("connection", None)
+        if connection is not None:
+            connection.close()
+            with self._lock:
+                self._connections.remove(connection)
+
+    def _request(self, payload: Dict[str, Any], nbytes: int = 0) -> Tuple[Dict[str, Any], _Connection]:
+        """
+        Send a request on this thread's connection, reconnecting once if the server restarted.
+
+        With nbytes, the connection's shared memory buffer is grown to hold that many bytes
+        of vectors and named in the request.
+        """
+        for attempt in range(2):
+            connection = self._connection()
+            try:
+                if nbytes:
+                    payload = {**payload, "buffer": connection.reserve(nbytes).name}
+                return connection.request(payload), connection
+            except (ConnectionError, OSError) as e:
+                self._drop_connection()
+                if attempt:
+                    raise
+                logger.warning(f"Embedding server connection lost: {e}. Reconnecting")
+        raise AssertionError("not reached")
+
+    def get_embedding(self, text: str) -> np.ndarray:
+        """
+        Get the embedding of a single text.
+        """
+        return self.encode_many([text])[0]
+
+    def encode_many(self, texts: Sequence[str], show_progress_bar: bool = False) -> np.ndarray:
+        """
+        Get normalized embeddings for many texts from the server.
+
+        Args:
+            texts: The texts to embed.
+            show_progress_bar: Accepted for compatibility with LocalEmbedder; unused.
+
+        Returns:
+            Array of shape (len(texts), dimensions) with float32 embeddings.
+        """
+        if not len(texts):
+            return np.zeros((0, self.dimensions), dtype=np.float32)
+
+        response, connection = self._request({"op": "encode", "texts": list(texts)},
+                                             len(texts) * self.dimensions * 4)
+        # Copied out, since the next request on this connection reuses the buffer
+        return connection.buffer.array(response["rows"], self.dimensions).copy()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed documents, as LangChain embeddings do.
+        """
+        return self.encode_many(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a query, as LangChain embeddings do.
+        """
+        return self.get_embedding(text).tolist()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the server's request and batch counters.
+        """
+        return self._request({"op": "stats"})[0]
+
+    def close(self) -> None:
+        """
+        Close every connection and free the shared memory buffers.
+        """
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
+
+    def __enter__(self) -> "EmbeddingClient":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve a sentence-transformers model to local processes over a Unix socket.")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Path of the Unix socket.")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2", help="The sentence-transformers model to load.")
+    parser.add_argument("--cache-dir", default=None, help="Directory for the persistent embedding cache.")
+    parser.add_argument("--max-batch", type=int, default=64, help="Texts per batch at which encoding starts at once.")
+    parser.add_argument("--max-wait-ms", type=float, default=2.0,
+                        help="Maximum time a request waits for others to join its batch, in milliseconds.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    args = parse_args(argv)
+    server = EmbeddingServer(args.socket, model_name=args.model, cache_dir=args.cache_dir,
+                             max_batch=args.max_batch, max_wait=args.max_wait_ms / 1000)
+    server.serve_forever()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
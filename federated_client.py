@@ -0,0 +1,453 @@
+"""
+Federated Weaviate Client
+
+This module provides FederatedWeaviateClient, which searches a collection that is split
+across several Weaviate clusters (shards) as if it were one. Each search is sent to
+every shard concurrently and the per-shard top-k lists are merged into one top-k by
+score: distance for text and vector searches, the fused score for hybrid searches.
+
+Stragglers are handled in three ways:
+
+- hedging: when a shard has not answered after its usual latency (the 95th percentile
+  of its recent requests), the same request is sent again, to the shard's next replica
+  if it has several clients, and whichever copy answers first is used
+- quorum: a search can return as soon as `quorum` shards have answered, so its latency
+  tracks the fastest shards instead of the slowest one
+- timeout: shards that have not answered by the deadline are left out
+
+A search always returns what it has. The result is a list of hits like the one
+WeaviateCloudClient returns, with each hit's shard under "_additional", and a `shards`
+attribute reporting per shard whether it answered, failed or was left out.
+
+Scores are compared across shards as they are. Distances and relative scores are
+comparable when the shards use the same model; ranked (RRF) fusion scores only
+depend on rank, so merging them interleaves the shards' rankings.
+
+Usage:
+    from weaviate_client_v4 import WeaviateCloudClient
+    from federated_client import FederatedWeaviateClient
+
+    federated = FederatedWeaviateClient({
+        "eu": WeaviateCloudClient(url=eu_url, api_key=eu_key),
+        "us": [WeaviateCloudClient(url=us_url, api_key=us_key),
+               WeaviateCloudClient(url=us_replica_url, api_key=us_key)]
+    }, timeout=1.0)
+    federated.connect()
+    hits = federated.search_objects("Article", "vector databases", properties=["title"])
+    print(hits, hits.shards)
+    federated.close()
+"""
+
+import time
+import heapq
+import logging
+import threading
+import numpy as np
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from itertools import count
+from typing import Dict, List, Any, Callable, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Seconds a search waits for the shards before returning partial results
+DEFAULT_TIMEOUT = 2.0
+
+# Hedge delay, in seconds, for shards with too few latency samples to estimate it
+DEFAULT_HEDGE_DELAY = 0.1
+
+# Shortest hedge delay in seconds, so fast shards are not hedged on every request
+MIN_HEDGE_DELAY = 0.005
+
+# Recent request latencies kept per shard, and the number needed before the hedge
+# delay is taken from them
+LATENCY_WINDOW = 200
+MIN_LATENCY_SAMPLES = 20
+
+
+class FederatedResults(list):
+    """
+    Merged hits of a federated search, best first.
+
+    Attributes:
+        shards: Status of each shard: "status" is "ok", "error", "timeout" (no answer by
+            the deadline) or "late" (still running when the quorum was reached), with
+            "latency_ms", "attempts" and, for errors, "error".
+    """
+
+    def __init__(self, hits: List[Dict[str, Any]], shards: Dict[str, Dict[str, Any]]):
+        super().__init__(hits)
+        self.shards = shards
+
+    @property
+    def partial(self) -> bool:
+        """Whether any shard is missing from the results."""
+        return any(status["status"] != "ok" for status in self.shards.values())
+
+
+def hit_score(hit: Dict[str, Any]) -> float:
+    """
+    Return a score for a hit where higher is better: the negated distance, the
+    certainty or the score under "_additional", whichever is present.
+    """
+    additional = hit.get("_additional") or {}
+    if additional.get("distance") is not None:
+        return -float(additional["distance"])
+    if additional.get("certainty") is not None:
+        return float(additional["certainty"])
+    if additional.get("score") is not None:
+        # GraphQL returns hybrid scores as strings
+        return float(additional["score"])
+    return float("-inf")
+
+
+def merge_hits(results: Dict[str, List[Dict[str, Any]]], limit: int) -> List[Dict[str, Any]]:
+    """
+    Merge the hits of several shards into one top-`limit` list by score.
+
+    Objects found on several shards (replicated data) are kept once, with their best
+    score. Each hit is copied with its shard name added under "_additional".
+    """
+    best: Dict[Any, Tuple[float, Dict[str, Any]]] = {}
+    for shard, hits in results.items():
+        for hit in hits:
+            additional = {**(hit.get("_additional") or {}), "shard": shard}
+            hit = {**hit, "_additional": additional}
+            key = additional.get("id") or (shard, len(best))
+            score = hit_score(hit)
+            if key not in best or score > best[key][0]:
+                best[key] = (score, hit)
+    return [hit for _, hit in heapq.nlargest(limit, best.values(), key=lambda entry: entry[0])]
+
+
+class FederatedWeaviateClient:
+    """
+    Scatter-gather client over several WeaviateCloudClient shards.
+    """
+
+    def __init__(self,
+                 shards: Dict[str, Union[Any, List[Any]]],
+                 timeout: float = DEFAULT_TIMEOUT,
+                 quorum: Optional[int] = None,
+                 hedge_after: Optional[float] = None,
+                 hedge_percentile: float = 95,
+                 max_hedges: int = 1,
+                 max_workers: Optional[int] = None):
+        """
+        Initialize the client.
+
+        Args:
+            shards: Client per shard name. A list of clients for a shard holds replicas of
+                the same data; requests rotate over them and hedges go to the next one.
+                LocalVectorStore works as a shard as well as WeaviateCloudClient.
+            timeout: Seconds a search waits for the shards before returning without the
+                ones that have not answered.
+            quorum: Number of shards after whose answers a search returns, without
+                waiting for the rest. Defaults to all shards.
+            hedge_after: Seconds after which a request to a shard is hedged. If None, it
+                is the shard's hedge_percentile latency over its recent requests.
+            hedge_percentile: Latency percentile used as the hedge delay.
+            max_hedges: Maximum number of extra requests per shard and search. 0 disables
+                hedging. Failed requests are retried within the same budget.
+            max_workers: Maximum number of requests in flight across all shards.
+        """
+        if not shards:
+            raise ValueError("At least one shard is required.")
+        if timeout <= 0:
+            raise ValueError("timeout must be positive.")
+        if quorum is not None and not 1 <= quorum <= len(shards):
+            raise ValueError(f"quorum must be between 1 and {len(shards)}.")
+        if max_hedges < 0:
+            raise ValueError("max_hedges must not be negative.")
+
+        self.shards: Dict[str, List[Any]] = {
+            name: list(clients) if isinstance(clients, (list, tuple)) else [clients]
+            for name, clients in shards.items()
+        }
+        if not all(self.shards.values()):
+            raise ValueError("Every shard needs at least one client.")
+        self.timeout = timeout
+        self.quorum = quorum or len(self.shards)
+        self.hedge_after = hedge_after
+        self.hedge_percentile = hedge_percentile
+        self.max_hedges = max_hedges
+
+        # Abandoned requests keep their thread until the client call returns, so leave room for them
+        replicas = sum(len(clients) for clients in self.shards.values())
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or 4 * replicas * (1 + max_hedges),
+                                            thread_name_prefix="federated")
+        self._lock = threading.RLock()
+        self._rotation = {name: count() for name in self.shards}
+        self._latencies = {name: deque(maxlen=LATENCY_WINDOW) for name in self.shards}
+        self._counters = {name: {"requests": 0, "hedges": 0, "hedge_wins": 0, "errors": 0, "timeouts": 0}
+                          for name in self.shards}
+
+        logger.info(f"Initialized federated client over {len(self.shards)} shards "
+                    f"({replicas} clients, quorum {self.quorum})")
+
+    def connect(self) -> bool:
+        """
+        Connect every client concurrently.
+
+        Returns:
+            True once all clients are connected.
+        """
+        clients = [client for replicas in self.shards.values() for client in replicas]
+        for future in [self._executor.submit(client.connect) for client in clients]:
+            future.result()
+        logger.info(f"Connected federated client to {len(clients)} clients")
+        return True
+
+    def close(self) -> None:
+        """
+        Close every client and stop the request threads.
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for replicas in self.shards.values():
+            for client in replicas:
+                try:
+                    client.close()
+                except Exception as e:
+                    logger.error(f"Failed to close shard client: {e}", exc_info=True)
+
+    def list_collections(self, timeout: Optional[float] = None) -> List[str]:
+        """
+        List the collections found on any shard that answered.
+        """
+        results, _ = self._scatter("list_collections", lambda client: client.list_collections(), timeout, None)
+        return sorted({name for names in results.values() for name in names})
+
+    def search_objects(self,
+                       collection_name: str,
+                       query: str,
+                       properties: List[str] = None,
+                       limit: int = 10,
+                       where: Optional[Dict[str, Any]] = None,
+                       timeout: Optional[float] = None,
+                       quorum: Optional[int] = None) -> FederatedResults:
+        """
+        Search every shard using a text query and merge the results by distance.
+
+        Args:
+            collection_name: The name of the collection.
+            query: The search query.
+            properties: List of properties to return.
+            limit: Maximum number of objects to return.
+            where: Filter on properties, applied by each shard before its search.
+            timeout: Overrides the client's timeout for this search.
+            quorum: Overrides the client's quorum for this search.
+
+        Returns:
+            The best `limit` objects across the shards that answered, best first.
+        """
+        return self._search("search_objects",
+                            lambda client: client.search_objects(collection_name, query, properties, limit, where),
+                            limit, timeout, quorum)
+
+    def search_by_vector(self,
+                         collection_name: str,
+                         vector: Any,
+                         properties: List[str] = None,
+                         limit: int = 10,
+                         where: Optional[Dict[str, Any]] = None,
+                         timeout: Optional[float] = None,
+                         quorum: Optional[int] = None) -> FederatedResults:
+        """
+        Search every shard for the objects nearest to a query vector and merge the results by distance.
+
+        Args:
+            collection_name: The name of the collection.
+            vector: The query vector, as a list or a NumPy array.
+            properties: List of properties to return.
+            limit: Maximum number of objects to return.
+            where: Filter on properties, applied by each shard before its search.
+            timeout: Overrides the client's timeout for this search.
+            quorum: Overrides the client's quorum for this search.
+
+        Returns:
+            The nearest `limit` objects across the shards that answered.
+        """
+        return self._search("search_by_vector",
+                            lambda client: client.search_by_vector(collection_name, vector, properties, limit, where),
+                            limit, timeout, quorum)
+
+    def hybrid_search(self,
+                      collection_name: str,
+                      query: str,
+                      properties: List[str] = None,
+                      limit: int = 10,
+                      alpha: float = 0.5,
+                      fusion: str = "rrf",
+                      where: Optional[Dict[str, Any]] = None,
+                      vector: Optional[Any] = None,
+                      timeout: Optional[float] = None,
+                      quorum: Optional[int] = None) -> FederatedResults:
+        """
+        Run a hybrid search on every shard and merge the results by fused score.
+
+        Args:
+            collection_name: The name of the collection.
+            query: The search query.
+            properties: List of properties to return.
+            limit: Maximum number of objects to return.
+            alpha: Weight of the vector search, from 0 (keyword only) to 1 (vector only).
+            fusion: "rrf" (ranked fusion) or "relative_score" (relative score fusion).
+            where: Filter on properties, applied by each shard to both searches.
+            vector: Query vector, for collections without a vectorizer.
+            timeout: Overrides the client's timeout for this search.
+            quorum: Overrides the client's quorum for this search.
+
+        Returns:
+            The best `limit` objects across the shards that answered.
+        """
+        return self._search("hybrid_search",
+                            lambda client: client.hybrid_search(collection_name, query, properties, limit,
+                                                                alpha, fusion, where, vector),
+                            limit, timeout, quorum)
+
+    def shard_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get request counters and latency percentiles per shard.
+
+        Returns:
+            Dict per shard with "requests", "hedges", "hedge_wins" (hedges that answered
+            first), "errors", "timeouts", "p50_ms", "p95_ms" and the current "hedge_delay_ms".
+        """
+        stats = {}
+        with self._lock:
+            for name, counters in self._counters.items():
+                latencies = np.array(self._latencies[name]) * 1000
+                stats[name] = {
+                    **counters,
+                    "p50_ms": round(float(np.percentile(latencies, 50)), 3) if len(latencies) else None,
+                    "p95_ms": round(float(np.percentile(latencies, 95)), 3) if len(latencies) else None,
+                    "hedge_delay_ms": round(self._hedge_delay(name) * 1000, 3)
+                }
+        return stats
+
+    def _search(self,
+                operation: str,
+                call: Callable[[Any], List[Dict[str, Any]]],
+                limit: int,
+                timeout: Optional[float],
+                quorum: Optional[int]) -> FederatedResults:
+        results, statuses = self._scatter(operation, call, timeout, quorum)
+        hits = merge_hits(results, limit)
+        missing = [name for name, status in statuses.items() if status["status"] != "ok"]
+        if missing:
+            logger.warning(f"{operation} returned partial results without shards {missing}")
+        return FederatedResults(hits, statuses)
+
+    def _scatter(self,
+                 operation: str,
+                 call: Callable[[Any], Any],
+                 timeout: Optional[float],
+                 quorum: Optional[int]) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+        """
+        Send a call to every shard and collect the answers until the quorum or the deadline.
+
+        Returns:
+            The results of the shards that answered, and the status of every shard.
+        """
+        start = time.monotonic()
+        deadline = start + (timeout or self.timeout)
+        quorum = min(quorum or self.quorum, len(self.shards))
+
+        futures: Dict[Future, Tuple[str, int]] = {}
+        attempts = {name: 0 for name in self.shards}
+        first_replica = {name: next(self._rotation[name]) for name in self.shards}
+        results: Dict[str, Any] = {}
+        statuses: Dict[str, Dict[str, Any]] = {}
+
+        def send(name: str) -> None:
+            replicas = self.shards[name]
+            client = replicas[(first_replica[name] + attempts[name]) % len(replicas)]
+            futures[self._executor.submit(self._timed, name, call, client)] = (name, attempts[name])
+            attempts[name] += 1
+            with self._lock:
+                self._counters[name]["requests"] += 1
+                if attempts[name] > 1:
+                    self._counters[name]["hedges"] += 1
+
+        for name in self.shards:
+            send(name)
+        hedge_at = {name: start + self._hedge_delay(name) for name in self.shards} if self.max_hedges else {}
+
+        while len(statuses) < len(self.shards) and len(results) < quorum:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+
+            # Hedge the shards that are slower than usual
+            for name, at in list(hedge_at.items()):
+                if name in statuses or attempts[name] > self.max_hedges:
+                    del hedge_at[name]
+                elif now >= at:
+                    logger.debug(f"Hedging {operation} on shard {name} after {(now - start) * 1000:.1f} ms")
+                    send(name)
+                    hedge_at[name] = now + self._hedge_delay(name)
+
+            pending = [future for future, (name, _) in futures.items() if name not in statuses]
+            wake = min([deadline, *hedge_at.values()])
+            done, _ = wait(pending, timeout=max(0.0, wake - time.monotonic()), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                name, attempt = futures.pop(future)
+                if name in statuses:
+                    continue
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    logger.warning(f"{operation} failed on shard {name}: {e}")
+                    with self._lock:
+                        self._counters[name]["errors"] += 1
+                    # Retry on the next replica while the hedge budget lasts; otherwise give up
+                    # once no other request to the shard is still running
+                    if attempts[name] <= self.max_hedges and time.monotonic() < deadline:
+                        send(name)
+                    elif not any(other == name for other, _ in futures.values()):
+                        statuses[name] = self._status("error", start, attempts[name], str(e))
+                    continue
+                statuses[name] = self._status("ok", start, attempts[name])
+                if attempt:
+                    with self._lock:
+                        self._counters[name]["hedge_wins"] += 1
+
+        for name in self.shards:
+            if name not in statuses:
+                late = len(results) >= quorum and time.monotonic() < deadline
+                statuses[name] = self._status("late" if late else "timeout", start, attempts[name])
+                if not late:
+                    with self._lock:
+                        self._counters[name]["timeouts"] += 1
+        return results, statuses
+
+    def _timed(self, name: str, call: Callable[[Any], Any], client: Any) -> Any:
+        """
+        Run a call on one client, recording its latency for the shard's hedge delay.
+
+        Latencies of abandoned requests are recorded too, so a shard that keeps
+        straggling keeps a high percentile instead of looking fast.
+        """
+        start = time.monotonic()
+        try:
+            return call(client)
+        finally:
+            with self._lock:
+                self._latencies[name].append(time.monotonic() - start)
+
+    def _hedge_delay(self, name: str) -> float:
+        if self.hedge_after is not None:
+            return self.hedge_after
+        with self._lock:
+            latencies = list(self._latencies[name])
+        if len(latencies) < MIN_LATENCY_SAMPLES:
+            return DEFAULT_HEDGE_DELAY
+        return max(MIN_HEDGE_DELAY, float(np.percentile(latencies, self.hedge_percentile)))
+
+    @staticmethod
+    def _status(status: str, start: float, attempts: int, error: Optional[str] = None) -> Dict[str, Any]:
+        entry = {"status": status, "latency_ms": round((time.monotonic() - start) * 1000, 3), "attempts": attempts}
+        if error is not None:
+            entry["error"] = error
+        return entry
@@ -0,0 +1,581 @@
+"""
+Ingestion Pipeline
+
+This module provides a streaming pipeline that turns a directory of documents into
+embedded chunks in a vector store. Every stage is a generator, so only a bounded
+number of chunks is in memory at a time however large the directory is:
+
+    discover_files  -> paths of .txt/.md/.pdf files, in sorted order
+    extract_text    -> text segments: blocks of a text file, or pages of a PDF
+    chunk_segments  -> token-bounded chunks with overlap, with deterministic IDs
+    Deduplicator    -> drops exact and near-duplicate chunks (SimHash)
+    embed_chunks    -> embeddings computed in batches on a process pool
+    sink            -> bulk writes, e.g. insert_objects_batch or a Chroma collection
+
+The run is checkpointed after every write: files that were fully written are skipped
+on the next run (unless they changed), a partly written file resumes after its last
+written chunk, and the fingerprints of written chunks are restored so duplicates are
+still detected across runs.
+
+PDF extraction uses pypdf, which is optional; without it PDFs are skipped with a
+warning and picked up by a later run once it is installed.
+
+Usage:
+    from ingestion_pipeline import IngestionPipeline, vector_store_sink
+    from weaviate_client_v4 import WeaviateCloudClient
+
+    client = WeaviateCloudClient()
+    client.connect()
+    pipeline = IngestionPipeline(sink=vector_store_sink(client, "Document"), checkpoint_dir=".ingest_checkpoint")
+    print(pipeline.run("data"))
+"""
+
+import os
+import re
+import json
+import uuid
+import fnmatch
+import hashlib
+import logging
+import numpy as np
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, List, Any, Callable, Iterable, Iterator, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATTERNS = ("*.txt", "*.md", "*.pdf")
+
+# Namespace for chunk IDs, so the same chunk of the same file always gets the same ID
+CHUNK_NAMESPACE = uuid.UUID("6f1c2b1e-54f4-4f0e-9a51-2d0c8a8b7c3d")
+
+Segment = Dict[str, Any]
+Chunk = Dict[str, Any]
+Sink = Callable[[List[Chunk]], None]
+
+
+def discover_files(root: str, patterns: Sequence[str] = DEFAULT_PATTERNS) -> Iterator[str]:
+    """
+    Yield the files under a directory that match any of the patterns, in sorted order.
+    """
+    for directory, subdirectories, filenames in os.walk(root):
+        subdirectories.sort()
+        for filename in sorted(filenames):
+            if any(fnmatch.fnmatch(filename, pattern) for pattern in patterns):
+                yield os.path.join(directory, filename)
+
+
+def extract_text(paths: Iterable[str],
+                 block_size: int = 64 * 1024,
+                 failed: Optional[Set[str]] = None) -> Iterator[Segment]:
+    """
+    Yield the text of each file as segments.
+
+    Text files are read in blocks of about block_size characters, split at line ends;
+    PDFs are read one page at a time.
+
+    Args:
+        paths: The files to read.
+        block_size: Approximate number of characters per text file segment.
+        failed: If given, the paths of files that could not be read are added to it.
+
+    Yields:
+        Dicts with the "source" path, the "page" (1-based for PDFs, 0 for text) and the "text".
+    """
+    for path in paths:
+        try:
+            if path.lower().endswith(".pdf"):
+                yield from _extract_pdf(path)
+            else:
+                yield from _extract_text_file(path, block_size)
+        except ImportError:
+            logger.warning(f"Skipping {path}: install pypdf to ingest PDF files")
+            if failed is not None:
+                failed.add(path)
+        except Exception as e:
+            logger.error(f"Failed to extract text from {path}: {e}", exc_info=True)
+            if failed is not None:
+                failed.add(path)
+
+
+def _extract_text_file(path: str, block_size: int) -> Iterator[Segment]:
+    with open(path, encoding="utf-8", errors="replace") as f:
+        lines: List[str] = []
+        size = 0
+        for line in f:
+            lines.append(line)
+            size += len(line)
+            if size >= block_size:
+                yield {"source": path, "page": 0, "text": "".join(lines)}
+                lines, size = [], 0
+        if lines:
+            yield {"source": path, "page": 0, "text": "".join(lines)}
+
+
+def _extract_pdf(path: str) -> Iterator[Segment]:
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    for number, page in enumerate(reader.pages, start=1):
+        text = page.extract_text() or ""
+        if text.strip():
+            yield {"source": path, "page": number, "text": text}
+
+
+def word_token_lengths(words: List[str]) -> List[int]:
+    """
+    Count one token per word. Used when no tokenizer is given.
+    """
+    return [1] * len(words)
+
+
+def tokenizer_token_lengths(tokenizer: Any) -> Callable[[List[str]], List[int]]:
+    """
+    Build a token counter from a Hugging Face tokenizer, e.g. LocalEmbedder().model.tokenizer.
+
+    Words are tokenized in one batched call per segment.
+    """
+    def lengths(words: List[str]) -> List[int]:
+        if not words:
+            return []
+        encoded = tokenizer(words, add_special_tokens=False)["input_ids"]
+        return [max(1, len(ids)) for ids in encoded]
+    return lengths
+
+
+def chunk_id(source: str, index: int) -> str:
+    """
+    Return the deterministic ID of a chunk.
+    """
+    return str(uuid.uuid5(CHUNK_NAMESPACE, f"{source}\0{index}"))
+
+
+def chunk_segments(segments: Iterable[Segment],
+                   chunk_size: int = 256,
+                   overlap: int = 32,
+                   token_lengths: Callable[[List[str]], List[int]] = word_token_lengths) -> Iterator[Chunk]:
+    """
+    Split segments into chunks of at most chunk_size tokens, with `overlap` tokens
+    repeated at the start of the next chunk of the same file.
+
+    Chunks never span files, but do span the segments (blocks or pages) of one file.
+
+    Yields:
+        Dicts with the chunk "id", "text", "source", "page" where the chunk starts, and
+        "chunk" (its index within the file).
+    """
+    if chunk_size < 1 or not 0 <= overlap < chunk_size:
+        raise ValueError("chunk_size must be at least 1 and overlap must be in [0, chunk_size).")
+
+    source: Optional[str] = None
+    index = 0
+    # (word, tokens, page) of the text not yet emitted
+    buffer: deque = deque()
+    buffered_tokens = 0
+    # Whether the buffer holds words that are not just the overlap of the last chunk
+    fresh = False
+
+    def emit(final: bool) -> Iterator[Chunk]:
+        nonlocal index, buffered_tokens, fresh
+        while fresh and (buffered_tokens >= chunk_size or final):
+            words: List[Tuple[str, int, int]] = []
+            tokens = 0
+            for entry in buffer:
+                if words and tokens + entry[1] > chunk_size:
+                    break
+                words.append(entry)
+                tokens += entry[1]
+            yield {
+                "id": chunk_id(source, index),
+                "text": " ".join(word for word, _, _ in words),
+                "source": source,
+                "page": words[0][2],
+                "chunk": index
+            }
+            index += 1
+            fresh = len(words) < len(buffer)
+            if final and not fresh:
+                buffer.clear()
+                buffered_tokens = 0
+                return
+
+            # Drop the emitted words, keeping the last `overlap` tokens of them
+            kept = 0
+            keep_from = len(words)
+            while keep_from > 1 and kept + words[keep_from - 1][1] <= overlap:
+                keep_from -= 1
+                kept += words[keep_from][1]
+            for _ in range(keep_from):
+                buffered_tokens -= buffer.popleft()[1]
+
+    for segment in segments:
+        if segment["source"] != source:
+            if source is not None:
+                yield from emit(final=True)
+            source, index = segment["source"], 0
+            buffer.clear()
+            buffered_tokens = 0
+
+        words = segment["text"].split()
+        for word, tokens in zip(words, token_lengths(words)):
+            buffer.append((word, tokens, segment["page"]))
+            buffered_tokens += tokens
+            fresh = True
+        yield from emit(final=False)
+
+    if source is not None:
+        yield from emit(final=True)
+
+
+def simhash(text: str) -> int:
+    """
+    Return the 64-bit SimHash of a text's word 3-shingles.
+    """
+    words = re.findall(r"\w+", text.lower())
+    shingles = [" ".join(words[i:i + 3]) for i in range(max(1, len(words) - 2))]
+    hashes = np.frombuffer(
+        b"".join(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest() for shingle in shingles),
+        dtype="<u8"
+    )
+    bits = (hashes[:, None] >> np.arange(64, dtype=np.uint64)) & np.uint64(1)
+    # Each bit of the fingerprint is set if most shingles have it set
+    majority = bits.sum(axis=0) * 2 > len(shingles)
+    return int.from_bytes(np.packbits(majority, bitorder="little").tobytes(), "little")
+
+
+class Deduplicator:
+    """
+    Near-duplicate filter over SimHash fingerprints.
+
+    Fingerprints are split into four 16-bit bands. Two fingerprints within
+    max_distance <= 3 bits share at least one band, so each lookup only compares
+    against the fingerprints in the same four buckets.
+    """
+
+    def __init__(self, max_distance: int = 3):
+        if not 0 <= max_distance <= 3:
+            raise ValueError("max_distance must be between 0 and 3.")
+        self.max_distance = max_distance
+        self.bands: List[Dict[int, List[int]]] = [{} for _ in range(4)]
+        self.count = 0
+        self.duplicates = 0
+
+    def add(self, fingerprint: int) -> None:
+        for band, buckets in enumerate(self.bands):
+            buckets.setdefault((fingerprint >> (16 * band)) & 0xFFFF, []).append(fingerprint)
+        self.count += 1
+
+    def is_duplicate(self, fingerprint: int) -> bool:
+        for band, buckets in enumerate(self.bands):
+            for other in buckets.get((fingerprint >> (16 * band)) & 0xFFFF, ()):
+                if bin(fingerprint ^ other).count("1") <= self.max_distance:
+                    return True
+        return False
+
+    def filter(self, chunks: Iterable[Chunk]) -> Iterator[Chunk]:
+        """
+        Yield the chunks that are not near-duplicates of an earlier chunk, with their
+        "fingerprint" added.
+        """
+        for chunk in chunks:
+            fingerprint = simhash(chunk["text"])
+            if self.is_duplicate(fingerprint):
+                self.duplicates += 1
+                continue
+            self.add(fingerprint)
+            yield {**chunk, "fingerprint": fingerprint}
+
+
+# Embedder of each worker process, loaded once by _init_worker
+_worker_embedder = None
+
+
+def _init_worker(model_name: str, embedding_socket: Optional[str] = None) -> None:
+    global _worker_embedder
+    if embedding_socket:
+        from embedding_server import EmbeddingClient
+        _worker_embedder = EmbeddingClient(embedding_socket)
+        return
+    from local_embedder import LocalEmbedder
+    # No cache: several processes must not append to the same cache files
+    _worker_embedder = LocalEmbedder(model_name)
+
+
+def _embed_in_worker(texts: List[str]) -> np.ndarray:
+    return _worker_embedder.encode_many(texts)
+
+
+def embed_chunks(chunks: Iterable[Chunk],
+                 batch_size: int = 64,
+                 workers: int = 0,
+                 model_name: str = "all-MiniLM-L6-v2",
+                 embedder: Optional[Any] = None,
+                 embedding_socket: Optional[str] = None) -> Iterator[List[Chunk]]:
+    """
+    Embed chunks in batches, yielding each batch with a "vector" added to every chunk.
+
+    With workers > 0, batches are embedded on a process pool with one model per process,
+    and at most 2 * workers batches are in flight. Batches are yielded in input order.
+
+    Args:
+        chunks: The chunks to embed.
+        batch_size: Number of chunks per batch.
+        workers: Number of worker processes. 0 embeds in this process with `embedder`.
+        model_name: The model each worker process loads.
+        embedder: Object with encode_many(texts), used when workers is 0.
+        embedding_socket: Socket of an EmbeddingServer (see embedding_server). When given,
+            this process or each worker process sends its batches to the server instead of
+            loading its own model, and the server batches them together.
+    """
+    iterator = iter(chunks)
+
+    if workers <= 0:
+        if embedder is None and embedding_socket:
+            from embedding_server import EmbeddingClient
+            embedder = EmbeddingClient(embedding_socket)
+        elif embedder is None:
+            from local_embedder import LocalEmbedder
+            embedder = LocalEmbedder(model_name)
+        while True:
+            batch = list(islice(iterator, batch_size))
+            if not batch:
+                return
+            vectors = embedder.encode_many([chunk["text"] for chunk in batch])
+            yield [{**chunk, "vector": vector} for chunk, vector in zip(batch, vectors)]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model_name, embedding_socket)) as executor:
+        pending: deque = deque()
+        while True:
+            while len(pending) < 2 * workers:
+                batch = list(islice(iterator, batch_size))
+                if not batch:
+                    break
+                pending.append((batch, executor.submit(_embed_in_worker, [chunk["text"] for chunk in batch])))
+            if not pending:
+                return
+            batch, future = pending.popleft()
+            yield [{**chunk, "vector": vector} for chunk, vector in zip(batch, future.result())]
+
+
+def vector_store_sink(client: Any, collection_name: str, batch_size: int = 100) -> Sink:
+    """
+    Build a sink that writes chunks with insert_objects_batch, e.g. to a
+    WeaviateCloudClient or a LocalVectorStore.
+
+    Chunk IDs are deterministic, so a batch that is written again after a crash
+    overwrites the same objects in Weaviate instead of duplicating them.
+    """
+    def write(chunks: List[Chunk]) -> None:
+        result = client.insert_objects_batch(
+            collection_name,
+            ({
+                "id": chunk["id"],
+                "properties": {"text": chunk["text"], "source": chunk["source"],
+                               "page": chunk["page"], "chunk": chunk["chunk"]},
+                "vector": chunk["vector"]
+            } for chunk in chunks),
+            batch_size=batch_size
+        )
+        if result["errors"]:
+            raise RuntimeError(f"{len(result['errors'])} chunks failed to write: {result['errors'][:3]}")
+    return write
+
+
+def chroma_sink(collection: Any) -> Sink:
+    """
+    Build a sink that writes chunks to a chromadb collection (e.g. vector_store._collection
+    of the LangChain Chroma wrapper) with upsert, so a repeated batch is not duplicated.
+    """
+    def write(chunks: List[Chunk]) -> None:
+        collection.upsert(
+            ids=[chunk["id"] for chunk in chunks],
+            embeddings=[np.asarray(chunk["vector"]).tolist() for chunk in chunks],
+            documents=[chunk["text"] for chunk in chunks],
+            metadatas=[{"source": chunk["source"], "page": chunk["page"], "chunk": chunk["chunk"]} for chunk in chunks]
+        )
+    return write
+
+
+class IngestionCheckpoint:
+    """
+    Progress of an ingestion run, saved after every write.
+
+    state.json records, per file, its size and modification time, the index of the last
+    chunk written and whether the file is complete. fingerprints.u64 holds the SimHash
+    of every written chunk.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.state_path = os.path.join(path, "state.json")
+        self.fingerprints_path = os.path.join(path, "fingerprints.u64")
+        self.files: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(self.state_path):
+            with open(self.state_path) as f:
+                self.files = json.load(f)["files"]
+
+    @staticmethod
+    def signature(path: str) -> Dict[str, Any]:
+        stat = os.stat(path)
+        return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+    def is_complete(self, path: str) -> bool:
+        entry = self.files.get(path)
+        return bool(entry and entry["complete"] and entry["signature"] == self.signature(path))
+
+    def last_chunk(self, path: str) -> int:
+        """
+        Return the index of the last written chunk of a file, or -1. A changed file starts over.
+        """
+        entry = self.files.get(path)
+        if not entry or entry["signature"] != self.signature(path):
+            return -1
+        return entry["last_chunk"]
+
+    def fingerprints(self) -> np.ndarray:
+        if not os.path.exists(self.fingerprints_path):
+            return np.zeros(0, dtype=np.uint64)
+        return np.fromfile(self.fingerprints_path, dtype=np.uint64)
+
+    def record(self, chunks: List[Chunk], completed: Iterable[str]) -> None:
+        """
+        Save the progress after a batch was written and a set of files was finished.
+        """
+        for chunk in chunks:
+            entry = self.files.get(chunk["source"])
+            if entry is None or entry["signature"] != self.signature(chunk["source"]):
+                entry = self.files[chunk["source"]] = {"signature": self.signature(chunk["source"]),
+                                                       "last_chunk": -1, "complete": False}
+            entry["last_chunk"] = max(entry["last_chunk"], chunk["chunk"])
+        for path in completed:
+            entry = self.files.setdefault(path, {"signature": self.signature(path), "last_chunk": -1})
+            entry["complete"] = True
+
+        with open(self.fingerprints_path, "ab") as f:
+            f.write(np.array([chunk["fingerprint"] for chunk in chunks if "fingerprint" in chunk],
+                             dtype=np.uint64).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        with open(f"{self.state_path}.tmp", "w") as f:
+            json.dump({"files": self.files}, f)
+        os.replace(f"{self.state_path}.tmp", self.state_path)
+
+
+class IngestionPipeline:
+    """
+    Streaming, resumable document ingestion from a directory into a vector store.
+    """
+
+    def __init__(self,
+                 sink: Sink,
+                 checkpoint_dir: Optional[str] = None,
+                 patterns: Sequence[str] = DEFAULT_PATTERNS,
+                 chunk_size: int = 256,
+                 overlap: int = 32,
+                 token_lengths: Callable[[List[str]], List[int]] = word_token_lengths,
+                 dedupe_distance: Optional[int] = 3,
+                 batch_size: int = 64,
+                 workers: int = 0,
+                 model_name: str = "all-MiniLM-L6-v2",
+                 embedder: Optional[Any] = None,
+                 embedding_socket: Optional[str] = None):
+        """
+        Initialize the pipeline.
+
+        Args:
+            sink: Callable that writes a list of embedded chunks, e.g. from vector_store_sink.
+            checkpoint_dir: Directory for the checkpoint. If None, runs are not resumable.
+            patterns: Filename patterns of the files to ingest.
+            chunk_size: Maximum number of tokens per chunk.
+            overlap: Number of tokens repeated at the start of the next chunk.
+            token_lengths: Counts the tokens of each word in a list; see tokenizer_token_lengths.
+            dedupe_distance: Maximum SimHash Hamming distance (0-3) of a near-duplicate.
+                None disables deduplication.
+            batch_size: Number of chunks embedded and written at a time.
+            workers: Number of embedding processes. 0 embeds in this process.
+            model_name: The embedding model loaded by each worker process.
+            embedder: Object with encode_many(texts), used when workers is 0.
+            embedding_socket: Socket of an EmbeddingServer to embed with, instead of
+                loading the model in this process or in each worker process.
+        """
+        self.sink = sink
+        self.checkpoint = IngestionCheckpoint(checkpoint_dir) if checkpoint_dir else None
+        self.patterns = patterns
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self.token_lengths = token_lengths
+        self.dedupe_distance = dedupe_distance
+        self.batch_size = batch_size
+        self.workers = workers
+        self.model_name = model_name
+        self.embedder = embedder
+        self.embedding_socket = embedding_socket
+
+    def run(self, root: str) -> Dict[str, Any]:
+        """
+        Ingest every matching file under a directory.
+
+        Returns:
+            Dict with the number of files seen, skipped as unchanged and failed, chunks
+            written, and duplicates dropped.
+        """
+        stats = {"files": 0, "skipped_files": 0, "failed_files": 0, "chunks": 0, "duplicates": 0}
+        files_seen: List[str] = []
+        # Files that could not be read are never marked complete, so the next run retries them
+        failed: Set[str] = set()
+
+        def pending_files() -> Iterator[str]:
+            for path in discover_files(root, self.patterns):
+                stats["files"] += 1
+                if self.checkpoint and self.checkpoint.is_complete(path):
+                    stats["skipped_files"] += 1
+                    continue
+                files_seen.append(path)
+                yield path
+
+        chunks = chunk_segments(extract_text(pending_files(), failed=failed), self.chunk_size, self.overlap, self.token_lengths)
+        if self.checkpoint:
+            chunks = self._skip_written(chunks)
+
+        deduplicator = None
+        if self.dedupe_distance is not None:
+            deduplicator = Deduplicator(self.dedupe_distance)
+            if self.checkpoint:
+                for fingerprint in self.checkpoint.fingerprints():
+                    deduplicator.add(int(fingerprint))
+            chunks = deduplicator.filter(chunks)
+
+        for batch in embed_chunks(chunks, self.batch_size, self.workers, self.model_name, self.embedder,
+                                  self.embedding_socket):
+            self.sink(batch)
+            stats["chunks"] += len(batch)
+            if self.checkpoint:
+                # Every file before the one of the last chunk has been fully read and written
+                last_source = batch[-1]["source"]
+                completed = files_seen[:files_seen.index(last_source)]
+                del files_seen[:len(completed)]
+                self.checkpoint.record(batch, [path for path in completed if path not in failed])
+            logger.info(f"Wrote {stats['chunks']} chunks")
+
+        if self.checkpoint:
+            self.checkpoint.record([], [path for path in files_seen if path not in failed])
+        stats["failed_files"] = len(failed)
+        if deduplicator:
+            stats["duplicates"] = deduplicator.duplicates
+        logger.info(f"Ingested {stats['chunks']} chunks from {stats['files'] - stats['skipped_files']} files "
+                    f"({stats['skipped_files']} unchanged files skipped, {stats['duplicates']} duplicates dropped)")
+        return stats
+
+    def _skip_written(self, chunks: Iterable[Chunk]) -> Iterator[Chunk]:
+        """
+        Drop the chunks that an interrupted run already wrote.
+        """
+        last: Dict[str, int] = {}
+        for chunk in chunks:
+            source = chunk["source"]
+            if source not in last:
+                last[source] = self.checkpoint.last_chunk(source)
+            if chunk["chunk"] > last[source]:
+                yield chunk
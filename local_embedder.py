@@ -0,0 +1,280 @@
+"""
+Local Embedder
+
+This module provides LocalEmbedder, the sentence-transformers embedder used in the
+FAISS notebook, with batched encoding and an optional persistent embedding cache.
+
+The cache is content-addressed: each embedding is keyed by a hash of the model name
+and the text, so unchanged documents are never encoded twice, across runs. Vectors
+are stored in an append-only float32 file that is read through a memory map, and
+the keys in a compact file of 16-byte digests with one entry per vector row.
+
+Usage:
+    from local_embedder import LocalEmbedder
+
+    embedder = LocalEmbedder(cache_dir=".embedding_cache")
+    embeddings = embedder.encode_many(texts)  # only new texts are encoded
+    print(embedder.cache.stats())
+"""
+
+import os
+import json
+import hashlib
+import logging
+import threading
+import numpy as np
+from typing import Dict, List, Any, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Size of the blake2b digest used as the cache key
+KEY_SIZE = 16
+
+
+class EmbeddingCache:
+    """
+    Persistent, content-addressed store of embeddings for one model.
+    """
+
+    def __init__(self, cache_dir: str, model_name: str, dimensions: int):
+        """
+        Open (or create) the cache for a model.
+
+        Args:
+            cache_dir: Directory holding the cache files.
+            model_name: Name of the embedding model. Part of every key.
+            dimensions: Dimensionality of the model's embeddings.
+        """
+        self.model_name = model_name
+        self.dimensions = dimensions
+
+        # Each model gets its own files, since the vector width differs between models
+        safe_name = "".join(c if c.isalnum() or c in "-_." else "_" for c in model_name)
+        self.path = os.path.join(cache_dir, safe_name)
+        os.makedirs(self.path, exist_ok=True)
+
+        self.vectors_path = os.path.join(self.path, "vectors.f32")
+        self.keys_path = os.path.join(self.path, "keys.bin")
+        self.meta_path = os.path.join(self.path, "meta.json")
+
+        self._lock = threading.Lock()
+        self._index: Dict[bytes, int] = {}
+        self._vectors: Optional[np.memmap] = None
+        self.hits = 0
+        self.misses = 0
+
+        self._load()
+
+    def _load(self) -> None:
+        """
+        Read the key file and map the vector file, repairing a torn last write.
+        """
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+            if meta.get("dimensions") != self.dimensions:
+                raise ValueError(
+                    f"Embedding cache at {self.path} has {meta.get('dimensions')} dimensions, "
+                    f"expected {self.dimensions}"
+                )
+        else:
+            with open(self.meta_path, "w") as f:
+                json.dump({"model_name": self.model_name, "dimensions": self.dimensions}, f)
+
+        row_bytes = self.dimensions * 4
+        vector_rows = os.path.getsize(self.vectors_path) // row_bytes if os.path.exists(self.vectors_path) else 0
+        key_rows = os.path.getsize(self.keys_path) // KEY_SIZE if os.path.exists(self.keys_path) else 0
+
+        # Vectors are written before keys, so a crash can only leave extra bytes behind.
+        # Trim both files to the rows that are complete in each.
+        rows = min(vector_rows, key_rows)
+        for path, size in ((self.vectors_path, rows * row_bytes), (self.keys_path, rows * KEY_SIZE)):
+            if os.path.exists(path) and os.path.getsize(path) != size:
+                logger.warning(f"Truncating {path} to {size} bytes after an incomplete write")
+                with open(path, "r+b") as f:
+                    f.truncate(size)
+
+        if rows:
+            with open(self.keys_path, "rb") as f:
+                keys = f.read()
+            self._index = {keys[i * KEY_SIZE:(i + 1) * KEY_SIZE]: i for i in range(rows)}
+        self._remap(rows)
+        logger.info(f"Loaded embedding cache with {rows} vectors from {self.path}")
+
+    def _remap(self, rows: int) -> None:
+        """
+        Map the first `rows` vectors of the vector file.
+        """
+        if rows:
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dimensions))
+        else:
+            self._vectors = None
+
+    def key(self, text: str) -> bytes:
+        """
+        Return the cache key for a text.
+        """
+        digest = hashlib.blake2b(digest_size=KEY_SIZE)
+        digest.update(self.model_name.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(text.encode("utf-8"))
+        return digest.digest()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def lookup(self, keys: Sequence[bytes]) -> List[Optional[int]]:
+        """
+        Return the row of each key in the cache, or None for keys that are not cached.
+        """
+        with self._lock:
+            rows = [self._index.get(key) for key in keys]
+        found = sum(row is not None for row in rows)
+        self.hits += found
+        self.misses += len(rows) - found
+        return rows
+
+    def get_rows(self, rows: Sequence[int]) -> np.ndarray:
+        """
+        Return the vectors stored at the given rows.
+        """
+        with self._lock:
+            return np.array(self._vectors[np.asarray(rows, dtype=np.int64)], dtype=np.float32)
+
+    def add(self, keys: Sequence[bytes], vectors: np.ndarray) -> None:
+        """
+        Append vectors to the cache. Keys that are already cached are skipped.
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(-1, self.dimensions)
+        with self._lock:
+            new_rows = [i for i, key in enumerate(keys) if key not in self._index]
+            # Drop duplicates within this call, keeping the first occurrence
+            seen = set()
+            new_rows = [i for i in new_rows if not (keys[i] in seen or seen.add(keys[i]))]
+            if not new_rows:
+                return
+
+            start = len(self._index)
+            with open(self.vectors_path, "ab") as f:
+                f.write(vectors[new_rows].tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            with open(self.keys_path, "ab") as f:
+                f.write(b"".join(keys[i] for i in new_rows))
+
+            for offset, i in enumerate(new_rows):
+                self._index[keys[i]] = start + offset
+            self._remap(len(self._index))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the cache counters.
+        """
+        return {
+            "entries": len(self._index),
+            "hits": self.hits,
+            "misses": self.misses,
+            "bytes": len(self._index) * (self.dimensions * 4 + KEY_SIZE)
+        }
+
+
+class LocalEmbedder:
+    """
+    Sentence-transformers embedder with batched encoding and an optional persistent cache.
+    """
+
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2', cache_dir: Optional[str] = None, batch_size: int = 64):
+        """
+        Initialize with a local embedding model.
+
+        Args:
+            model_name: 'all-MiniLM-L6-v2' (fast, 384-dim) or 'all-mpnet-base-v2' (slower, 768-dim).
+            cache_dir: Directory for the persistent embedding cache. If None, nothing is cached.
+            batch_size: Number of texts passed to the model at once.
+        """
+        # Imported here so EmbeddingCache can be used without loading torch
+        from sentence_transformers import SentenceTransformer
+
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name)
+        self.dimensions = self.model.get_sentence_embedding_dimension()
+        self.batch_size = batch_size
+        self.cache = EmbeddingCache(cache_dir, model_name, self.dimensions) if cache_dir else None
+
+    def get_embedding(self, text: str) -> np.ndarray:
+        """
+        Get the embedding of a single text.
+        """
+        return self.encode_many([text])[0]
+
+    def encode_many(self, texts: Sequence[str], show_progress_bar: bool = False) -> np.ndarray:
+        """
+        Get normalized embeddings for many texts.
+
+        Cached texts are read from the cache; the rest are encoded in batches of
+        batch_size, with each distinct text encoded once, and then added to the cache.
+
+        Args:
+            texts: The texts to embed.
+            show_progress_bar: Whether the model shows a progress bar while encoding.
+
+        Returns:
+            Array of shape (len(texts), dimensions) with float32 embeddings.
+        """
+        embeddings = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        if not len(texts):
+            return embeddings
+
+        if self.cache is not None:
+            keys = [self.cache.key(text) for text in texts]
+            rows = self.cache.lookup(keys)
+            hit_positions = [i for i, row in enumerate(rows) if row is not None]
+            if hit_positions:
+                embeddings[hit_positions] = self.cache.get_rows([rows[i] for i in hit_positions])
+            missing = [i for i, row in enumerate(rows) if row is None]
+        else:
+            keys = None
+            missing = list(range(len(texts)))
+
+        if not missing:
+            return embeddings
+
+        # Encode each distinct text once
+        unique_texts = list(dict.fromkeys(texts[i] for i in missing))
+        try:
+            encoded = self.model.encode(
+                unique_texts,
+                batch_size=self.batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=show_progress_bar
+            ).astype(np.float32)
+        except Exception as e:
+            logger.warning(f"Embedding error: {e}. Using fallback embeddings for {len(unique_texts)} texts")
+            # Fallback embeddings are never cached
+            fallback = {text: self._fallback_embedding(text) for text in unique_texts}
+            for i in missing:
+                embeddings[i] = fallback[texts[i]]
+            return embeddings
+
+        positions = {text: j for j, text in enumerate(unique_texts)}
+        for i in missing:
+            embeddings[i] = encoded[positions[texts[i]]]
+
+        if self.cache is not None:
+            self.cache.add([keys[i] for i in missing], embeddings[missing])
+        return embeddings
+
+    def _fallback_embedding(self, text: str) -> np.ndarray:
+        """Simpler fallback if main model fails"""
+        words = text.lower().split()
+        embedding = np.zeros(self.dimensions, dtype=np.float32)
+
+        # Basic word presence embedding
+        for word in words:
+            hash_val = hash(word) % self.dimensions
+            embedding[hash_val] = 1.0
+
+        # Normalize
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm > 0 else embedding
@@ -0,0 +1,1267 @@
+"""
+Local Vector Store
+
+This module provides LocalVectorStore, an offline engine with the same methods as
+WeaviateCloudClient, so pipelines and tests can run without a network by swapping
+the client for a store. Each collection lives in its own directory:
+
+    meta.json           collection name, property definitions, dimensions, index settings
+    ids.bin             16-byte UUID per row, in insertion order
+    vectors.f32         normalized float32 vectors, one row per object, read through a memory map
+    columns/<prop>.jsonl  one JSON value per row for each property
+    deleted.i64         row numbers of deleted objects (tombstones)
+    index.faiss         FAISS index over the vectors (HNSW, IVF, flat, SQ8 or PQ)
+    bm25/               BM25 keyword index over the text properties, for hybrid search
+    compact/            compacted files not yet moved into place, only while compact() runs
+
+The "sq8" and "pq" index types keep only compressed codes in RAM: 8-bit scalar
+quantization (one byte per dimension) or product quantization with a configurable
+code size, both behind an IVF coarse quantizer. A search fetches `rerank` times more
+candidates than asked for and re-ranks them exactly against vectors.f32, which is
+read through the memory map, so only the candidate rows are paged in.
+
+Queries and searches take the same `where` filters as WeaviateCloudClient. Each
+collection keeps a MetadataIndex (see metadata_filter): inverted indexes from property
+values to compressed row bitmaps, built per property on its first filter and extended
+as rows are appended. The filter is turned into a row mask before the search. When few
+rows match, they are scanned exactly; otherwise the mask is passed to FAISS as an
+IDSelectorBitmap, with efSearch or nprobe raised in proportion to how selective the
+filter is, so rare values keep their recall.
+
+hybrid_search() combines the vector search with a BM25 keyword search over the text
+properties (see bm25_index), fusing the two rankings. The keyword index of a
+collection is built on its first hybrid search, extended as rows are appended, and
+saved under bm25/ by flush().
+
+Rows are only ever appended. Deletes write a tombstone that is filtered out at
+search time, and compact() rewrites a collection without its deleted rows. It writes
+the new files to compact.tmp/ and renames that to compact/ to commit them, so a
+collection opened after a crash either rolls a compaction back or finishes it. The
+FAISS index is saved by flush() and close(); rows added after the last save are
+re-indexed from vectors.f32 when the collection is opened again.
+
+Usage:
+    from local_embedder import LocalEmbedder
+    from local_vector_store import LocalVectorStore
+
+    store = LocalVectorStore("vector_store", embedder=LocalEmbedder())
+    store.connect()
+    store.create_collection("Article", [{"name": "title", "dataType": ["text"]}])
+    store.insert_object("Article", {"title": "Vector databases"})
+    print(store.search_objects("Article", "similarity search", properties=["title"]))
+    store.close()
+"""
+
+import os
+import json
+import uuid
+import shutil
+import logging
+import threading
+import numpy as np
+import faiss
+from contextlib import contextmanager
+from itertools import islice
+from typing import Dict, List, Any, Callable, Iterable, Iterator, Optional, Tuple
+
+from bm25_index import BM25Index, hybrid_rank
+from metadata_filter import MetadataIndex
+
+logger = logging.getLogger(__name__)
+
+INDEX_TYPES = ("hnsw", "ivf", "flat", "sq8", "pq")
+
+# Index types that store compressed codes and re-rank candidates against the full vectors
+QUANTIZED_INDEX_TYPES = ("sq8", "pq")
+
+# Training samples at most this many rows, spread evenly over the collection
+MAX_TRAIN_ROWS = 100000
+
+# Rows are added to the index in slices of this size, so a rebuild does not load every vector at once
+ADD_BATCH_ROWS = 100000
+
+# A filtered search scans the matching rows exactly when at most this many rows, or
+# this fraction of the collection, match; index_options can override both
+FILTER_BRUTE_FORCE_ROWS = 10000
+FILTER_BRUTE_FORCE_RATIO = 0.01
+
+# Upper bound on how much a filtered HNSW search raises efSearch
+MAX_FILTER_EF_FACTOR = 16
+
+# Each side of a hybrid search ranks this many times the limit before fusion
+HYBRID_CANDIDATE_FACTOR = 4
+
+
+def normalize_rows(vectors: Any) -> np.ndarray:
+    """
+    Return the vectors as a contiguous 2-D float32 array with unit-length rows.
+
+    All collections use cosine distance, so vectors are normalized once on the way in.
+    """
+    vectors = np.array(vectors, dtype=np.float32, ndmin=2)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return np.ascontiguousarray(vectors / norms)
+
+
+def pq_shape(dimensions: int, options: Dict[str, Any]) -> Tuple[int, int]:
+    """
+    Return the number of PQ sub-quantizers and bits per sub-quantizer for the index options.
+
+    code_size is given in bytes per vector, so with nbits per sub-quantizer there are
+    code_size * 8 / nbits sub-vectors, which must divide the dimensions.
+    """
+    code_size = options.get("code_size", max(1, dimensions // 8))
+    nbits = options.get("nbits", 8)
+    subquantizers = code_size * 8 // nbits
+    if subquantizers < 1 or dimensions % subquantizers:
+        raise ValueError(f"PQ code size of {code_size} bytes at {nbits} bits gives {subquantizers} "
+                         f"sub-vectors, which must divide {dimensions} dimensions")
+    return subquantizers, nbits
+
+
+def train_centroids(index_type: str, options: Dict[str, Any]) -> int:
+    """
+    Return the number of centroids the largest quantizer of an IVF index learns: nlist
+    coarse centroids, and for PQ also 2**nbits per sub-quantizer. FAISS cannot train on
+    fewer vectors than that.
+    """
+    centroids = options.get("nlist", 100)
+    if index_type == "pq":
+        centroids = max(centroids, 2 ** options.get("nbits", 8))
+    return centroids
+
+
+def check_index_options(index_type: str, options: Dict[str, Any]) -> None:
+    """
+    Validate index options before any collection is built with them.
+
+    Raises:
+        ValueError: If the index type is unknown or an option is out of range.
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"index_type must be one of {INDEX_TYPES}, got {index_type!r}")
+    for key in ("m", "ef_construction", "ef_search", "nlist", "nprobe", "train_size", "code_size",
+                "rerank", "filter_brute_force_rows"):
+        value = options.get(key)
+        if value is not None and (not isinstance(value, int) or value < 1):
+            raise ValueError(f"Index option {key} must be a positive integer, got {value!r}.")
+    nbits = options.get("nbits")
+    if nbits is not None and (not isinstance(nbits, int) or not 1 <= nbits <= 16):
+        raise ValueError(f"Index option nbits must be an integer from 1 to 16, got {nbits!r}.")
+
+
+def rerank(vectors: np.ndarray, queries: np.ndarray, candidates: np.ndarray, k: int) -> List[List[Tuple[int, float]]]:
+    """
+    Re-rank candidate rows by their exact similarity to each query.
+
+    Args:
+        vectors: The full vectors, typically a memory map; only candidate rows are read.
+        queries: 2-D array of normalized query vectors.
+        candidates: For each query, the candidate row numbers; negative entries are ignored.
+        k: Number of rows to keep per query.
+
+    Returns:
+        For each query, a list of (row, similarity) pairs, most similar first.
+    """
+    results = []
+    for query, rows in zip(queries, candidates):
+        # Sorted, unique rows turn the reads into one forward pass over the file
+        rows = np.unique(rows[rows >= 0])
+        if not len(rows):
+            results.append([])
+            continue
+        similarities = np.asarray(vectors[rows]) @ query
+        top = np.argsort(-similarities)[:k]
+        results.append([(int(rows[i]), float(similarities[i])) for i in top])
+    return results
+
+
+class LocalCollection:
+    """
+    One collection of a LocalVectorStore: IDs, vectors, properties and the FAISS index.
+    """
+
+    def __init__(self, path: str, read_only: bool = False):
+        """
+        Open a collection created by LocalCollection.create.
+
+        Args:
+            path: The collection directory.
+            read_only: Whether to memory-map the saved index instead of loading it into RAM.
+                Writes to a read-only collection raise an error.
+        """
+        self.path = path
+        self.read_only = read_only
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+
+        self.name: str = self.meta["name"]
+        self.dimensions: Optional[int] = self.meta.get("dimensions")
+        self.index_type: str = self.meta["index_type"]
+        self.index_options: Dict[str, Any] = self.meta.get("index_options", {})
+
+        self.ids_path = os.path.join(path, "ids.bin")
+        self.vectors_path = os.path.join(path, "vectors.f32")
+        self.deleted_path = os.path.join(path, "deleted.i64")
+        self.index_path = os.path.join(path, "index.faiss")
+        self.columns_path = os.path.join(path, "columns")
+        self.keyword_index_path = os.path.join(path, "bm25")
+        self.compact_path = os.path.join(path, "compact")
+
+        self.lock = threading.RLock()
+        # Searches run outside the lock; writers that change the index in place wait for them
+        self._index_idle = threading.Condition(self.lock)
+        self._searches = 0
+        self._index_writers = 0
+        # Incremented by compact(), which renumbers the rows that searches return
+        self.generation = 0
+        self.ids: List[str] = []
+        self.rows_by_id: Dict[str, int] = {}
+        self.columns: Dict[str, List[Any]] = {}
+        self.deleted = np.zeros(0, dtype=bool)
+        self.vectors: Optional[np.memmap] = None
+        self.index: Optional[faiss.Index] = None
+        self.metadata_index = MetadataIndex()
+        self.keyword_index: Optional[BM25Index] = None
+        self._index_dirty = False
+        self._keyword_index_dirty = False
+
+        self._load()
+
+    @classmethod
+    def create(cls,
+               path: str,
+               name: str,
+               properties: List[Dict[str, Any]],
+               dimensions: Optional[int],
+               index_type: str,
+               index_options: Dict[str, Any]) -> "LocalCollection":
+        """
+        Create the directory and metadata of a new collection and open it.
+        """
+        check_index_options(index_type, index_options)
+        if index_type == "pq" and dimensions:
+            pq_shape(dimensions, index_options)
+        centroids = train_centroids(index_type, index_options)
+        if index_type in ("ivf",) + QUANTIZED_INDEX_TYPES and index_options.get("train_size", centroids) < centroids:
+            logger.warning(f"train_size {index_options['train_size']} is below the {centroids} centroids of the "
+                           f"{index_type} index of {name}; training waits for {centroids} rows instead")
+
+        os.makedirs(os.path.join(path, "columns"))
+        meta = {
+            "name": name,
+            "properties": [prop if "dataType" in prop else {**prop, "dataType": ["text"]} for prop in properties],
+            "dimensions": dimensions,
+            "index_type": index_type,
+            "index_options": index_options
+        }
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump(meta, f)
+        return cls(path)
+
+    @property
+    def row_count(self) -> int:
+        """Number of rows, including deleted ones."""
+        return len(self.ids)
+
+    @property
+    def live_count(self) -> int:
+        """Number of objects that have not been deleted."""
+        return len(self.rows_by_id)
+
+    def _load(self) -> None:
+        """
+        Read IDs, columns and tombstones, map the vectors and open the index.
+
+        Rows are committed by their ID, which is written last, so anything past the
+        last complete ID was left by an interrupted write and is trimmed.
+        """
+        if os.path.isdir(f"{self.compact_path}.tmp"):
+            logger.warning(f"Rolling back an interrupted compaction of {self.name}")
+            shutil.rmtree(f"{self.compact_path}.tmp")
+        if os.path.isdir(self.compact_path):
+            logger.warning(f"Finishing an interrupted compaction of {self.name}")
+            self._finish_compaction()
+
+        rows = os.path.getsize(self.ids_path) // 16 if os.path.exists(self.ids_path) else 0
+        if self.dimensions:
+            vector_rows = os.path.getsize(self.vectors_path) // (self.dimensions * 4) if os.path.exists(self.vectors_path) else 0
+            rows = min(rows, vector_rows)
+        self._truncate(self.ids_path, rows * 16)
+        if self.dimensions:
+            self._truncate(self.vectors_path, rows * self.dimensions * 4)
+
+        if rows:
+            with open(self.ids_path, "rb") as f:
+                raw = f.read()
+            self.ids = [str(uuid.UUID(bytes=raw[i * 16:(i + 1) * 16])) for i in range(rows)]
+
+        for prop in self.meta["properties"]:
+            self.columns[prop["name"]] = []
+        for filename in os.listdir(self.columns_path):
+            if filename.endswith(".jsonl"):
+                self.columns[filename[:-len(".jsonl")]] = self._load_column(filename[:-len(".jsonl")], rows)
+        for name, values in self.columns.items():
+            if len(values) < rows:
+                values.extend([None] * (rows - len(values)))
+
+        self.deleted = np.zeros(rows, dtype=bool)
+        if os.path.exists(self.deleted_path):
+            tombstones = np.fromfile(self.deleted_path, dtype=np.int64)
+            self.deleted[tombstones[tombstones < rows]] = True
+        self.rows_by_id = {object_id: row for row, object_id in enumerate(self.ids) if not self.deleted[row]}
+
+        self._remap()
+        self._open_index()
+        logger.info(f"Loaded collection {self.name} with {self.live_count} objects from {self.path}")
+
+    def _finish_compaction(self) -> None:
+        """
+        Move the committed files of a compaction into place, dropping the indexes over the old rows.
+
+        Safe to repeat: files already moved are no longer in compact/.
+        """
+        if os.path.exists(self.index_path):
+            os.remove(self.index_path)
+        shutil.rmtree(self.keyword_index_path, ignore_errors=True)
+        for filename in os.listdir(os.path.join(self.compact_path, "columns")):
+            os.replace(os.path.join(self.compact_path, "columns", filename), os.path.join(self.columns_path, filename))
+        for path in (self.vectors_path, self.deleted_path, self.ids_path):
+            staged = os.path.join(self.compact_path, os.path.basename(path))
+            if os.path.exists(staged):
+                os.replace(staged, path)
+        shutil.rmtree(self.compact_path)
+
+    def _load_column(self, name: str, rows: int) -> List[Any]:
+        """
+        Read one property column, dropping values past the last committed row.
+        """
+        with open(os.path.join(self.columns_path, f"{name}.jsonl")) as f:
+            lines = f.readlines()
+
+        values = []
+        for line in lines[:rows]:
+            try:
+                values.append(json.loads(line))
+            except ValueError:
+                # A torn final line; it belongs to a row that was never committed
+                break
+        if len(values) != len(lines):
+            self._write_column(name, values)
+        return values
+
+    def _write_column(self, name: str, values: List[Any]) -> None:
+        path = os.path.join(self.columns_path, f"{name}.jsonl")
+        with open(f"{path}.tmp", "w") as f:
+            f.writelines(json.dumps(value) + "\n" for value in values)
+        os.replace(f"{path}.tmp", path)
+
+    @staticmethod
+    def _truncate(path: str, size: int) -> None:
+        if os.path.exists(path) and os.path.getsize(path) > size:
+            logger.warning(f"Truncating {path} to {size} bytes after an incomplete write")
+            with open(path, "r+b") as f:
+                f.truncate(size)
+
+    def _remap(self) -> None:
+        """
+        Map the committed rows of the vector file.
+        """
+        if self.row_count and self.dimensions:
+            self.vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r",
+                                     shape=(self.row_count, self.dimensions))
+        else:
+            self.vectors = None
+
+    def _new_index(self) -> faiss.Index:
+        """
+        Build an empty index of the configured type.
+        """
+        if self.index_type == "hnsw":
+            index = faiss.IndexHNSWFlat(self.dimensions, self.index_options.get("m", 32), faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = self.index_options.get("ef_construction", 80)
+            return index
+        nlist = self.index_options.get("nlist", 100)
+        if self.index_type == "ivf":
+            quantizer = faiss.IndexFlatIP(self.dimensions)
+            return faiss.IndexIVFFlat(quantizer, self.dimensions, nlist, faiss.METRIC_INNER_PRODUCT)
+        if self.index_type == "sq8":
+            quantizer = faiss.IndexFlatIP(self.dimensions)
+            return faiss.IndexIVFScalarQuantizer(quantizer, self.dimensions, nlist,
+                                                 faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT)
+        if self.index_type == "pq":
+            subquantizers, nbits = pq_shape(self.dimensions, self.index_options)
+            quantizer = faiss.IndexFlatIP(self.dimensions)
+            return faiss.IndexIVFPQ(quantizer, self.dimensions, nlist, subquantizers, nbits, faiss.METRIC_INNER_PRODUCT)
+        return faiss.IndexFlatIP(self.dimensions)
+
+    def _open_index(self) -> None:
+        """
+        Load the saved index, or build one, and add any rows it is missing.
+        """
+        if not self.dimensions:
+            return
+
+        if os.path.exists(self.index_path):
+            # Memory-mapping keeps a large read-only index out of RAM
+            flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY if self.read_only else 0
+            self.index = faiss.read_index(self.index_path, flags)
+            if self.index.ntotal > self.row_count:
+                logger.warning(f"Index of {self.name} is ahead of its data; rebuilding it")
+                self.index = None
+            elif self.read_only and self.index.ntotal < self.row_count:
+                # A memory-mapped index cannot be added to, so load it normally
+                self.index = faiss.read_index(self.index_path)
+        if self.index is None:
+            self.index = self._new_index()
+
+        if self.index.ntotal < self.row_count:
+            self._add_to_index(self.index.ntotal)
+
+    def _add_to_index(self, start: int) -> None:
+        """
+        Add rows [start, row_count) to the index, training an IVF index once it has enough rows.
+        """
+        if not self.index.is_trained:
+            if self.row_count < self._train_size():
+                return
+            self._train()
+            start = 0
+        for offset in range(start, self.row_count, ADD_BATCH_ROWS):
+            self.index.add(np.asarray(self.vectors[offset:offset + ADD_BATCH_ROWS]))
+        self._index_dirty = True
+
+    def _train(self, new_vectors: Optional[np.ndarray] = None) -> None:
+        """
+        Train the index on a sample of the stored rows and of rows about to be added.
+        """
+        rows = self.row_count + (len(new_vectors) if new_vectors is not None else 0)
+        step = max(1, rows // MAX_TRAIN_ROWS)
+        parts = [np.asarray(self.vectors[::step])] if self.row_count else []
+        if new_vectors is not None:
+            parts.append(new_vectors[::step])
+        sample = np.concatenate(parts)
+        logger.info(f"Training {self.index_type} index of {self.name} on {len(sample)} vectors")
+        self.index.train(sample)
+
+    def _train_size(self) -> int:
+        """Number of rows needed before an IVF index is trained; never fewer than its centroids."""
+        centroids = train_centroids(self.index_type, self.index_options)
+        return max(self.index_options.get("train_size", centroids * 39), centroids)
+
+    def _check_writable(self) -> None:
+        if self.read_only:
+            raise PermissionError(f"Collection {self.name} is opened read-only")
+
+    def add(self, objects: List[Tuple[str, Dict[str, Any], np.ndarray]]) -> List[str]:
+        """
+        Append objects and index their vectors.
+
+        Args:
+            objects: List of (id, properties, normalized vector) tuples.
+
+        Returns:
+            The IDs of the added objects.
+        """
+        self._check_writable()
+        if not objects:
+            return []
+
+        with self.lock, self._exclusive_index():
+            vectors = np.stack([vector for _, _, vector in objects]).astype(np.float32)
+            if self.dimensions is None:
+                if self.index_type == "pq":
+                    pq_shape(int(vectors.shape[1]), self.index_options)
+                self.dimensions = int(vectors.shape[1])
+                self.meta["dimensions"] = self.dimensions
+                with open(os.path.join(self.path, "meta.json"), "w") as f:
+                    json.dump(self.meta, f)
+                self.index = self._new_index()
+            elif vectors.shape[1] != self.dimensions:
+                raise ValueError(f"Collection {self.name} has {self.dimensions} dimensions, got {vectors.shape[1]}")
+
+            for object_id, _, _ in objects:
+                if object_id in self.rows_by_id:
+                    raise ValueError(f"Object {object_id} already exists in {self.name}")
+
+            # Serialized before anything is written, so a bad value cannot leave a column a row ahead
+            new_columns = {key for _, properties, _ in objects for key in properties} - set(self.columns)
+            column_values = {}
+            column_lines = {}
+            for name in list(self.columns) + sorted(new_columns):
+                column_values[name] = [properties.get(name) for _, properties, _ in objects]
+                try:
+                    column_lines[name] = "".join(json.dumps(value) + "\n" for value in column_values[name])
+                except (TypeError, ValueError) as e:
+                    raise ValueError(f"Property {name} of {self.name} is not JSON-serializable: {e}.") from e
+
+            # Train before anything is written, so a training error leaves no unindexed rows behind
+            if not self.index.is_trained and self.row_count + len(objects) >= self._train_size():
+                self._train(vectors)
+
+            for name in sorted(new_columns):
+                self.columns[name] = [None] * self.row_count
+                self._write_column(name, self.columns[name])
+
+            # Columns and vectors first, IDs last: a row exists once its ID is written
+            paths = [os.path.join(self.columns_path, f"{name}.jsonl") for name in column_lines]
+            paths += [self.vectors_path, self.ids_path]
+            sizes = {path: os.path.getsize(path) if os.path.exists(path) else 0 for path in paths}
+            try:
+                for name, lines in column_lines.items():
+                    with open(os.path.join(self.columns_path, f"{name}.jsonl"), "a") as f:
+                        f.write(lines)
+                with open(self.vectors_path, "ab") as f:
+                    f.write(vectors.tobytes())
+                with open(self.ids_path, "ab") as f:
+                    f.write(b"".join(uuid.UUID(object_id).bytes for object_id, _, _ in objects))
+            except BaseException:
+                for path, size in sizes.items():
+                    self._truncate(path, size)
+                raise
+
+            for name, values in column_values.items():
+                self.columns[name].extend(values)
+            start = self.row_count
+            for offset, (object_id, _, _) in enumerate(objects):
+                self.ids.append(object_id)
+                self.rows_by_id[object_id] = start + offset
+            self.deleted = np.concatenate([self.deleted, np.zeros(len(objects), dtype=bool)])
+
+            self._remap()
+            self._add_to_index(self.index.ntotal)
+        return [object_id for object_id, _, _ in objects]
+
+    def delete(self, object_id: str) -> bool:
+        """
+        Delete an object by writing a tombstone for its row.
+
+        Returns:
+            True if the object existed.
+        """
+        self._check_writable()
+        with self.lock:
+            row = self.rows_by_id.pop(object_id, None)
+            if row is None:
+                return False
+            self.deleted[row] = True
+            with open(self.deleted_path, "ab") as f:
+                f.write(np.int64(row).tobytes())
+        return True
+
+    def get_object(self, row: int, properties: Optional[List[str]], include_vector: bool = False) -> Dict[str, Any]:
+        """
+        Build the object for a row in the shape returned by the Weaviate GraphQL API.
+        """
+        names = properties if properties is not None else list(self.columns)
+        obj = {name: self.columns[name][row] if name in self.columns else None for name in names}
+        obj["_additional"] = {"id": self.ids[row]}
+        if include_vector:
+            obj["_additional"]["vector"] = self.vectors[row].tolist()
+        return obj
+
+    def live_rows(self) -> Iterator[int]:
+        """
+        Yield the rows that have not been deleted, in insertion order.
+        """
+        return (int(row) for row in np.flatnonzero(~self.deleted))
+
+    def filter_rows(self, where: Dict[str, Any]) -> np.ndarray:
+        """
+        Return a boolean mask of the live rows that match a `where` filter.
+        """
+        with self.lock:
+            return self.metadata_index.evaluate(where, self.columns, self.row_count) & ~self.deleted
+
+    def search(self, queries: np.ndarray, limit: int, where: Optional[Dict[str, Any]] = None) -> List[List[Tuple[int, float]]]:
+        """
+        Find the nearest live rows to each query vector, optionally among the rows matching a filter.
+
+        Args:
+            queries: 2-D array of normalized query vectors.
+            limit: Maximum number of rows per query.
+            where: Filter on properties, applied before the search.
+
+        Returns:
+            For each query, a list of (row, similarity) pairs, most similar first.
+        """
+        with self.lock:
+            self._index_idle.wait_for(lambda: not self._index_writers)
+            if not self.live_count:
+                return [[] for _ in range(len(queries))]
+            if queries.shape[1] != self.dimensions:
+                raise ValueError(f"Collection {self.name} has {self.dimensions} dimensions, got {queries.shape[1]}")
+
+            allowed = None
+            matched = self.live_count
+            if where is not None:
+                allowed = self.filter_rows(where)
+                matched = int(allowed.sum())
+                if not matched:
+                    return [[] for _ in range(len(queries))]
+            elif self.live_count < self.row_count:
+                # A copy, since delete() marks rows in place
+                allowed = ~self.deleted
+
+            # Snapshot under the lock; the search itself runs outside it
+            k = min(limit, matched)
+            vectors = self.vectors
+            index = self.index
+            if index is not None and index.ntotal < self.row_count:
+                # An IVF index that is not trained yet; the collection is small, so scan it
+                index = None
+            elif where is not None and self._scan_filtered(matched):
+                # Scanning the few matching rows is exact and cheaper than a filtered index search
+                index = None
+            if index is None:
+                rows = np.flatnonzero(allowed) if allowed is not None else np.arange(self.row_count)
+            else:
+                params, bitmap = self._search_params(allowed, matched if where is not None else None)
+                candidates = min(k * self.index_options.get("rerank", 4), matched)
+            self._searches += 1
+
+        try:
+            if index is None:
+                return self._brute_force(vectors, queries, k, rows)
+            if self.index_type in QUANTIZED_INDEX_TYPES:
+                _, rows = index.search(queries, candidates, params=params)
+                return rerank(vectors, queries, rows, k)
+            similarities, rows = index.search(queries, k, params=params)
+        finally:
+            with self._index_idle:
+                self._searches -= 1
+                self._index_idle.notify_all()
+
+        return [
+            [(int(row), float(similarity)) for row, similarity in zip(row_list, sim_list) if row >= 0]
+            for row_list, sim_list in zip(rows, similarities)
+        ]
+
+    def keyword_search(self, query: str, limit: int, where: Optional[Dict[str, Any]] = None) -> List[Tuple[int, float]]:
+        """
+        Rank live rows by the BM25 score of their text properties for a query.
+
+        Args:
+            query: The query text.
+            limit: Maximum number of rows.
+            where: Filter on properties, applied before ranking.
+
+        Returns:
+            List of (row, score) pairs, best first.
+        """
+        with self.lock:
+            keyword_index = self._keyword_index()
+            if where is not None:
+                allowed = self.filter_rows(where)
+            else:
+                allowed = ~self.deleted if self.live_count < self.row_count else None
+        # The index is safe to search while rows are being added
+        return keyword_index.search(query, limit, allowed)
+
+    def _keyword_index(self) -> BM25Index:
+        """
+        Return the BM25 index, loading or building it on first use and indexing rows added since.
+        """
+        if self.keyword_index is None:
+            if os.path.exists(os.path.join(self.keyword_index_path, "vocabulary.json")):
+                self.keyword_index = BM25Index.load(self.keyword_index_path, mmap=self.read_only)
+                if self.keyword_index.doc_count > self.row_count:
+                    # Saved with rows that were trimmed as an incomplete write; rebuild it
+                    self.keyword_index = None
+            if self.keyword_index is None:
+                self.keyword_index = BM25Index()
+
+        start = self.keyword_index.doc_count
+        if start < self.row_count:
+            columns = list(self.columns.values())
+            for first in range(start, self.row_count, ADD_BATCH_ROWS):
+                rows = range(first, min(first + ADD_BATCH_ROWS, self.row_count))
+                self.keyword_index.add(
+                    " ".join(values[row] for values in columns if isinstance(values[row], str)) for row in rows
+                )
+            self._keyword_index_dirty = True
+        return self.keyword_index
+
+    def _scan_filtered(self, matched: int) -> bool:
+        """Whether a filter matching this many rows is selective enough to scan them instead."""
+        max_rows = self.index_options.get("filter_brute_force_rows", FILTER_BRUTE_FORCE_ROWS)
+        max_ratio = self.index_options.get("filter_brute_force_ratio", FILTER_BRUTE_FORCE_RATIO)
+        return matched <= max_rows or matched <= max_ratio * self.live_count
+
+    @contextmanager
+    def _exclusive_index(self) -> Iterator[None]:
+        """
+        Hold off new searches and wait for running ones, before the index is changed in place.
+
+        Must be entered with the lock held.
+        """
+        self._index_writers += 1
+        try:
+            self._index_idle.wait_for(lambda: not self._searches)
+            yield
+        finally:
+            self._index_writers -= 1
+            self._index_idle.notify_all()
+
+    def _search_params(self,
+                       allowed: Optional[np.ndarray] = None,
+                       matched: Optional[int] = None) -> Tuple[Optional[faiss.SearchParameters], Optional[np.ndarray]]:
+        """
+        Build the search parameters: the index settings, plus a selector that keeps only
+        the allowed rows, i.e. the live rows or the rows matching a filter.
+
+        With a filter, a graph or inverted-list search meets fewer allowed rows per step,
+        so efSearch and nprobe are raised by the inverse of the fraction of rows allowed.
+
+        Returns:
+            The parameters, and the bitmap read by their selector, which the caller must
+            keep referenced until the search is done.
+        """
+        scale = self.live_count / matched if allowed is not None and matched else 1.0
+        if self.index_type == "hnsw":
+            params = faiss.SearchParametersHNSW()
+            ef_search = self.index_options.get("ef_search", 64)
+            params.efSearch = int(min(ef_search * scale, ef_search * MAX_FILTER_EF_FACTOR))
+        elif self.index_type in ("ivf",) + QUANTIZED_INDEX_TYPES:
+            params = faiss.SearchParametersIVF()
+            nprobe = self.index_options.get("nprobe", 8)
+            params.nprobe = int(min(nprobe * scale, self.index_options.get("nlist", 100)))
+        else:
+            params = faiss.SearchParameters()
+
+        bitmap = None
+        if allowed is not None:
+            bitmap = np.packbits(allowed, bitorder="little")
+            params.sel = faiss.IDSelectorBitmap(len(allowed), faiss.swig_ptr(bitmap))
+        return params, bitmap
+
+    @staticmethod
+    def _brute_force(vectors: np.ndarray, queries: np.ndarray, k: int, rows: np.ndarray) -> List[List[Tuple[int, float]]]:
+        """
+        Exact search over the given rows of the memory-mapped vectors.
+        """
+        # Only the selected rows are read from the memory map
+        vectors = np.asarray(vectors) if len(rows) == len(vectors) else vectors[rows]
+        similarities = queries @ vectors.T
+        results = []
+        for row_similarities in similarities:
+            top = np.argpartition(-row_similarities, k - 1)[:k]
+            top = top[np.argsort(-row_similarities[top])]
+            results.append([(int(rows[i]), float(row_similarities[i])) for i in top])
+        return results
+
+    def flush(self) -> None:
+        """
+        Save the vector and keyword indexes if rows were added since they were last saved.
+        """
+        if self.read_only:
+            return
+        with self.lock:
+            if self._index_dirty and self.index is not None:
+                faiss.write_index(self.index, f"{self.index_path}.tmp")
+                os.replace(f"{self.index_path}.tmp", self.index_path)
+                self._index_dirty = False
+            if self._keyword_index_dirty and self.keyword_index is not None:
+                self.keyword_index.save(self.keyword_index_path)
+                self._keyword_index_dirty = False
+
+    def compact(self) -> int:
+        """
+        Rewrite the collection without its deleted rows and rebuild the index.
+
+        Returns:
+            The number of rows removed.
+        """
+        self._check_writable()
+        with self.lock, self._exclusive_index():
+            removed = self.row_count - self.live_count
+            if not removed:
+                return 0
+
+            keep = np.flatnonzero(~self.deleted)
+            vectors = np.array(self.vectors[keep]) if self.vectors is not None else None
+            columns = {name: [values[row] for row in keep] for name, values in self.columns.items()}
+
+            # Every new file is staged first; renaming the directory commits them all at once
+            staging = f"{self.compact_path}.tmp"
+            shutil.rmtree(staging, ignore_errors=True)
+            os.makedirs(os.path.join(staging, "columns"))
+            with open(os.path.join(staging, "ids.bin"), "wb") as f:
+                f.write(b"".join(uuid.UUID(self.ids[row]).bytes for row in keep))
+            if vectors is not None:
+                with open(os.path.join(staging, "vectors.f32"), "wb") as f:
+                    f.write(vectors.tobytes())
+            open(os.path.join(staging, "deleted.i64"), "wb").close()
+            for name, values in columns.items():
+                with open(os.path.join(staging, "columns", f"{name}.jsonl"), "w") as f:
+                    f.writelines(json.dumps(value) + "\n" for value in values)
+            self.vectors = None
+            os.rename(staging, self.compact_path)
+            self._finish_compaction()
+
+            self.columns.update(columns)
+            self.generation += 1
+            self.ids = [self.ids[row] for row in keep]
+            self.rows_by_id = {object_id: row for row, object_id in enumerate(self.ids)}
+            # Row numbers changed; postings are rebuilt on the next filter
+            self.metadata_index.reset()
+            self.keyword_index = None
+            self._keyword_index_dirty = False
+            self.deleted = np.zeros(len(self.ids), dtype=bool)
+            self._remap()
+            self.index = None
+            self._open_index()
+            self.flush()
+        logger.info(f"Compacted collection {self.name}, removing {removed} deleted rows")
+        return removed
+
+
+class LocalVectorStore:
+    """
+    Offline, on-disk vector store with the method surface of WeaviateCloudClient.
+    """
+
+    def __init__(self,
+                 path: str = "vector_store",
+                 embedder: Optional[Any] = None,
+                 index_type: str = "hnsw",
+                 index_options: Optional[Dict[str, Any]] = None,
+                 read_only: bool = False):
+        """
+        Initialize the store.
+
+        Args:
+            path: Directory holding one subdirectory per collection.
+            embedder: Object with encode_many(texts) returning a 2-D array, such as LocalEmbedder.
+                Needed for search_objects and for inserting objects without a vector.
+            index_type: Index used for new collections: "hnsw", "ivf", "flat", or the compressed
+                "sq8" (8-bit scalar quantization) and "pq" (product quantization).
+            index_options: Index settings for new collections. HNSW: m, ef_construction, ef_search.
+                IVF, SQ8 and PQ: nlist, nprobe, train_size. PQ also: code_size in bytes per vector
+                (default dimensions / 8) and nbits per sub-quantizer (default 8). SQ8 and PQ:
+                rerank, the number of candidates fetched per result for exact re-ranking (default 4).
+                Filtered search: filter_brute_force_rows and filter_brute_force_ratio, the number
+                or fraction of matching rows up to which they are scanned exactly (default
+                10000 rows or 1%).
+            read_only: Whether to open collections read-only, memory-mapping their saved indexes.
+        """
+        check_index_options(index_type, index_options or {})
+
+        self.path = path
+        self.embedder = embedder
+        self.index_type = index_type
+        self.index_options = index_options or {}
+        self.read_only = read_only
+        self.collections: Dict[str, LocalCollection] = {}
+        self._lock = threading.Lock()
+
+        logger.info(f"Initialized local vector store at {self.path}")
+
+    def connect(self) -> bool:
+        """
+        Open every collection under the store directory.
+
+        Returns:
+            True once the store is ready.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        with self._lock:
+            for name in sorted(os.listdir(self.path)):
+                collection_path = os.path.join(self.path, name)
+                if name not in self.collections and os.path.exists(os.path.join(collection_path, "meta.json")):
+                    self.collections[name] = LocalCollection(collection_path, read_only=self.read_only)
+        logger.info(f"Opened local vector store at {self.path} with {len(self.collections)} collections")
+        return True
+
+    def close(self) -> None:
+        """
+        Save every index that has changed.
+        """
+        self.flush()
+        logger.info(f"Closed local vector store at {self.path}")
+
+    def flush(self) -> None:
+        """
+        Save every index that has changed since it was last saved.
+        """
+        for collection in list(self.collections.values()):
+            collection.flush()
+
+    def get_meta_info(self) -> Dict[str, Any]:
+        """
+        Get meta information about the store.
+
+        Returns:
+            Dict with the same "version" and "hostname" keys as the Weaviate meta endpoint.
+        """
+        return {"version": "local", "hostname": os.path.abspath(self.path)}
+
+    def list_collections(self) -> List[str]:
+        """
+        List all collections in the store.
+
+        Returns:
+            List of collection names.
+        """
+        return list(self.collections)
+
+    def create_collection(self, name: str, properties: List[Dict[str, Any]], dimensions: Optional[int] = None) -> bool:
+        """
+        Create a new collection.
+
+        Args:
+            name: The name of the collection.
+            properties: List of property definitions.
+            dimensions: Vector dimensionality. If None, it is taken from the embedder or
+                from the first inserted vector.
+
+        Returns:
+            True if the collection was created successfully.
+        """
+        if self.read_only:
+            raise PermissionError("Local vector store is opened read-only")
+        if dimensions is None and self.embedder is not None:
+            dimensions = getattr(self.embedder, "dimensions", None)
+
+        with self._lock:
+            if name in self.collections:
+                raise ValueError(f"Collection {name} already exists")
+            self.collections[name] = LocalCollection.create(
+                os.path.join(self.path, name), name, properties, dimensions, self.index_type, self.index_options
+            )
+        logger.info(f"Created local collection {name}")
+        return True
+
+    def delete_collection(self, name: str) -> bool:
+        """
+        Delete a collection and its files.
+
+        Args:
+            name: The name of the collection.
+
+        Returns:
+            True if the collection was deleted successfully.
+        """
+        if self.read_only:
+            raise PermissionError("Local vector store is opened read-only")
+        with self._lock:
+            collection = self.collections.pop(name, None)
+        path = collection.path if collection else os.path.join(self.path, name)
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        logger.info(f"Deleted local collection: {name}")
+        return True
+
+    def insert_object(self, collection_name: str, data: Dict[str, Any], vector: Optional[Any] = None) -> str:
+        """
+        Insert an object into a collection.
+
+        Args:
+            collection_name: The name of the collection.
+            data: The data to insert.
+            vector: The object's vector. If None, the embedder encodes its text properties.
+
+        Returns:
+            The ID of the inserted object.
+        """
+        return self.insert_objects_batch(collection_name, [{"properties": data, "vector": vector}])["ids"][0]
+
+    def insert_objects_batch(self,
+                             collection_name: str,
+                             objects: Iterable[Dict[str, Any]],
+                             batch_size: int = 100,
+                             workers: int = 4,
+                             max_retries: int = 3) -> Dict[str, Any]:
+        """
+        Insert many objects into a collection, embedding those without a vector in batches.
+
+        Args:
+            collection_name: The name of the collection.
+            objects: Iterable of objects to insert. Each item is either a dict of properties,
+                or a dict with a "properties" key and optional "vector" and "id" keys.
+            batch_size: Number of objects written and embedded at a time.
+            workers: Accepted for compatibility with WeaviateCloudClient; unused.
+            max_retries: Accepted for compatibility with WeaviateCloudClient; unused.
+
+        Returns:
+            Dict with the IDs of the inserted objects ("ids") and a list of failures ("errors").
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1.")
+
+        collection = self._get_collection(collection_name)
+        ids: List[str] = []
+        iterator = iter(objects)
+        while True:
+            chunk = [self._parse_object(obj) for obj in islice(iterator, batch_size)]
+            if not chunk:
+                break
+
+            # Embed the objects that came without a vector in one call
+            missing = [i for i, (_, _, vector) in enumerate(chunk) if vector is None]
+            if missing:
+                embedded = self._embed([self._object_text(chunk[i][1]) for i in missing])
+                for i, vector in zip(missing, embedded):
+                    chunk[i] = (chunk[i][0], chunk[i][1], vector)
+
+            ids.extend(collection.add([(object_id, properties, normalize_rows(vector)[0])
+                                       for object_id, properties, vector in chunk]))
+
+        logger.info(f"Inserted {len(ids)} objects into local collection {collection_name}")
+        return {"ids": ids, "errors": []}
+
+    def delete_object(self, collection_name: str, object_id: str) -> bool:
+        """
+        Delete an object from a collection.
+
+        Args:
+            collection_name: The name of the collection.
+            object_id: The ID of the object.
+
+        Returns:
+            True if the object existed and was deleted.
+        """
+        return self._get_collection(collection_name).delete(str(object_id))
+
+    def compact(self, collection_name: str) -> int:
+        """
+        Reclaim the space of deleted objects in a collection.
+
+        Returns:
+            The number of rows removed.
+        """
+        return self._get_collection(collection_name).compact()
+
+    def query_objects(self,
+                      collection_name: str,
+                      properties: List[str] = None,
+                      limit: int = 10,
+                      where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Query objects from a collection, in insertion order.
+
+        Args:
+            collection_name: The name of the collection.
+            properties: List of properties to return. If None, all properties are returned.
+            limit: Maximum number of objects to return.
+            where: Filter on properties; see metadata_filter for the supported operators.
+
+        Returns:
+            List of objects, each with its ID under "_additional".
+        """
+        collection = self._get_collection(collection_name)
+        with collection.lock:
+            if where is None:
+                rows = islice(collection.live_rows(), limit)
+            else:
+                rows = np.flatnonzero(collection.filter_rows(where))[:limit]
+            return [collection.get_object(int(row), properties) for row in rows]
+
+    def iter_objects(self,
+                     collection_name: str,
+                     properties: List[str] = None,
+                     page_size: int = 100,
+                     include_vector: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over every object in a collection.
+
+        Args:
+            collection_name: The name of the collection.
+            properties: List of properties to return. The object ID is always returned
+                under "_additional".
+            page_size: Accepted for compatibility with WeaviateCloudClient; unused.
+            include_vector: Whether to return each object's vector under "_additional".
+
+        Yields:
+            Objects from the collection.
+        """
+        collection = self._get_collection(collection_name)
+        for row in collection.live_rows():
+            yield collection.get_object(row, properties, include_vector)
+
+    def search_objects(self,
+                       collection_name: str,
+                       query: str,
+                       properties: List[str] = None,
+                       limit: int = 10,
+                       where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Search objects in a collection using a text query, embedded with the store's embedder.
+
+        Args:
+            collection_name: The name of the collection.
+            query: The search query.
+            properties: List of properties to return. If None, all properties are returned.
+            limit: Maximum number of objects to return.
+            where: Filter on properties, applied before the search.
+
+        Returns:
+            List of objects, nearest first.
+        """
+        return self.search_by_vector(collection_name, self._embed([query])[0], properties, limit, where)
+
+    def search_by_vector(self,
+                         collection_name: str,
+                         vector: Any,
+                         properties: List[str] = None,
+                         limit: int = 10,
+                         where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Search objects in a collection that are nearest to a query vector.
+
+        Args:
+            collection_name: The name of the collection.
+            vector: The query vector, as a list or a NumPy array.
+            properties: List of properties to return. The ID, distance and certainty are
+                always returned under "_additional".
+            limit: Maximum number of objects to return.
+            where: Filter on properties, applied before the search.
+
+        Returns:
+            List of objects, nearest first.
+        """
+        return self.search_by_vectors(collection_name, [vector], properties, limit, where=where)[0]
+
+    def search_by_vectors(self,
+                          collection_name: str,
+                          vectors: Iterable[Any],
+                          properties: List[str] = None,
+                          limit: int = 10,
+                          queries_per_request: int = 50,
+                          where: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Run many vector searches, passing the queries to FAISS in groups.
+
+        Args:
+            collection_name: The name of the collection.
+            vectors: The query vectors, as lists or as the rows of a 2-D NumPy array.
+            properties: List of properties to return. The ID, distance and certainty are
+                always returned under "_additional".
+            limit: Maximum number of objects to return per query.
+            queries_per_request: Number of query vectors searched at once.
+            where: Filter on properties, applied to every query.
+
+        Returns:
+            One list of objects per query vector, in the same order as the vectors.
+        """
+        if queries_per_request < 1:
+            raise ValueError("queries_per_request must be at least 1.")
+
+        collection = self._get_collection(collection_name)
+        results: List[List[Dict[str, Any]]] = []
+        iterator = iter(vectors)
+        while True:
+            chunk = list(islice(iterator, queries_per_request))
+            if not chunk:
+                break
+            queries = normalize_rows(chunk)
+            results.extend(self._resolve(
+                collection,
+                lambda: collection.search(queries, limit, where),
+                lambda hits: [[self._hit(collection, row, similarity, properties) for row, similarity in row_hits]
+                              for row_hits in hits]
+            ))
+        return results
+
+    def hybrid_search(self,
+                      collection_name: str,
+                      query: str,
+                      properties: List[str] = None,
+                      limit: int = 10,
+                      alpha: float = 0.5,
+                      fusion: str = "rrf",
+                      where: Optional[Dict[str, Any]] = None,
+                      vector: Optional[Any] = None) -> List[Dict[str, Any]]:
+        """
+        Search objects by combining a vector search with a BM25 keyword search.
+
+        The two searches run in parallel and their rankings are fused (see bm25_index),
+        so exact matches on rare terms rank high alongside semantic matches.
+
+        Args:
+            collection_name: The name of the collection.
+            query: The search query, matched against the text properties by BM25.
+            properties: List of properties to return. The ID and fused score are always
+                returned under "_additional".
+            limit: Maximum number of objects to return.
+            alpha: Weight of the vector search, from 0 (keyword only) to 1 (vector only).
+            fusion: "rrf" (reciprocal rank fusion) or "relative_score".
+            where: Filter on properties, applied to both searches.
+            vector: Query vector for the vector search. Defaults to the embedded query.
+
+        Returns:
+            List of objects, best first.
+        """
+        collection = self._get_collection(collection_name)
+        candidates = limit * HYBRID_CANDIDATE_FACTOR
+
+        def dense() -> List[Tuple[int, float]]:
+            query_vector = self._embed([query])[0] if vector is None else vector
+            return collection.search(normalize_rows([query_vector]), candidates, where)[0]
+
+        def build(ranked: List[Tuple[int, float]]) -> List[Dict[str, Any]]:
+            results = []
+            for row, score in ranked:
+                obj = collection.get_object(row, properties)
+                obj["_additional"]["score"] = score
+                results.append(obj)
+            return results
+
+        return self._resolve(
+            collection,
+            lambda: hybrid_rank(dense, lambda: collection.keyword_search(query, candidates, where), limit, fusion, alpha),
+            build
+        )
+
+    @staticmethod
+    def _resolve(collection: LocalCollection, search: Callable[[], Any], build: Callable[[Any], Any]) -> Any:
+        """
+        Run a search that returns row numbers and build its results from those rows under
+        the collection lock, searching again if compact() renumbered the rows in between.
+        """
+        while True:
+            generation = collection.generation
+            hits = search()
+            with collection.lock:
+                if collection.generation == generation:
+                    return build(hits)
+
+    @staticmethod
+    def _hit(collection: LocalCollection, row: int, similarity: float, properties: Optional[List[str]]) -> Dict[str, Any]:
+        """
+        Build a search result with Weaviate's cosine distance and certainty.
+        """
+        obj = collection.get_object(row, properties)
+        distance = 1.0 - similarity
+        obj["_additional"]["distance"] = distance
+        obj["_additional"]["certainty"] = 1.0 - distance / 2
+        return obj
+
+    def _get_collection(self, name: str) -> LocalCollection:
+        collection = self.collections.get(name)
+        if collection is None:
+            raise KeyError(f"Collection {name} does not exist")
+        return collection
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        if self.embedder is None:
+            raise ValueError("An embedder is required to search by text or insert objects without a vector.")
+        return self.embedder.encode_many(texts)
+
+    @staticmethod
+    def _parse_object(obj: Dict[str, Any]) -> Tuple[str, Dict[str, Any], Optional[Any]]:
+        """
+        Split an item passed to insert_objects_batch into its ID, properties and vector.
+        """
+        if isinstance(obj.get("properties"), dict):
+            object_id = obj.get("id")
+            return str(object_id) if object_id else str(uuid.uuid4()), obj["properties"], obj.get("vector")
+        return str(uuid.uuid4()), obj, None
+
+    @staticmethod
+    def _object_text(properties: Dict[str, Any]) -> str:
+        """
+        Join the text properties of an object into the text that is embedded.
+        """
+        return " ".join(str(value) for value in properties.values() if isinstance(value, str))
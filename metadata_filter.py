@@ -0,0 +1,411 @@
+"""
+Metadata Filters
+
+This module evaluates Weaviate-style `where` filters, the same dicts that
+WeaviateCloudClient passes to GraphQL, so one filter works against Weaviate, the mock
+server and LocalVectorStore:
+
+    {"path": ["category"], "operator": "Equal", "valueText": "Science"}
+    {"operator": "And", "operands": [
+        {"path": ["category"], "operator": "ContainsAny", "valueTextArray": ["Science", "History"]},
+        {"path": ["publishDate"], "operator": "GreaterThanEqual", "valueDate": "2024-01-01T00:00:00Z"}
+    ]}
+
+Supported operators: Equal, NotEqual, GreaterThan, GreaterThanEqual, LessThan,
+LessThanEqual, Like (with * and ? wildcards, case-insensitive), ContainsAny,
+ContainsAll, IsNull, and And, Or and Not over "operands". Equal on an array property
+matches if any element is equal. Dates are compared as RFC 3339 strings, so stored
+dates and filter values must use the same format and time zone.
+
+matches() checks a single object. MetadataIndex answers the same filters for a whole
+LocalCollection from inverted indexes: for each property that has been filtered on,
+a map from value to the rows holding it, stored as a CompressedBitmap. The filter is
+evaluated on these postings into a row mask, which the search uses to pre-filter
+candidates instead of over-fetching and filtering afterwards.
+
+Usage:
+    from metadata_filter import MetadataIndex, matches
+
+    where = {"path": ["category"], "operator": "Equal", "valueText": "Science"}
+    matches(where, {"category": "Science"})  # True
+
+    index = MetadataIndex()
+    mask = index.evaluate(where, collection.columns, collection.row_count)
+"""
+
+import re
+import json
+import bisect
+import logging
+import numpy as np
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+COMPARISON_OPERATORS = ("GreaterThan", "GreaterThanEqual", "LessThan", "LessThanEqual")
+VALUE_OPERATORS = ("Equal", "NotEqual", "Like", "ContainsAny", "ContainsAll", "IsNull") + COMPARISON_OPERATORS
+LOGICAL_OPERATORS = ("And", "Or", "Not")
+
+# Rows are grouped into chunks of 2^16; a chunk holding more than ARRAY_CHUNK_MAX rows
+# is stored as a bitmap (8 KB), a sparser one as a sorted array of 16-bit offsets
+CHUNK_BITS = 16
+CHUNK_ROWS = 1 << CHUNK_BITS
+ARRAY_CHUNK_MAX = 4096
+
+
+def filter_value(where: Dict[str, Any]) -> Tuple[str, Any]:
+    """
+    Return the value key of a filter ("valueText", "valueInt", ...) and its value.
+    """
+    for key, value in where.items():
+        if key.startswith("value"):
+            return key, value
+    raise ValueError(f"Filter on {where.get('path')} with {where.get('operator')} has no value")
+
+
+def filter_property(where: Dict[str, Any]) -> str:
+    """
+    Return the property a filter applies to. Paths through cross-references are not supported.
+    """
+    path = where.get("path")
+    if isinstance(path, str):
+        path = [path]
+    if not path or len(path) != 1:
+        raise ValueError(f"Filter path must name one property, got {path!r}")
+    return path[0]
+
+
+def value_key(value: Any) -> Optional[Tuple[str, Any]]:
+    """
+    Return the index key of a scalar value, tagged by kind so that True, 1 and "1" differ.
+    """
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return ("boolean", value)
+    if isinstance(value, (int, float)):
+        return ("number", value)
+    if isinstance(value, str):
+        return ("text", value)
+    return ("json", json.dumps(value, sort_keys=True))
+
+
+def value_keys(value: Any) -> List[Optional[Tuple[str, Any]]]:
+    """
+    Return the index keys of a property value: one per distinct element of an array,
+    and [None] for a missing value or an empty array.
+    """
+    if isinstance(value, list):
+        keys = list(dict.fromkeys(value_key(element) for element in value if element is not None))
+        return keys or [None]
+    return [value_key(value)]
+
+
+def like_pattern(pattern: str) -> "re.Pattern":
+    """
+    Compile a Like pattern, where * matches any text and ? one character.
+    """
+    regex = re.escape(pattern).replace(r"\*", ".*").replace(r"\?", ".")
+    return re.compile(regex, re.IGNORECASE | re.DOTALL)
+
+
+def _compare(operator: str, stored: Any, value: Any) -> bool:
+    if operator == "GreaterThan":
+        return stored > value
+    if operator == "GreaterThanEqual":
+        return stored >= value
+    if operator == "LessThan":
+        return stored < value
+    return stored <= value
+
+
+def matches(where: Dict[str, Any], properties: Dict[str, Any]) -> bool:
+    """
+    Return whether an object's properties satisfy a filter.
+    """
+    operator = where.get("operator")
+    if operator in LOGICAL_OPERATORS:
+        operands = where.get("operands") or []
+        if operator == "And":
+            return all(matches(operand, properties) for operand in operands)
+        if operator == "Or":
+            return any(matches(operand, properties) for operand in operands)
+        return not matches(operands[0], properties)
+    if operator not in VALUE_OPERATORS:
+        raise ValueError(f"Unsupported filter operator {operator!r}")
+
+    keys = value_keys(properties.get(filter_property(where)))
+    _, value = filter_value(where)
+    if operator == "IsNull":
+        return (keys == [None]) == bool(value)
+    if operator in ("Equal", "NotEqual"):
+        return (value_key(value) in keys) == (operator == "Equal")
+    if operator == "ContainsAny":
+        return any(value_key(v) in keys for v in value)
+    if operator == "ContainsAll":
+        return all(value_key(v) in keys for v in value)
+    if operator == "Like":
+        pattern = like_pattern(value)
+        return any(key is not None and key[0] == "text" and pattern.fullmatch(key[1]) for key in keys)
+
+    target = value_key(value)
+    return any(key is not None and key[0] == target[0] and _compare(operator, key[1], target[1]) for key in keys)
+
+
+class CompressedBitmap:
+    """
+    Set of row numbers in the layout of a roaring bitmap.
+
+    Rows are split into chunks of 2^16 by their high bits. A sparse chunk is a sorted
+    array of 16-bit offsets (2 bytes per row); once it holds more than ARRAY_CHUNK_MAX
+    rows it becomes an 8 KB bitmap, so no chunk ever takes more than 8 KB.
+    """
+
+    def __init__(self):
+        # chunk number -> sorted uint16 offsets, or packed uint8 bits for a dense chunk
+        self.chunks: Dict[int, np.ndarray] = {}
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    @staticmethod
+    def _cardinality(chunk: np.ndarray) -> int:
+        if chunk.dtype == np.uint16:
+            return len(chunk)
+        return int(np.unpackbits(chunk).sum())
+
+    def add_many(self, rows: Iterable[int]) -> None:
+        """
+        Add rows, given in ascending order.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        if not len(rows):
+            return
+        if rows[0] >> CHUNK_BITS == rows[-1] >> CHUNK_BITS:
+            # The common case of rows appended to one chunk; skip the split
+            parts = [rows]
+        else:
+            parts = np.split(rows, np.flatnonzero(np.diff(rows >> CHUNK_BITS)) + 1)
+        for part in parts:
+            number = int(part[0] >> CHUNK_BITS)
+            offsets = (part & (CHUNK_ROWS - 1)).astype(np.uint16)
+            chunk = self.chunks.get(number)
+            if chunk is not None:
+                self.count -= self._cardinality(chunk)
+
+            if chunk is not None and chunk.dtype == np.uint8:
+                bits = np.unpackbits(chunk, bitorder="little")
+                bits[offsets] = 1
+                chunk = np.packbits(bits, bitorder="little")
+            else:
+                chunk = offsets if chunk is None else np.union1d(chunk, offsets).astype(np.uint16)
+                if len(chunk) > ARRAY_CHUNK_MAX:
+                    bits = np.zeros(CHUNK_ROWS, dtype=np.uint8)
+                    bits[chunk] = 1
+                    chunk = np.packbits(bits, bitorder="little")
+
+            self.chunks[number] = chunk
+            self.count += self._cardinality(chunk)
+
+    def or_into(self, mask: np.ndarray) -> np.ndarray:
+        """
+        Set the rows of this bitmap in a boolean row mask and return the mask.
+        """
+        return union_into(mask, [self])
+
+    def to_mask(self, size: int) -> np.ndarray:
+        """
+        Return a boolean mask of `size` rows with this bitmap's rows set.
+        """
+        return union_into(np.zeros(size, dtype=bool), [self])
+
+    def rows(self) -> np.ndarray:
+        """
+        Return the rows as a sorted int64 array.
+        """
+        if len(self.chunks) == 1:
+            (number, chunk), = self.chunks.items()
+            if chunk.dtype == np.uint16:
+                return (number << CHUNK_BITS) + chunk.astype(np.int64)
+        parts = []
+        for number in sorted(self.chunks):
+            chunk = self.chunks[number]
+            offsets = chunk if chunk.dtype == np.uint16 else np.flatnonzero(np.unpackbits(chunk, bitorder="little"))
+            parts.append((number << CHUNK_BITS) + offsets.astype(np.int64))
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the chunks."""
+        return sum(chunk.nbytes for chunk in self.chunks.values())
+
+
+def union_into(mask: np.ndarray, bitmaps: Iterable[CompressedBitmap]) -> np.ndarray:
+    """
+    Set the rows of all bitmaps in a boolean row mask and return the mask.
+
+    The sparse chunks of all bitmaps are gathered and set with one assignment, which keeps
+    unions over many small postings (a range over unique values, a Like pattern) cheap.
+    """
+    size = len(mask)
+    sparse = []
+    for bitmap in bitmaps:
+        for number, chunk in bitmap.chunks.items():
+            base = number << CHUNK_BITS
+            if base >= size:
+                continue
+            if chunk.dtype == np.uint16:
+                sparse.append(base + chunk.astype(np.int64))
+            else:
+                bits = np.unpackbits(chunk, bitorder="little")[:size - base].astype(bool)
+                mask[base:base + len(bits)] |= bits
+    if sparse:
+        rows = np.concatenate(sparse)
+        mask[rows[rows < size]] = True
+    return mask
+
+
+class MetadataIndex:
+    """
+    Inverted indexes from property values to CompressedBitmaps of rows.
+
+    A property is indexed the first time a filter uses it, and rows appended since the
+    last filter are indexed on the next one, so filters on a growing collection stay
+    incremental. The index is not thread-safe; LocalCollection calls it under its lock.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[Optional[Tuple[str, Any]], CompressedBitmap]] = {}
+        # Number of rows indexed per property
+        self.indexed_rows: Dict[str, int] = {}
+        # Per (property, kind): the sorted values, and the rows of all of them in that
+        # order with the offset where each value's rows start, so a range of values is
+        # one slice of rows. Built for range and Like filters, dropped when rows are indexed.
+        self._sorted: Dict[Tuple[str, str], Tuple[List[Any], np.ndarray, np.ndarray]] = {}
+
+    def reset(self) -> None:
+        """
+        Drop every index, e.g. after the rows of the collection were renumbered.
+        """
+        self.postings.clear()
+        self.indexed_rows.clear()
+        self._sorted.clear()
+
+    def _property_postings(self,
+                           name: str,
+                           columns: Dict[str, List[Any]],
+                           row_count: int) -> Dict[Optional[Tuple[str, Any]], CompressedBitmap]:
+        """
+        Return the postings of a property, first indexing any rows added since the last call.
+        """
+        postings = self.postings.setdefault(name, {})
+        start = self.indexed_rows.get(name, 0)
+        if start >= row_count:
+            return postings
+
+        values = columns.get(name)
+        rows_by_key: Dict[Optional[Tuple[str, Any]], List[int]] = {}
+        for row in range(start, row_count):
+            value = values[row] if values is not None else None
+            for key in value_keys(value):
+                rows_by_key.setdefault(key, []).append(row)
+        for key, rows in rows_by_key.items():
+            postings.setdefault(key, CompressedBitmap()).add_many(rows)
+
+        self.indexed_rows[name] = row_count
+        for cached in [cached for cached in self._sorted if cached[0] == name]:
+            del self._sorted[cached]
+        logger.debug(f"Indexed rows {start}-{row_count} of property {name} ({len(postings)} distinct values)")
+        return postings
+
+    def _sorted_values(self,
+                       name: str,
+                       kind: str,
+                       postings: Dict[Any, CompressedBitmap]) -> Tuple[List[Any], np.ndarray, np.ndarray]:
+        """
+        Return the sorted values of one kind of a property, the start offset of each
+        value's rows (plus the end), and the rows in value order.
+        """
+        cached = self._sorted.get((name, kind))
+        if cached is None:
+            keys = sorted(key for key in postings if key is not None and key[0] == kind)
+            row_arrays = [postings[key].rows() for key in keys]
+            starts = np.cumsum([0] + [len(rows) for rows in row_arrays])
+            rows = np.concatenate(row_arrays) if row_arrays else np.zeros(0, dtype=np.int64)
+            cached = self._sorted[(name, kind)] = ([key[1] for key in keys], starts, rows)
+        return cached
+
+    def evaluate(self, where: Dict[str, Any], columns: Dict[str, List[Any]], row_count: int) -> np.ndarray:
+        """
+        Evaluate a filter over all rows.
+
+        Args:
+            where: The filter.
+            columns: Property values per row, keyed by property name.
+            row_count: Number of rows.
+
+        Returns:
+            Boolean mask of the rows that match. Deleted rows are not excluded.
+        """
+        operator = where.get("operator")
+        if operator in LOGICAL_OPERATORS:
+            masks = [self.evaluate(operand, columns, row_count) for operand in where.get("operands") or []]
+            if operator == "And":
+                return np.logical_and.reduce(masks) if masks else np.ones(row_count, dtype=bool)
+            if operator == "Or":
+                return np.logical_or.reduce(masks) if masks else np.zeros(row_count, dtype=bool)
+            return ~masks[0]
+        if operator not in VALUE_OPERATORS:
+            raise ValueError(f"Unsupported filter operator {operator!r}")
+
+        name = filter_property(where)
+        postings = self._property_postings(name, columns, row_count)
+        _, value = filter_value(where)
+        mask = np.zeros(row_count, dtype=bool)
+
+        if operator == "IsNull":
+            if None in postings:
+                postings[None].or_into(mask)
+            return mask if value else ~mask
+        if operator in ("Equal", "NotEqual"):
+            key = value_key(value)
+            if key in postings:
+                postings[key].or_into(mask)
+            return mask if operator == "Equal" else ~mask
+        if operator == "ContainsAny":
+            return union_into(mask, [postings[key] for key in {value_key(v) for v in value} if key in postings])
+        if operator == "ContainsAll":
+            mask[:] = True
+            for key in {value_key(v) for v in value}:
+                if key not in postings:
+                    return np.zeros(row_count, dtype=bool)
+                mask &= postings[key].to_mask(row_count)
+            return mask
+        if operator == "Like":
+            pattern = like_pattern(value)
+            values, starts, rows = self._sorted_values(name, "text", postings)
+            for i, text in enumerate(values):
+                if pattern.fullmatch(text):
+                    mask[rows[starts[i]:starts[i + 1]]] = True
+            return mask
+
+        # Range filters: the values of the filter's kind are sorted, so the matches are one slice
+        kind, target = value_key(value)
+        values, starts, rows = self._sorted_values(name, kind, postings)
+        if operator == "GreaterThan":
+            first, last = bisect.bisect_right(values, target), len(values)
+        elif operator == "GreaterThanEqual":
+            first, last = bisect.bisect_left(values, target), len(values)
+        elif operator == "LessThan":
+            first, last = 0, bisect.bisect_left(values, target)
+        else:
+            first, last = 0, bisect.bisect_right(values, target)
+        mask[rows[starts[first]:starts[last]]] = True
+        return mask
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the postings bitmaps."""
+        return sum(bitmap.nbytes for postings in self.postings.values() for bitmap in postings.values())
+
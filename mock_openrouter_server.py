@@ -0,0 +1,175 @@
+"""
+Mock OpenRouter Server
+
+This module provides a local stand-in for the OpenRouter /chat/completions endpoint,
+for testing OpenRouterClient without network access or API costs. Replies can be
+streamed as Server-Sent Events. The delay before the first token and the token rate
+are configurable, so streaming and batch concurrency can be measured.
+
+Usage:
+    from mock_openrouter_server import MockOpenRouterServer
+    from openrouter_llm import OpenRouterClient
+
+    with MockOpenRouterServer(first_token_latency=0.2, tokens_per_second=50) as server:
+        client = OpenRouterClient(api_key="mock", base_url=server.url)
+        stream = client.stream("Hello")
+        print("".join(stream), stream.time_to_first_token)
+"""
+
+import json
+import time
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def echo_reply(prompt: str) -> str:
+    """
+    Default reply: a fixed sentence followed by the first words of the prompt.
+    """
+    return "This is a mock answer to: " + " ".join(prompt.split()[:20])
+
+
+class _MockOpenRouterHandler(BaseHTTPRequestHandler):
+    """
+    Request handler; the server instance carries the reply function and timing settings.
+    """
+
+    protocol_version = "HTTP/1.1"
+    # Streamed events are small writes; send each one immediately
+    disable_nagle_algorithm = True
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(format % args)
+
+    def do_POST(self) -> None:
+        server: MockOpenRouterServer = self.server.mock
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else {}
+
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"{self.path} is not supported by the mock server"}})
+            return
+
+        with server.lock:
+            server.requests += 1
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            prompt = body.get("messages", [{}])[-1].get("content", "")
+            tokens = [token + " " for token in server.reply(prompt).split()]
+            time.sleep(server.first_token_latency)
+
+            if body.get("stream"):
+                self._stream(body.get("model"), tokens, server.tokens_per_second)
+            else:
+                time.sleep(len(tokens) / server.tokens_per_second)
+                self._send_json(200, {
+                    "id": "mock",
+                    "model": body.get("model"),
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": "".join(tokens).strip()}}]
+                })
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, model: Optional[str], tokens: list, tokens_per_second: float) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        self._write_chunk(": OPENROUTER PROCESSING\n\n")
+        for i, token in enumerate(tokens):
+            if i:
+                time.sleep(1 / tokens_per_second)
+            event = {"id": "mock", "model": model,
+                     "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]}
+            self._write_chunk(f"data: {json.dumps(event)}\n\n")
+        final = {"id": "mock", "model": model, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+        self._write_chunk(f"data: {json.dumps(final)}\n\n")
+        self._write_chunk("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, text: str) -> None:
+        data = text.encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+class MockOpenRouterServer:
+    """
+    Local HTTP server that imitates the OpenRouter chat completions API.
+    """
+
+    def __init__(self,
+                 host: str = "127.0.0.1",
+                 port: int = 0,
+                 first_token_latency: float = 0.0,
+                 tokens_per_second: float = 1000.0,
+                 reply: Callable[[str], str] = echo_reply):
+        """
+        Initialize the server. It starts listening on start() or when used as a context manager.
+
+        Args:
+            host: The interface to listen on.
+            port: The port to listen on. 0 picks a free port.
+            first_token_latency: Delay in seconds before the first token of every reply.
+            tokens_per_second: Rate at which the remaining tokens are produced.
+            reply: Builds the reply text from the prompt.
+        """
+        self.host = host
+        self.port = port
+        self.first_token_latency = first_token_latency
+        self.tokens_per_second = tokens_per_second
+        self.reply = reply
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._httpd: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        """The base URL to pass to OpenRouterClient."""
+        return f"http://{self.host}:{self.port}/api/v1"
+
+    def start(self) -> "MockOpenRouterServer":
+        """
+        Start serving on a background thread.
+        """
+        self._httpd = ThreadingHTTPServer((self.host, self.port), _MockOpenRouterHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.mock = self
+        self.port = self._httpd.server_address[1]
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        logger.info(f"Mock OpenRouter server listening on {self.url}")
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop serving and close the socket.
+        """
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self) -> "MockOpenRouterServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
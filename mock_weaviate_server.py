@@ -0,0 +1,456 @@
+"""
+Mock Weaviate Server
+
+This module provides a local stand-in for the parts of the Weaviate REST API that
+WeaviateCloudClient uses: /v1/meta, /v1/schema, /v1/objects, /v1/batch/objects and
+/v1/graphql. Objects are kept in memory. Every request can be delayed by a fixed
+latency plus random jitter, to mimic the round trip to a cloud cluster.
+
+The GraphQL endpoint understands the Get queries built by weaviate_client_v4: plain
+and cursor (after:) reads, nearText, hybrid, and aliased nearVector sub-queries, each
+optionally with a where filter. nearVector ranks objects by cosine distance; nearText
+has no vectorizer behind it, so it ranks objects by how many query terms appear in
+their text properties. hybrid fuses that term ranking with the nearVector ranking
+when a vector is given. Filters are evaluated with metadata_filter.matches.
+
+Usage:
+    from mock_weaviate_server import MockWeaviateServer
+    from weaviate_client_v4 import WeaviateCloudClient
+
+    with MockWeaviateServer(latency=0.005) as server:
+        client = WeaviateCloudClient(url=server.url, api_key="mock")
+        client.create_collection("Article", [{"name": "title", "dataType": ["text"]}])
+        print(client.query_objects("Article", ["title"]))
+"""
+
+import re
+import json
+import time
+import uuid
+import random
+import logging
+import threading
+import numpy as np
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Any, Optional, Tuple
+
+from bm25_index import fuse
+from metadata_filter import matches
+
+logger = logging.getLogger(__name__)
+
+
+class MockWeaviateState:
+    """
+    In-memory schema and objects shared by all request handlers.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.classes: Dict[str, Dict[str, Any]] = {}
+        # class name -> object ID -> {"properties": ..., "vector": ...}, in insertion order
+        self.objects: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    def create_class(self, definition: Dict[str, Any]) -> Tuple[int, Any]:
+        name = definition.get("class")
+        with self.lock:
+            if not name or name in self.classes:
+                return 422, {"error": [{"message": f"class name {name!r} already exists or is invalid"}]}
+            self.classes[name] = {"properties": [], "vectorizer": "none", **definition}
+            self.objects[name] = {}
+        return 200, self.classes[name]
+
+    def delete_class(self, name: str) -> Tuple[int, Any]:
+        with self.lock:
+            self.classes.pop(name, None)
+            self.objects.pop(name, None)
+        return 200, None
+
+    def put_object(self, obj: Dict[str, Any]) -> Optional[str]:
+        """
+        Store an object. Returns an error message, or None on success.
+        """
+        name = obj.get("class")
+        with self.lock:
+            if name not in self.classes:
+                return f"class {name!r} not found"
+            object_id = obj.get("id") or str(uuid.uuid4())
+            vector = obj.get("vector")
+            self.objects[name][object_id] = {
+                "properties": obj.get("properties") or {},
+                "vector": np.asarray(vector, dtype=np.float32) if vector is not None else None
+            }
+            obj["id"] = object_id
+        return None
+
+    def get(self, name: str, args: str, fields: List[str], additional: List[str]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Run one Get sub-query. Returns None if the class does not exist.
+        """
+        with self.lock:
+            if name not in self.objects:
+                return None
+            items = list(self.objects[name].items())
+
+        limit = _int_arg(args, "limit", 10)
+        after = _json_arg(args, "after")
+        vector = _json_arg(args, "vector")
+        concepts = _json_arg(args, "concepts")
+        where = _where_arg(args)
+        if where is not None:
+            items = [item for item in items if matches(where, item[1]["properties"])]
+
+        distances: Dict[str, float] = {}
+        scores: Dict[str, float] = {}
+        if vector is not None:
+            distances = _distances(items, vector)
+        if re.search(r"\bhybrid:\s*\{", args):
+            # Both rankings are fused the way LocalVectorStore fuses them
+            terms = _term_counts(items, _json_arg(args, "query") or "")
+            keyword = sorted(((object_id, count) for object_id, count in terms.items() if count),
+                             key=lambda entry: -entry[1])
+            dense = sorted(distances.items(), key=lambda entry: entry[1])
+            fusion = "relative_score" if "relativeScoreFusion" in args else "rrf"
+            scores = dict(fuse([(object_id, -distance) for object_id, distance in dense], keyword,
+                               len(items), fusion, _float_arg(args, "alpha", 0.75)))
+            items = sorted((item for item in items if item[0] in scores), key=lambda item: -scores[item[0]])
+        elif vector is not None:
+            items = sorted((item for item in items if item[0] in distances), key=lambda item: distances[item[0]])
+        elif concepts:
+            # Without a vectorizer, shared terms stand in for semantic similarity
+            terms = _term_counts(items, " ".join(concepts))
+            distances = {object_id: 1.0 / (1 + count) for object_id, count in terms.items()}
+            items = sorted(items, key=lambda item: distances[item[0]])
+        else:
+            # Plain reads list objects in ID order, as Weaviate does, so cursor pages line up
+            items = sorted(items)
+            if after is not None:
+                items = [item for item in items if item[0] > after]
+
+        results = []
+        for object_id, obj in items[:limit]:
+            result = {field: obj["properties"].get(field) for field in fields}
+            if additional:
+                extra: Dict[str, Any] = {}
+                for field in additional:
+                    if field == "id":
+                        extra["id"] = object_id
+                    elif field == "vector":
+                        extra["vector"] = obj["vector"].tolist() if obj["vector"] is not None else None
+                    elif field == "distance" and object_id in distances:
+                        extra["distance"] = distances[object_id]
+                    elif field == "certainty" and object_id in distances:
+                        extra["certainty"] = 1.0 - distances[object_id] / 2
+                    elif field == "score" and object_id in scores:
+                        extra["score"] = scores[object_id]
+                result["_additional"] = extra
+            results.append(result)
+        return results
+
+
+def _int_arg(args: str, name: str, default: int) -> int:
+    match = re.search(rf"\b{name}:\s*(\d+)", args)
+    return int(match.group(1)) if match else default
+
+
+def _float_arg(args: str, name: str, default: float) -> float:
+    match = re.search(rf"\b{name}:\s*(-?\d+(?:\.\d+)?)", args)
+    return float(match.group(1)) if match else default
+
+
+def _distances(items: List[Tuple[str, Dict[str, Any]]], vector: List[float]) -> Dict[str, float]:
+    """
+    Cosine distance from a query vector to each object that has a vector of the same length.
+    """
+    query = np.asarray(vector, dtype=np.float32)
+    query /= np.linalg.norm(query) or 1.0
+    distances = {}
+    for object_id, obj in items:
+        if obj["vector"] is not None and len(obj["vector"]) == len(query):
+            norm = float(np.linalg.norm(obj["vector"])) or 1.0
+            distances[object_id] = 1.0 - float(obj["vector"] @ query) / norm
+    return distances
+
+
+def _term_counts(items: List[Tuple[str, Dict[str, Any]]], text: str) -> Dict[str, int]:
+    """
+    Number of (property, query term) pairs where the term appears in the property value, per object.
+    """
+    terms = set(text.lower().split())
+    return {
+        object_id: sum(term in str(value).lower() for value in obj["properties"].values() for term in terms)
+        for object_id, obj in items
+    }
+
+
+def _json_arg(args: str, name: str) -> Any:
+    """
+    Decode the JSON value (string or list) that follows `name:` in a GraphQL argument list.
+    """
+    match = re.search(rf"\b{name}:\s*", args)
+    if not match:
+        return None
+    try:
+        value, _ = json.JSONDecoder().raw_decode(args, match.end())
+    except ValueError:
+        return None
+    return value
+
+
+def _where_arg(args: str) -> Optional[Dict[str, Any]]:
+    """
+    Decode the `where:` input object of a GraphQL argument list into a filter dict.
+
+    GraphQL input objects differ from JSON only in their unquoted keys and enum values,
+    so the names are quoted and the result is parsed as JSON.
+    """
+    match = re.search(r"\bwhere:\s*\{", args)
+    if not match:
+        return None
+    start = match.end() - 1
+    literal = args[start:_matching(args, start, "{", "}") + 1]
+
+    parts = []
+    position = 0
+    token = re.compile(r'"|-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?|[A-Za-z_]\w*')
+    while True:
+        found = token.search(literal, position)
+        if not found:
+            parts.append(literal[position:])
+            break
+        parts.append(literal[position:found.start()])
+        if found.group() == '"':
+            _, end = json.JSONDecoder().raw_decode(literal, found.start())
+            parts.append(literal[found.start():end])
+            position = end
+            continue
+        text = found.group()
+        is_name = text[0].isalpha() or text[0] == "_"
+        parts.append(json.dumps(text) if is_name and text not in ("true", "false", "null") else text)
+        position = found.end()
+    return json.loads("".join(parts))
+
+
+def _matching(text: str, start: int, open_char: str, close_char: str) -> int:
+    """
+    Return the index of the bracket that closes the one at `start`, skipping JSON strings.
+    """
+    depth = 0
+    i = start
+    while i < len(text):
+        char = text[i]
+        if char == '"':
+            _, i = json.JSONDecoder().raw_decode(text, i)
+            continue
+        if char == open_char:
+            depth += 1
+        elif char == close_char:
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    raise ValueError(f"Unbalanced {open_char}{close_char} in GraphQL query")
+
+
+def parse_get_query(query: str) -> List[Tuple[str, str, str, List[str], List[str]]]:
+    """
+    Split a GraphQL Get query into its sub-queries.
+
+    Returns:
+        List of (response key, class name, argument text, property fields, _additional fields).
+    """
+    match = re.search(r"\bGet\s*\{", query)
+    if not match:
+        raise ValueError("Only Get queries are supported")
+    body_start = match.end() - 1
+    body = query[body_start + 1:_matching(query, body_start, "{", "}")]
+
+    sub_queries = []
+    position = 0
+    head = re.compile(r"\s*(?:(\w+)\s*:\s*)?(\w+)\s*")
+    while True:
+        match = head.match(body, position)
+        if not match or match.end() >= len(body):
+            break
+        alias, name = match.group(1), match.group(2)
+        position = match.end()
+
+        args = ""
+        if body[position] == "(":
+            end = _matching(body, position, "(", ")")
+            args = body[position + 1:end]
+            position = end + 1
+        position = body.index("{", position)
+        end = _matching(body, position, "{", "}")
+        selection = body[position + 1:end]
+        position = end + 1
+
+        additional: List[str] = []
+        extra = re.search(r"_additional\s*\{([^}]*)\}", selection)
+        if extra:
+            additional = extra.group(1).split()
+            selection = selection[:extra.start()] + selection[extra.end():]
+        sub_queries.append((alias or name, name, args, selection.split(), additional))
+    return sub_queries
+
+
+class _MockWeaviateHandler(BaseHTTPRequestHandler):
+    """
+    Request handler; the server instance carries the shared state and latency settings.
+    """
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this, delayed ACKs add ~40 ms per request
+    disable_nagle_algorithm = True
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(format % args)
+
+    def do_GET(self) -> None:
+        self._handle("GET")
+
+    def do_POST(self) -> None:
+        self._handle("POST")
+
+    def do_DELETE(self) -> None:
+        self._handle("DELETE")
+
+    def _handle(self, method: str) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+
+        server: MockWeaviateServer = self.server.mock
+        server.wait()
+        try:
+            status, payload = server.route(method, self.path, body)
+            data = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        except Exception as e:
+            logger.error(f"Mock server failed on {method} {self.path}: {e}", exc_info=True)
+            status, data = 500, json.dumps({"error": [{"message": str(e)}]}).encode("utf-8")
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class MockWeaviateServer:
+    """
+    Local HTTP server that imitates a Weaviate instance, with injected latency.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, jitter: float = 0.0):
+        """
+        Initialize the server. It starts listening on start() or when used as a context manager.
+
+        Args:
+            host: The interface to listen on.
+            port: The port to listen on. 0 picks a free port.
+            latency: Delay in seconds added to every request.
+            jitter: Upper bound in seconds of a random delay added on top of the latency.
+        """
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.state = MockWeaviateState()
+        self.requests = 0
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """The base URL, including the scheme, to pass to WeaviateCloudClient."""
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "MockWeaviateServer":
+        """
+        Start serving on a background thread.
+        """
+        self._httpd = ThreadingHTTPServer((self.host, self.port), _MockWeaviateHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.mock = self
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Mock Weaviate server listening on {self.url}")
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop serving and close the socket.
+        """
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self) -> "MockWeaviateServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def wait(self) -> None:
+        """
+        Sleep for the injected latency.
+        """
+        self.requests += 1
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            time.sleep(delay)
+
+    def route(self, method: str, path: str, body: Any) -> Tuple[int, Any]:
+        """
+        Dispatch a request to the matching endpoint.
+
+        Returns:
+            Tuple of the status code and the JSON payload (None for an empty body).
+        """
+        path = path.split("?", 1)[0].rstrip("/")
+        state = self.state
+
+        if path == "/v1/meta" and method == "GET":
+            return 200, {"version": "mock", "hostname": self.url, "modules": {}}
+
+        if path == "/v1/schema":
+            if method == "GET":
+                with state.lock:
+                    return 200, {"classes": list(state.classes.values())}
+            if method == "POST":
+                return state.create_class(body or {})
+        if path.startswith("/v1/schema/") and method == "DELETE":
+            return state.delete_class(path[len("/v1/schema/"):])
+
+        if path == "/v1/objects" and method == "POST":
+            error = state.put_object(body or {})
+            if error:
+                return 422, {"error": [{"message": error}]}
+            return 200, body
+
+        if path == "/v1/batch/objects" and method == "POST":
+            results = []
+            for obj in (body or {}).get("objects", []):
+                error = state.put_object(obj)
+                result = {"errors": {"error": [{"message": error}]}} if error else {}
+                results.append({"id": obj.get("id"), "class": obj.get("class"), "result": result})
+            return 200, results
+
+        if path == "/v1/graphql" and method == "POST":
+            return 200, self._graphql((body or {}).get("query", ""))
+
+        return 404, {"error": [{"message": f"{method} {path} is not supported by the mock server"}]}
+
+    def _graphql(self, query: str) -> Dict[str, Any]:
+        data: Dict[str, Any] = {}
+        errors = []
+        for key, name, args, fields, additional in parse_get_query(query):
+            objects = self.state.get(name, args, fields, additional)
+            if objects is None:
+                errors.append({"message": f"Cannot query field \"{name}\" on type \"GetObjectsObj\"."})
+            data[key] = objects
+        result: Dict[str, Any] = {"data": {"Get": data}}
+        if errors:
+            result["errors"] = errors
+        return result
@@ -0,0 +1,283 @@
+"""
+OpenRouter LLM Client
+
+This module provides OpenRouterClient, the chat completion client behind the
+RobustOpenRouterLLM wrapper in the Chroma notebook. On top of plain completions it adds:
+
+    stream()        Server-Sent Events streaming; the time to the first token is
+                    recorded on the returned stream
+    answer_batch()  many questions answered concurrently under a concurrency and
+                    request-rate limit, with retrieval for the next questions running
+                    while earlier answers are being generated
+
+Requests go through a pooled RestTransport (see weaviate_transport), which keeps
+keep-alive connections, sends the bearer token and retries 429/5xx responses with
+jittered backoff. A retried stream starts the generation over, so streams have their
+own, smaller retry count.
+
+Usage:
+    from openrouter_llm import OpenRouterClient
+
+    client = OpenRouterClient()
+    stream = client.stream("Explain vector databases in one sentence.")
+    for token in stream:
+        print(token, end="", flush=True)
+    print(f"\\nFirst token after {stream.time_to_first_token:.2f}s")
+
+    results = client.answer_batch(
+        questions,
+        retrieve=lambda q: vector_store.similarity_search(q, k=2),
+        build_prompt=lambda q, docs: f"Question: {q}\\nContext: " + "\\n\\n".join(d.page_content for d in docs)
+    )
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Any, Callable, Iterable, Iterator, Optional, Union, Tuple
+from dotenv import load_dotenv
+
+from weaviate_transport import RestTransport
+
+logger = logging.getLogger(__name__)
+
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket that allows `rate` acquisitions per second, with bursts up to `burst`.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive.")
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """
+        Block until a request may be sent.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class CompletionStream:
+    """
+    Iterator over the text deltas of a streamed completion.
+
+    After the first delta, time_to_first_token holds the seconds since the request was
+    sent; after iteration, text holds the whole completion.
+    """
+
+    def __init__(self, response: Any, started: float):
+        self.response = response
+        self.started = started
+        self.time_to_first_token: Optional[float] = None
+        self.total_time: Optional[float] = None
+        self.finish_reason: Optional[str] = None
+        self._parts: List[str] = []
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    def __iter__(self) -> Iterator[str]:
+        try:
+            for line in self.response.iter_lines(decode_unicode=True):
+                # Blank lines separate events; lines starting with ":" are keep-alive comments
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+
+                event = json.loads(data)
+                if event.get("error"):
+                    raise RuntimeError(f"OpenRouter stream error: {event['error']}")
+                choice = (event.get("choices") or [{}])[0]
+                self.finish_reason = choice.get("finish_reason") or self.finish_reason
+                delta = (choice.get("delta") or {}).get("content")
+                if delta:
+                    if self.time_to_first_token is None:
+                        self.time_to_first_token = time.perf_counter() - self.started
+                    self._parts.append(delta)
+                    yield delta
+        finally:
+            self.total_time = time.perf_counter() - self.started
+            self.response.close()
+
+
+class OpenRouterClient:
+    """
+    Chat completion client for OpenRouter with streaming and concurrent batch answering.
+    """
+
+    def __init__(self,
+                 api_key: Optional[str] = None,
+                 model: Optional[str] = None,
+                 base_url: str = OPENROUTER_BASE_URL,
+                 max_tokens: int = 2048,
+                 temperature: float = 0.7,
+                 pool_size: int = 10,
+                 timeout: Union[float, Tuple[float, float]] = (5.0, 60.0),
+                 max_retries: int = 3,
+                 stream_max_retries: int = 1,
+                 requests_per_second: Optional[float] = None):
+        """
+        Initialize the client.
+
+        Args:
+            api_key: The OpenRouter API key. If None, it will be loaded from the environment.
+            model: The model to use. If None, OPENROUTER_MODEL or "openai/gpt-3.5-turbo".
+            base_url: The API base URL; point it at a mock server for tests.
+            max_tokens: Maximum number of tokens per completion.
+            temperature: Sampling temperature.
+            pool_size: Maximum number of keep-alive connections; also the useful upper bound
+                for answer_batch concurrency.
+            timeout: Request timeout in seconds, or a (connect, read) tuple. For streams the
+                read timeout applies between chunks.
+            max_retries: Number of retries for 429/5xx responses and connection errors.
+            stream_max_retries: Number of such retries when starting a stream. Each retry
+                asks the upstream model to generate the whole completion again.
+            requests_per_second: If set, completions are started at most this often.
+        """
+        load_dotenv()
+
+        self.api_key = api_key or os.getenv("OPENROUTER_API_KEY")
+        self.model = model or os.getenv("OPENROUTER_MODEL", "openai/gpt-3.5-turbo")
+        if not self.api_key:
+            raise ValueError("OpenRouter API key is required. Set it in the environment or pass it to the constructor.")
+
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.stream_max_retries = stream_max_retries
+        self.rate_limiter = RateLimiter(requests_per_second) if requests_per_second else None
+        self.transport = RestTransport(
+            base_url,
+            self.api_key,
+            headers={
+                "Content-Type": "application/json",
+                "HTTP-Referer": "https://localhost",
+                "X-Title": "ChromaDB Demo"
+            },
+            pool_size=pool_size,
+            timeout=timeout,
+            max_retries=max_retries
+        )
+
+    def _payload(self, prompt: str, stop: Optional[List[str]], stream: bool) -> Dict[str, Any]:
+        payload = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+            "stream": stream
+        }
+        if stop:
+            payload["stop"] = stop
+        return payload
+
+    def complete(self, prompt: str, stop: Optional[List[str]] = None) -> str:
+        """
+        Return the completion of a prompt.
+        """
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+        response = self.transport.post("/chat/completions", json=self._payload(prompt, stop, stream=False))
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"]
+
+    def stream(self, prompt: str, stop: Optional[List[str]] = None) -> CompletionStream:
+        """
+        Start a streamed completion.
+
+        Returns:
+            A CompletionStream that yields text deltas as they arrive.
+        """
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+        started = time.perf_counter()
+        response = self.transport.post("/chat/completions", json=self._payload(prompt, stop, stream=True),
+                                       stream=True, max_retries=self.stream_max_retries)
+        if response.status_code >= 400:
+            # The body of an error response is small; read it so raise_for_status can report it
+            response.content
+            response.raise_for_status()
+        return CompletionStream(response, started)
+
+    def answer_batch(self,
+                     questions: Iterable[str],
+                     retrieve: Callable[[str], Any],
+                     build_prompt: Callable[[str, Any], str],
+                     max_concurrency: int = 8,
+                     on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+        """
+        Answer many questions concurrently.
+
+        Retrieval runs on one background thread in question order, so it overlaps with
+        the generation of earlier answers; at most max_concurrency completions are in
+        flight, further limited by requests_per_second.
+
+        Args:
+            questions: The questions.
+            retrieve: Returns the context for a question, e.g. similarity_search results.
+            build_prompt: Builds the prompt from a question and its retrieved context.
+            max_concurrency: Maximum number of completions in flight.
+            on_result: Called with each result as soon as it is ready, from a worker thread.
+
+        Returns:
+            One dict per question, in input order, with the "question", the "retrieved"
+            context, the "answer" (None on failure), the "error" message (None on success)
+            and the "latency" in seconds from the start of the batch.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1.")
+
+        questions = list(questions)
+        started = time.perf_counter()
+
+        def generate(question: str, retrieval: "Future[Any]") -> Dict[str, Any]:
+            result: Dict[str, Any] = {"question": question, "retrieved": None, "answer": None, "error": None}
+            try:
+                result["retrieved"] = retrieval.result()
+                result["answer"] = self.complete(build_prompt(question, result["retrieved"]))
+            except Exception as e:
+                logger.error(f"Failed to answer {question!r}: {e}")
+                result["error"] = str(e)
+            result["latency"] = time.perf_counter() - started
+            if on_result:
+                on_result(result)
+            return result
+
+        with ThreadPoolExecutor(max_workers=1) as retriever, \
+                ThreadPoolExecutor(max_workers=max_concurrency) as generators:
+            futures = [generators.submit(generate, question, retriever.submit(retrieve, question))
+                       for question in questions]
+            results = [future.result() for future in futures]
+
+        failed = sum(result["error"] is not None for result in results)
+        logger.info(f"Answered {len(results) - failed} of {len(results)} questions "
+                    f"in {time.perf_counter() - started:.2f}s")
+        return results
+
+    def close(self) -> None:
+        """
+        Close all pooled connections.
+        """
+        self.transport.close()
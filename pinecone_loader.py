@@ -0,0 +1,355 @@
+"""
+Pinecone Bulk Loader
+
+This module provides PineconeBulkLoader, which loads records into a Pinecone index as
+fast as the index allows and then waits only as long as needed for them to be visible:
+
+- records are split into batches limited by record count and request size
+- batches from all namespaces are upserted concurrently, with at most max_workers
+  requests in flight, and retried with jittered exponential backoff on throttling
+  and server errors
+- instead of sleeping for a fixed time, describe_index_stats is polled until the
+  expected number of vectors is visible in every namespace, with a timeout; without
+  an expected count, until each count grew by the number of distinct IDs loaded, or
+  grew and then stopped changing for a few seconds, as when some IDs already existed
+- a load with failed batches raises PineconeLoadError, with the failed batches,
+  before any polling
+
+Records for indexes with integrated embedding (with "_id" and the text field) are
+sent with upsert_records; records with "values" are sent with upsert.
+
+Usage:
+    from pinecone import Pinecone
+    from pinecone_loader import PineconeBulkLoader
+
+    index = Pinecone(api_key=os.getenv("PINECONE_API_KEY")).Index("dense-index")
+    loader = PineconeBulkLoader(index, max_workers=8)
+    result = loader.load({"example-namespace": records}, timeout=120)
+    print(result["upserted"], result["wait_s"])
+"""
+
+import json
+import time
+import random
+import logging
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from itertools import chain
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Pinecone request limits: 96 records per upsert_records call with integrated
+# embedding, 1000 vectors per upsert call, and 2 MB per request
+MAX_TEXT_RECORDS = 96
+MAX_VECTORS = 1000
+MAX_REQUEST_BYTES = 2 * 1024 * 1024
+
+# HTTP statuses worth retrying: throttling and transient server errors
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# How long a vector count that grew must stay unchanged before a load counts as visible
+# when some of its IDs already existed
+SETTLE_SECONDS = 5.0
+
+
+def record_size(record: Dict[str, Any]) -> int:
+    """
+    Return the approximate size in bytes of a record in a request body.
+    """
+    return len(json.dumps(record, default=str).encode("utf-8"))
+
+
+def batch_records(records: Iterable[Dict[str, Any]],
+                  max_records: int,
+                  max_bytes: int = MAX_REQUEST_BYTES) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Split records into batches of at most max_records records and max_bytes bytes.
+
+    A single record larger than max_bytes is sent in a batch of its own, for Pinecone
+    to accept or reject.
+    """
+    batch: List[Dict[str, Any]] = []
+    size = 0
+    for record in records:
+        record_bytes = record_size(record)
+        if batch and (len(batch) >= max_records or size + record_bytes > max_bytes):
+            yield batch
+            batch, size = [], 0
+        batch.append(record)
+        size += record_bytes
+    if batch:
+        yield batch
+
+
+def namespace_counts(stats: Any) -> Dict[str, int]:
+    """
+    Return the vector count per namespace from a describe_index_stats response.
+    """
+    namespaces = stats.get("namespaces") if isinstance(stats, dict) else getattr(stats, "namespaces", None)
+    counts = {}
+    for name, summary in (namespaces or {}).items():
+        count = summary.get("vector_count") if isinstance(summary, dict) else getattr(summary, "vector_count", None)
+        counts[name] = int(count or 0)
+    return counts
+
+
+class PineconeLoadError(RuntimeError):
+    """
+    Raised by PineconeBulkLoader.load when batches failed; `result` is the upsert result
+    and `errors` its failed batches.
+    """
+
+    def __init__(self, result: Dict[str, Any]):
+        self.result = result
+        self.errors: List[Dict[str, Any]] = result["errors"]
+        failed = sum(len(error["ids"]) for error in self.errors)
+        super().__init__(f"{len(self.errors)} batches ({failed} records) failed to upsert; "
+                         f"first error: {self.errors[0]['error']}")
+
+
+class PineconeBulkLoader:
+    """
+    Concurrent, retrying batch upserts into a Pinecone index, with readiness polling.
+    """
+
+    def __init__(self,
+                 index: Any,
+                 max_workers: int = 8,
+                 max_retries: int = 5,
+                 backoff_factor: float = 0.5,
+                 max_backoff: float = 20.0,
+                 max_batch_bytes: int = MAX_REQUEST_BYTES):
+        """
+        Initialize the loader.
+
+        Args:
+            index: The Pinecone index, from Pinecone.Index(name).
+            max_workers: Maximum number of upsert requests in flight, across all namespaces.
+            max_retries: Number of retries for a batch that is throttled or fails with a 5xx
+                error or a connection error.
+            backoff_factor: Base delay in seconds for the exponential backoff.
+            max_backoff: Upper bound in seconds for a single backoff delay.
+            max_batch_bytes: Maximum size of one upsert request.
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1.")
+
+        self.index = index
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.max_batch_bytes = max_batch_bytes
+
+    def _batches(self, records_by_namespace: Dict[str, Iterable[Dict[str, Any]]]) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        """
+        Yield (namespace, batch) pairs, alternating between namespaces so they load side by side.
+        """
+        iterators = []
+        for namespace, records in records_by_namespace.items():
+            records = iter(records)
+            first = next(records, None)
+            if first is None:
+                continue
+            # Text records are embedded by Pinecone and have a much lower per-request limit
+            max_records = MAX_VECTORS if "values" in first else MAX_TEXT_RECORDS
+            batches = batch_records(chain([first], records), max_records, self.max_batch_bytes)
+            iterators.append((namespace, batches))
+
+        while iterators:
+            for entry in list(iterators):
+                namespace, batches = entry
+                batch = next(batches, None)
+                if batch is None:
+                    iterators.remove(entry)
+                else:
+                    yield namespace, batch
+
+    def _retryable(self, error: Exception) -> bool:
+        status = getattr(error, "status", None) or getattr(error, "status_code", None)
+        if status is None:
+            # Connection errors and timeouts carry no status; the client raises urllib3's own
+            return isinstance(error, (ConnectionError, TimeoutError, OSError)) or type(error).__module__.startswith("urllib3")
+        return int(status) in RETRY_STATUS_CODES
+
+    def _backoff(self, attempt: int) -> float:
+        """Delay before the next attempt using full jitter."""
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** attempt))
+
+    def _upsert_batch(self, namespace: str, batch: List[Dict[str, Any]]) -> int:
+        """
+        Upsert one batch, retrying throttled and transient failures.
+
+        Returns:
+            The number of records upserted.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                if "values" in batch[0]:
+                    self.index.upsert(vectors=batch, namespace=namespace)
+                else:
+                    self.index.upsert_records(namespace, batch)
+                return len(batch)
+            except Exception as e:
+                if attempt == self.max_retries or not self._retryable(e):
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(f"Upsert of {len(batch)} records into {namespace} failed: {e}. Retrying in {delay:.2f}s")
+                time.sleep(delay)
+
+        # Not reached: the last attempt always returns or raises
+        raise RuntimeError(f"Upsert into {namespace} exhausted all retries")
+
+    def upsert(self, records_by_namespace: Dict[str, Iterable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Upsert records into their namespaces concurrently.
+
+        Records are read lazily, so generators can be passed for large loads.
+
+        Args:
+            records_by_namespace: Records to upsert, keyed by namespace.
+
+        Returns:
+            Dict with the number of records upserted per namespace ("upserted"), the number
+            of distinct IDs among them ("unique"), the failed batches ("errors", each with
+            the "namespace", record "ids" and "error"), the number of "batches" sent and
+            the "duration_s".
+        """
+        start = time.perf_counter()
+        upserted = {namespace: 0 for namespace in records_by_namespace}
+        upserted_ids = {namespace: set() for namespace in records_by_namespace}
+        errors: List[Dict[str, Any]] = []
+        batches = self._batches(records_by_namespace)
+        sent = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = {}
+            exhausted = False
+            while True:
+                # Keep at most max_workers batches in flight, pulling records only when needed
+                while not exhausted and len(pending) < self.max_workers:
+                    item = next(batches, None)
+                    if item is None:
+                        exhausted = True
+                        break
+                    pending[executor.submit(self._upsert_batch, *item)] = item
+                    sent += 1
+
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    namespace, batch = pending.pop(future)
+                    try:
+                        upserted[namespace] += future.result()
+                        upserted_ids[namespace].update(record.get("_id", record.get("id")) for record in batch)
+                    except Exception as e:
+                        logger.error(f"Upsert of {len(batch)} records into {namespace} failed: {e}")
+                        errors.append({
+                            "namespace": namespace,
+                            "ids": [record.get("_id", record.get("id")) for record in batch],
+                            "error": str(e)
+                        })
+
+        duration = time.perf_counter() - start
+        logger.info(f"Upserted {sum(upserted.values())} records in {sent} batches "
+                    f"in {duration:.2f}s ({len(errors)} batches failed)")
+        return {"upserted": upserted, "unique": {namespace: len(ids) for namespace, ids in upserted_ids.items()},
+                "errors": errors, "batches": sent, "duration_s": duration}
+
+    def wait_until_visible(self,
+                           expected: Dict[str, int],
+                           timeout: float = 120.0,
+                           interval: float = 0.5,
+                           max_interval: float = 5.0,
+                           baseline: Optional[Dict[str, int]] = None,
+                           settle: float = SETTLE_SECONDS) -> Dict[str, int]:
+        """
+        Poll describe_index_stats until every namespace has at least the expected vector count.
+
+        The polling interval doubles after each poll, up to max_interval.
+
+        Args:
+            expected: Minimum vector count per namespace.
+            timeout: Maximum time to wait, in seconds.
+            interval: Initial delay between polls, in seconds.
+            max_interval: Maximum delay between polls, in seconds.
+            baseline: Vector count per namespace before the load, when the expected counts
+                assume every loaded ID is new. A namespace whose count rose above its
+                baseline and then did not change for `settle` seconds is also done, since
+                some of the loaded IDs overwrote existing vectors.
+            settle: Seconds a count must stay unchanged to count as settled.
+
+        Returns:
+            The vector count per namespace from the last poll.
+
+        Raises:
+            TimeoutError: If the counts are not reached within the timeout.
+        """
+        deadline = time.monotonic() + timeout
+        last: Dict[str, int] = dict(baseline or {})
+        changed: Dict[str, float] = {}
+        while True:
+            counts = namespace_counts(self.index.describe_index_stats())
+            now = time.monotonic()
+            missing = {}
+            for namespace, count in expected.items():
+                current = counts.get(namespace, 0)
+                if current != last.get(namespace, 0):
+                    last[namespace] = current
+                    changed[namespace] = now
+                if current >= count:
+                    continue
+                if baseline is not None and current > baseline.get(namespace, 0) and now - changed[namespace] >= settle:
+                    continue
+                missing[namespace] = count
+            if not missing:
+                return counts
+
+            remaining = deadline - now
+            if remaining <= 0:
+                raise TimeoutError(
+                    f"Vectors not visible after {timeout}s: " +
+                    ", ".join(f"{namespace} has {counts.get(namespace, 0)}/{count}" for namespace, count in missing.items())
+                )
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 2, max_interval)
+
+    def load(self,
+             records_by_namespace: Dict[str, Iterable[Dict[str, Any]]],
+             timeout: float = 120.0,
+             expected: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+        """
+        Upsert records and wait until they are visible in the index stats.
+
+        Args:
+            records_by_namespace: Records to upsert, keyed by namespace.
+            timeout: Maximum time to wait for the vectors to be visible, in seconds.
+            expected: Vector count to wait for per namespace. By default the loader waits
+                for the count before the load plus the distinct IDs loaded; if some of them
+                already existed, until the count has grown and then stays the same for a
+                few seconds (see wait_until_visible). A load made only of existing IDs
+                never changes the count, so pass `expected` when reloading records.
+
+        Returns:
+            The result of upsert, plus the final vector counts ("counts") and the time spent
+            waiting for them ("wait_s").
+
+        Raises:
+            PineconeLoadError: If any batch failed, before waiting.
+        """
+        baseline = namespace_counts(self.index.describe_index_stats()) if expected is None else None
+        result = self.upsert(records_by_namespace)
+        if result["errors"]:
+            raise PineconeLoadError(result)
+
+        if expected is None:
+            expected = {namespace: baseline.get(namespace, 0) + count
+                        for namespace, count in result["unique"].items() if count}
+
+        start = time.perf_counter()
+        result["counts"] = self.wait_until_visible(expected, timeout, baseline=baseline)
+        result["wait_s"] = time.perf_counter() - start
+        logger.info(f"Records visible after waiting {result['wait_s']:.2f}s")
+        return result
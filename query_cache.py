@@ -0,0 +1,176 @@
+"""
+Query Result Cache
+
+This module provides an in-process cache for GraphQL query results. Entries are
+keyed by collection and query text with its layout whitespace collapsed (string
+literals are kept as they are), expire after a TTL, and are evicted
+in least-recently-used order once the cache exceeds its byte budget. Every entry
+for a collection can be invalidated at once when the collection is written to.
+
+Usage:
+    from query_cache import QueryResultCache
+    from weaviate_client_v4 import WeaviateCloudClient
+
+    cache = QueryResultCache(max_bytes=64 * 1024 * 1024, ttl=60)
+    client = WeaviateCloudClient(cache=cache)
+    client.connect()
+
+    client.query_objects("Article", ["title"])  # network round trip
+    client.query_objects("Article", ["title"])  # served from the cache
+    print(cache.stats())
+"""
+
+import re
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Double-quoted GraphQL string literals, with backslash escapes, and runs of whitespace
+_LITERAL_OR_SPACE = re.compile(r'"(?:[^"\\]|\\.)*"|\s+')
+
+
+class QueryResultCache:
+    """
+    Thread-safe LRU cache with a byte budget and per-entry TTL.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl: float = 60.0):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Maximum total size of the cached results, in bytes of encoded JSON.
+            ttl: Time in seconds after which an entry expires.
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        # key -> (collection, encoded result, expiry time)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[str, bytes, float]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(collection_name: str, query: str) -> Tuple[str, str]:
+        """
+        Build the cache key for a query, ignoring differences in whitespace between tokens.
+
+        Whitespace inside string literals (nearText concepts, hybrid queries, valueText
+        filters) is part of the value and is kept, so such queries never share a key.
+        """
+        normalized = _LITERAL_OR_SPACE.sub(lambda match: match.group() if match.group().startswith('"') else " ", query)
+        return collection_name, normalized.strip()
+
+    def generation(self, collection_name: str) -> int:
+        """
+        Return the write generation of a collection.
+
+        Read it before sending a query and pass it to put(), so a result fetched
+        before an invalidation is not stored after it.
+        """
+        with self._lock:
+            return self._generations.get(collection_name, 0)
+
+    def get(self, collection_name: str, query: str) -> Optional[Any]:
+        """
+        Return the cached result for a query, or None on a miss.
+
+        Each hit returns a fresh copy, so callers can modify the result freely.
+        """
+        key = self.make_key(collection_name, query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[2] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            payload = entry[1]
+        return json.loads(payload)
+
+    def put(self, collection_name: str, query: str, result: Any, generation: Optional[int] = None) -> None:
+        """
+        Store the result of a query.
+
+        Args:
+            collection_name: The collection the query reads from.
+            query: The GraphQL query.
+            result: The JSON-serializable result.
+            generation: The collection generation read before the query was sent. If the
+                collection has been invalidated since, the result is not stored.
+        """
+        payload = json.dumps(result).encode("utf-8")
+        if len(payload) > self.max_bytes:
+            return
+
+        key = self.make_key(collection_name, query)
+        with self._lock:
+            if generation is not None and generation != self._generations.get(collection_name, 0):
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (collection_name, payload, time.monotonic() + self.ttl)
+            self.current_bytes += len(payload)
+
+            while self.current_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, collection_name: str) -> None:
+        """
+        Drop every cached result for a collection.
+        """
+        with self._lock:
+            self._generations[collection_name] = self._generations.get(collection_name, 0) + 1
+            for key in [k for k, entry in self._entries.items() if entry[0] == collection_name]:
+                self._remove(key)
+            self.invalidations += 1
+        logger.debug(f"Invalidated cached results for {collection_name}")
+
+    def clear(self) -> None:
+        """
+        Drop every cached result.
+        """
+        with self._lock:
+            for collection_name in {entry[0] for entry in self._entries.values()}:
+                self._generations[collection_name] = self._generations.get(collection_name, 0) + 1
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the cache counters.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes
+            }
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        """
+        Remove an entry. The caller must hold the lock.
+        """
+        _, payload, _ = self._entries.pop(key)
+        self.current_bytes -= len(payload)
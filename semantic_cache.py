@@ -0,0 +1,276 @@
+"""
+Semantic Answer Cache
+
+This module provides SemanticAnswerCache, a cache of LLM answers keyed by the meaning
+of the question rather than its exact text. A new question is embedded and looked up
+in a small FAISS index of past questions; if a past question is similar enough and
+was answered from the same retrieved sources, its answer is returned without calling
+the LLM.
+
+A miss keeps the question's vector for a while, so put() after a miss does not embed
+the question a second time; callers that already have the vector can pass it to both.
+
+Entries expire after a TTL and the least recently used entries are evicted once the
+cache is full. The cache is saved to a directory (entries.json plus a float32 vector
+file) and loaded again on start.
+
+Usage:
+    from local_embedder import LocalEmbedder
+    from semantic_cache import SemanticAnswerCache
+
+    cache = SemanticAnswerCache(LocalEmbedder(), path=".answer_cache", threshold=0.92)
+    sources = [doc.metadata["source"] for doc in docs]
+    answer = cache.get(question, sources)
+    if answer is None:
+        answer = chain.invoke({"question": question, "context": context})
+        cache.put(question, sources, answer)
+    cache.save()
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+import numpy as np
+import faiss
+from collections import OrderedDict
+from typing import Dict, List, Any, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Vectors of recently missed questions kept for put(), most recent last
+MAX_MISSED_VECTORS = 64
+
+
+class SemanticAnswerCache:
+    """
+    Thread-safe answer cache with nearest-neighbour lookup of similar questions.
+    """
+
+    def __init__(self,
+                 embedder: Any,
+                 path: Optional[str] = None,
+                 threshold: float = 0.92,
+                 max_entries: int = 10000,
+                 ttl: Optional[float] = 24 * 3600,
+                 candidates: int = 5,
+                 autosave_every: int = 20):
+        """
+        Initialize the cache, loading saved entries from `path` if it exists.
+
+        Args:
+            embedder: Embeds the questions. Either an object with encode_many(texts), such as
+                LocalEmbedder, or a LangChain embeddings object with embed_query(text).
+            path: Directory the cache is saved to. If None, the cache is kept in memory only.
+            threshold: Minimum cosine similarity between a question and a cached question.
+            max_entries: Maximum number of cached answers; least recently used ones are evicted.
+            ttl: Time in seconds after which an entry expires. None keeps entries until evicted.
+            candidates: Number of most similar cached questions checked for matching sources.
+            autosave_every: Save after this many new entries. 0 only saves on save().
+        """
+        self.embedder = embedder
+        self.path = path
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.candidates = candidates
+        self.autosave_every = autosave_every
+
+        self._lock = threading.Lock()
+        # entry ID -> {"question", "sources", "answer", "created"}, least recently used first
+        self._entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._vectors: Dict[int, np.ndarray] = {}
+        self._index: Optional[faiss.IndexIDMap2] = None
+        self._next_id = 0
+        self._unsaved = 0
+        self._missed: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if path and os.path.exists(os.path.join(path, "entries.json")):
+            self._load()
+
+    def _embed(self, text: str) -> np.ndarray:
+        if hasattr(self.embedder, "encode_many"):
+            return self._normalize(self.embedder.encode_many([text])[0])
+        return self._normalize(self.embedder.embed_query(text))
+
+    @staticmethod
+    def _normalize(vector: Any) -> np.ndarray:
+        """The vector as a normalized float32 row."""
+        vector = np.asarray(vector, dtype=np.float32).reshape(1, -1)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _remember_miss(self, question: str, vector: np.ndarray) -> None:
+        """Keep the vector of a missed question for put(). The caller must hold the lock."""
+        self._missed[question] = vector
+        self._missed.move_to_end(question)
+        while len(self._missed) > MAX_MISSED_VECTORS:
+            self._missed.popitem(last=False)
+
+    @staticmethod
+    def _source_key(sources: Iterable[Any]) -> List[str]:
+        """The retrieved sources as a sorted list, so their order does not matter."""
+        return sorted(str(source) for source in sources)
+
+    def get(self, question: str, sources: Iterable[Any] = (), vector: Optional[Any] = None) -> Optional[str]:
+        """
+        Return the cached answer to a similar question with the same sources, or None.
+
+        Args:
+            question: The incoming question.
+            sources: Identifiers of the documents retrieved for the question.
+            vector: The question's embedding, if the caller already has it.
+        """
+        vector = self._embed(question) if vector is None else self._normalize(vector)
+        source_key = self._source_key(sources)
+
+        with self._lock:
+            if self._index is None or not self._entries:
+                self.misses += 1
+                self._remember_miss(question, vector)
+                return None
+
+            similarities, ids = self._index.search(vector, min(self.candidates, len(self._entries)))
+            now = time.time()
+            for similarity, entry_id in zip(similarities[0], ids[0]):
+                if entry_id < 0 or similarity < self.threshold:
+                    break
+                entry = self._entries.get(int(entry_id))
+                if entry is None:
+                    continue
+                if self.ttl is not None and entry["created"] + self.ttl < now:
+                    self._remove(int(entry_id))
+                    continue
+                if entry["sources"] == source_key:
+                    self._entries.move_to_end(int(entry_id))
+                    self.hits += 1
+                    logger.debug(f"Answer cache hit for {question!r} (similarity {similarity:.3f})")
+                    return entry["answer"]
+
+            self.misses += 1
+            self._remember_miss(question, vector)
+            return None
+
+    def put(self, question: str, sources: Iterable[Any], answer: str, vector: Optional[Any] = None) -> None:
+        """
+        Cache the answer to a question.
+
+        Args:
+            question: The question.
+            sources: Identifiers of the documents the answer was generated from.
+            answer: The answer.
+            vector: The question's embedding. Defaults to the one kept when get() missed
+                the question, and is only computed if there is none.
+        """
+        if vector is None:
+            with self._lock:
+                vector = self._missed.pop(question, None)
+        vector = self._embed(question) if vector is None else self._normalize(vector)
+        with self._lock:
+            self._add({"question": question, "sources": self._source_key(sources),
+                       "answer": answer, "created": time.time()}, vector)
+            self._unsaved += 1
+            save = self.autosave_every and self._unsaved >= self.autosave_every
+
+        if save:
+            self.save()
+
+    def _add(self, entry: Dict[str, Any], vector: np.ndarray) -> None:
+        """Add an entry and evict the least recently used ones. The caller must hold the lock."""
+        if self._index is None:
+            self._index = faiss.IndexIDMap2(faiss.IndexFlatIP(vector.shape[1]))
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = entry
+        self._vectors[entry_id] = vector[0]
+        self._index.add_with_ids(vector, np.array([entry_id], dtype=np.int64))
+
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _remove(self, entry_id: int) -> None:
+        """Remove an entry. The caller must hold the lock."""
+        self._entries.pop(entry_id, None)
+        self._vectors.pop(entry_id, None)
+        self._index.remove_ids(np.array([entry_id], dtype=np.int64))
+
+    def clear(self) -> None:
+        """
+        Drop every cached answer.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._vectors.clear()
+            self._missed.clear()
+            self._index = None
+
+    def save(self) -> None:
+        """
+        Write the live entries to the cache directory, replacing the previous save.
+        """
+        if not self.path:
+            return
+        os.makedirs(self.path, exist_ok=True)
+
+        with self._lock:
+            now = time.time()
+            live = [(entry_id, entry) for entry_id, entry in self._entries.items()
+                    if self.ttl is None or entry["created"] + self.ttl >= now]
+            vectors = np.stack([self._vectors[entry_id] for entry_id, _ in live]) if live else np.zeros((0, 0), np.float32)
+            self._unsaved = 0
+
+        # Vectors first, entries last: the entries file decides what is loaded
+        vectors_path = os.path.join(self.path, "vectors.f32")
+        with open(f"{vectors_path}.tmp", "wb") as f:
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        os.replace(f"{vectors_path}.tmp", vectors_path)
+
+        entries_path = os.path.join(self.path, "entries.json")
+        with open(f"{entries_path}.tmp", "w") as f:
+            json.dump({"dimensions": int(vectors.shape[1]) if live else 0, "entries": [entry for _, entry in live]}, f)
+        os.replace(f"{entries_path}.tmp", entries_path)
+        logger.info(f"Saved {len(live)} cached answers to {self.path}")
+
+    def _load(self) -> None:
+        """
+        Load saved entries in least-to-most recently used order, skipping expired ones.
+        """
+        with open(os.path.join(self.path, "entries.json")) as f:
+            saved = json.load(f)
+        entries = saved["entries"]
+        if not entries:
+            return
+
+        vectors = np.fromfile(os.path.join(self.path, "vectors.f32"), dtype=np.float32)
+        vectors = vectors.reshape(-1, saved["dimensions"])
+        if len(vectors) != len(entries):
+            logger.warning(f"Answer cache at {self.path} is inconsistent; starting empty")
+            return
+
+        now = time.time()
+        with self._lock:
+            for entry, vector in zip(entries, vectors):
+                if self.ttl is None or entry["created"] + self.ttl >= now:
+                    self._add(entry, vector.reshape(1, -1))
+        logger.info(f"Loaded {len(self._entries)} cached answers from {self.path}")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the cache counters.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries
+            }
@@ -0,0 +1,224 @@
+"""
+Transport Manager
+
+This module provides TransportManager, which decides which transport each operation of
+a client is sent over. WeaviateCloudClient can reach Weaviate over gRPC (SDK queries and
+batch writes), over the SDK's REST calls, or over its own pooled REST transport; the
+manager keeps the fastest one that works in front and keeps broken ones off the hot path.
+
+Each (operation, transport) pair has a circuit breaker. After failure_threshold
+consecutive failures the circuit opens and the transport is skipped for that operation.
+Only failures of the transport itself (connection errors, timeouts, an unavailable
+server) should be recorded: an invalid request fails over every transport, and
+recording it would open circuits of transports that work.
+A health probe can also mark a whole transport down. Open circuits and unhealthy
+transports are never retried by callers: a background thread re-probes them every
+reprobe_interval seconds, and when a probe succeeds, the transport's circuits that have
+been open for at least the cooldown are closed again.
+
+Usage:
+    from transport_manager import TransportManager
+
+    manager = TransportManager(("grpc", "rest"), probe=check_transport, reprobe_interval=30)
+    manager.probe_all()
+    manager.start()
+
+    for transport in manager.route("query_objects"):
+        try:
+            result = send(transport)
+        except (ConnectionError, TimeoutError):
+            manager.record_failure("query_objects", transport)
+            continue
+        manager.record_success("query_objects", transport)
+        break
+
+    manager.stop()
+"""
+
+import time
+import logging
+import threading
+from typing import Dict, List, Any, Callable, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TransportManager:
+    """
+    Thread-safe transport selection with per-operation circuit breakers and re-probing.
+    """
+
+    def __init__(self,
+                 transports: Sequence[str],
+                 probe: Optional[Callable[[str], Optional[bool]]] = None,
+                 failure_threshold: int = 2,
+                 cooldown: float = 30.0,
+                 reprobe_interval: float = 30.0,
+                 unavailable: Sequence[str] = ()):
+        """
+        Initialize the manager.
+
+        Args:
+            transports: Transport names in order of preference, fastest first. The last
+                one is the transport of last resort, used when every other path is down.
+            probe: Called with a transport name; returns True if it is healthy, False if not,
+                or None if health cannot be determined. Exceptions count as unhealthy.
+            failure_threshold: Consecutive failures of an operation that open its circuit.
+            cooldown: Minimum time in seconds a circuit stays open.
+            reprobe_interval: Seconds between background probes of unhealthy transports and
+                transports with open circuits.
+            unavailable: Transports that start out unhealthy, until a probe says otherwise.
+        """
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1.")
+
+        self.transports = tuple(transports)
+        self.probe = probe
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.reprobe_interval = reprobe_interval
+
+        # True, False, or None when unknown; unknown transports are tried
+        self.health: Dict[str, Optional[bool]] = {
+            transport: False if transport in unavailable else None for transport in self.transports
+        }
+        self._failures: Dict[Tuple[str, str], int] = {}
+        # Open circuits and when they were opened
+        self._opened: Dict[Tuple[str, str], float] = {}
+        # Transport that last served each operation
+        self._last: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def route(self, operation: str, transports: Optional[Sequence[str]] = None) -> List[str]:
+        """
+        Return the transports to try for an operation, in order.
+
+        Unhealthy transports and transports whose circuit is open for this operation are
+        left out. If that leaves nothing, only the last candidate is returned, so the
+        operation still gets one attempt over the transport of last resort.
+
+        Args:
+            operation: The operation name.
+            transports: The transports that can serve this operation, in order of preference.
+                Defaults to all transports.
+        """
+        candidates = tuple(transports) if transports else self.transports
+        with self._lock:
+            usable = [transport for transport in candidates
+                      if self.health.get(transport) is not False and (operation, transport) not in self._opened]
+        return usable or [candidates[-1]]
+
+    def record_success(self, operation: str, transport: str) -> None:
+        """
+        Record that an operation succeeded over a transport.
+        """
+        key = (operation, transport)
+        with self._lock:
+            self._last[operation] = transport
+            self._failures.pop(key, None)
+            if self._opened.pop(key, None) is not None:
+                logger.info(f"Circuit for {operation} over {transport} closed")
+
+    def record_failure(self, operation: str, transport: str) -> None:
+        """
+        Record that an operation failed over a transport, opening its circuit at the threshold.
+
+        Only for failures of the transport, not for errors in the request itself.
+        """
+        key = (operation, transport)
+        with self._lock:
+            failures = self._failures[key] = self._failures.get(key, 0) + 1
+            if failures >= self.failure_threshold and key not in self._opened:
+                self._opened[key] = time.monotonic()
+                logger.warning(f"Circuit for {operation} over {transport} opened after {failures} failures")
+
+    def set_health(self, transport: str, healthy: Optional[bool]) -> None:
+        """
+        Set the health of a transport.
+
+        Unless the transport is unhealthy, its circuits that have been open for at least
+        the cooldown are closed, so each gets one more attempt. A transport whose health
+        is unknown is treated the same way, or its circuits would never close.
+        """
+        with self._lock:
+            previous = self.health.get(transport)
+            self.health[transport] = healthy
+            closed = []
+            if healthy is not False:
+                now = time.monotonic()
+                closed = [key for key, opened in self._opened.items()
+                          if key[1] == transport and now - opened >= self.cooldown]
+                for key in closed:
+                    del self._opened[key]
+                    self._failures.pop(key, None)
+
+        if previous is not healthy:
+            logger.info(f"Transport {transport} is {'healthy' if healthy else 'unhealthy' if healthy is False else 'unknown'}")
+        if closed:
+            logger.info(f"Closed {len(closed)} circuits over {transport} after a probe")
+
+    def probe_all(self, transports: Optional[Sequence[str]] = None) -> Dict[str, Optional[bool]]:
+        """
+        Probe transports now and update their health.
+
+        Returns:
+            The health of every transport.
+        """
+        if self.probe is not None:
+            for transport in transports or self.transports:
+                try:
+                    healthy = self.probe(transport)
+                except Exception as e:
+                    logger.debug(f"Probe of {transport} failed: {e}")
+                    healthy = False
+                self.set_health(transport, healthy)
+        with self._lock:
+            return dict(self.health)
+
+    def _needs_probe(self) -> List[str]:
+        """Transports that are unhealthy or have an open circuit."""
+        with self._lock:
+            return [transport for transport in self.transports
+                    if self.health.get(transport) is False or any(key[1] == transport for key in self._opened)]
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.reprobe_interval):
+            stale = self._needs_probe()
+            if stale:
+                self.probe_all(stale)
+
+    def start(self) -> None:
+        """
+        Start re-probing in the background. Does nothing without a probe or if already running.
+        """
+        if self.probe is None or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="transport-reprobe", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop the background re-probing.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def state(self) -> Dict[str, Any]:
+        """
+        Return the transport health, open circuits and the transport that last served each operation.
+        """
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "health": dict(self.health),
+                "open_circuits": [
+                    {"operation": operation, "transport": transport, "open_for": round(now - opened, 3)}
+                    for (operation, transport), opened in self._opened.items()
+                ],
+                "last_transport": dict(self._last)
+            }
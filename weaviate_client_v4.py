@@ -5,6 +5,20 @@ This module provides a client for connecting to Weaviate Cloud using the v4 clie
 It handles the connection to the Weaviate Cloud instance and provides methods for
 common operations.
 
+Reads and batch writes go over gRPC when it is healthy and over REST otherwise. A
+TransportManager probes gRPC at connect time, remembers per operation which transport
+works, and re-probes broken paths in the background instead of on every call. Only
+connection errors, timeouts and unavailable servers count as transport failures; an
+invalid query is raised at once instead of falling back to REST.
+
+Queries and searches accept a `where` filter dict (see metadata_filter), which is
+passed to GraphQL, or converted to an SDK filter for gRPC, so Weaviate filters before
+the vector search instead of the caller over-fetching and filtering afterwards.
+
+hybrid_search() combines BM25 keyword search with vector search on the server, fusing
+the rankings with ranked (reciprocal rank) or relative score fusion; LocalVectorStore
+does the same offline with bm25_index.
+
 Usage:
     from weaviate_client_v4 import WeaviateCloudClient
 
@@ -20,19 +34,439 @@ Usage:
 """
 
 import os
+import re
+import json
+import time
+import uuid
 import logging
-import requests
-from typing import Dict, List, Any, Optional
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import nullcontext
+from itertools import islice
+from typing import Dict, List, Any, Callable, Iterable, Iterator, Optional, Tuple
 from dotenv import load_dotenv
+import requests
 import weaviate
 from weaviate.auth import AuthApiKey
+from weaviate.classes.data import DataObject
+from weaviate.classes.query import Filter, HybridFusion, MetadataQuery
 from weaviate.connect import ConnectionParams
+from weaviate.exceptions import (WeaviateClosedClientError, WeaviateConnectionError, WeaviateGRPCUnavailableError,
+                                 WeaviateRetryError, WeaviateStartUpError, WeaviateTimeoutError)
+
+from bm25_index import FUSION_METHODS
+from client_metrics import ClientMetrics, instrumented
+from metadata_filter import LOGICAL_OPERATORS, filter_property, filter_value
+from query_cache import QueryResultCache
+from transport_manager import TransportManager
+from weaviate_transport import WeaviateRestTransport
 
 # Set up logging
 logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Shared no-op span used when metrics are disabled
+_NO_SPAN = nullcontext()
+
+# Transports, fastest first: SDK calls over gRPC (queries, batch writes), SDK calls
+# over REST (schema and single objects), and this client's own pooled REST transport
+GRPC, SDK, REST = "grpc", "sdk", "rest"
+
+# GraphQL fusionType for each of bm25_index.FUSION_METHODS
+HYBRID_FUSION_TYPES = {"rrf": "rankedFusion", "relative_score": "relativeScoreFusion"}
+
+
+def build_class_definition(name: str, properties: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build the REST API class definition used to create a collection.
+    """
+    # Ensure properties are in the correct format for REST API
+    rest_properties = []
+    for prop in properties:
+        # Make a copy to avoid modifying the original
+        rest_prop = prop.copy()
+        # Ensure dataType is present and in the correct format
+        if "dataType" not in rest_prop:
+            rest_prop["dataType"] = ["text"]  # Default to text
+        rest_properties.append(rest_prop)
+
+    return {
+        "class": name,
+        "properties": rest_properties,
+        "vectorizer": "none"  # Use 'none' as vectorizer since text2vec-contextionary is not available
+    }
+
+
+def build_where_clause(where: Dict[str, Any]) -> str:
+    """
+    Render a `where` filter dict as a GraphQL input object.
+
+    Keys are left unquoted and the operator is rendered as an enum; values are
+    JSON-encoded, which is also valid GraphQL, so quotes in values cannot break the query.
+    """
+    def literal(value: Any, key: Optional[str] = None) -> str:
+        if isinstance(value, dict):
+            return "{" + ", ".join(f"{name}: {literal(item, name)}" for name, item in value.items()) + "}"
+        if key == "operator":
+            if not isinstance(value, str) or not re.fullmatch(r"[A-Za-z]+", value):
+                raise ValueError(f"Invalid filter operator {value!r}")
+            return value
+        if isinstance(value, list):
+            return "[" + ", ".join(literal(item) for item in value) + "]"
+        return json.dumps(value)
+
+    return literal(where)
+
+
+def _where_arg(where: Optional[Dict[str, Any]]) -> str:
+    """The `where` argument of a Get sub-query, with its leading comma, or nothing."""
+    return f", where: {build_where_clause(where)}" if where else ""
+
+
+def build_sdk_filter(where: Optional[Dict[str, Any]]) -> Optional[Any]:
+    """
+    Convert a `where` filter dict into a filter for SDK (gRPC) queries.
+
+    Returns:
+        The SDK filter, or None if the filter cannot be expressed in the SDK, in which
+        case the query should go over GraphQL instead.
+    """
+    if not where:
+        return None
+    operator = where.get("operator")
+    try:
+        if operator in LOGICAL_OPERATORS:
+            operands = [build_sdk_filter(operand) for operand in where.get("operands") or []]
+            if not operands or any(operand is None for operand in operands):
+                return None
+            if operator == "And":
+                return Filter.all_of(operands)
+            if operator == "Or":
+                return Filter.any_of(operands)
+            return Filter.not_(operands[0])
+
+        method = {
+            "Equal": "equal",
+            "NotEqual": "not_equal",
+            "GreaterThan": "greater_than",
+            "GreaterThanEqual": "greater_or_equal",
+            "LessThan": "less_than",
+            "LessThanEqual": "less_or_equal",
+            "Like": "like",
+            "ContainsAny": "contains_any",
+            "ContainsAll": "contains_all",
+            "IsNull": "is_none",
+        }.get(operator)
+        if method is None:
+            return None
+        key, value = filter_value(where)
+        # The SDK infers the value type from the Python type, so dates must be datetimes
+        if key.startswith("valueDate"):
+            parse = lambda text: datetime.fromisoformat(text.replace("Z", "+00:00"))
+            value = [parse(item) for item in value] if isinstance(value, list) else parse(value)
+        return getattr(Filter.by_property(filter_property(where)), method)(value)
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+def build_get_query(collection_name: str,
+                    properties: Optional[List[str]] = None,
+                    limit: int = 10,
+                    where: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Build a GraphQL Get query that returns objects from a collection, optionally filtered.
+    """
+    properties_str = " ".join(properties) if properties else "_additional { id }"
+    return f"""
+    {{
+        Get {{
+            {collection_name}(limit: {limit}{_where_arg(where)}) {{
+                {properties_str}
+            }}
+        }}
+    }}
+    """
+
+
+def build_cursor_query(collection_name: str,
+                       properties: Optional[List[str]] = None,
+                       limit: int = 100,
+                       after: Optional[str] = None,
+                       include_vector: bool = False) -> str:
+    """
+    Build a GraphQL Get query that reads one page of a collection with the `after` cursor.
+
+    The object ID is always requested because the next page starts after the last ID.
+    """
+    additional = "_additional { id vector }" if include_vector else "_additional { id }"
+    properties_str = " ".join((properties or []) + [additional])
+    after_str = f", after: {json.dumps(after)}" if after else ""
+    return f"""
+    {{
+        Get {{
+            {collection_name}(limit: {limit}{after_str}) {{
+                {properties_str}
+            }}
+        }}
+    }}
+    """
+
+
+def build_near_text_query(collection_name: str,
+                          query: str,
+                          properties: Optional[List[str]] = None,
+                          limit: int = 10,
+                          where: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Build a GraphQL Get query that searches a collection with nearText, optionally filtered.
+
+    Each object is returned with its ID and distance under "_additional".
+    """
+    properties_str = " ".join((properties or []) + ["_additional { id distance }"])
+    # json.dumps quotes and escapes the concept so quotes in the query cannot break the GraphQL
+    return f"""
+    {{
+        Get {{
+            {collection_name}(
+                nearText: {{
+                    concepts: [{json.dumps(query)}]
+                }}
+                limit: {limit}{_where_arg(where)}
+            ) {{
+                {properties_str}
+            }}
+        }}
+    }}
+    """
+
+
+def build_hybrid_query(collection_name: str,
+                       query: str,
+                       properties: Optional[List[str]] = None,
+                       limit: int = 10,
+                       alpha: float = 0.5,
+                       fusion: str = "rrf",
+                       where: Optional[Dict[str, Any]] = None,
+                       vector: Optional[Any] = None) -> str:
+    """
+    Build a GraphQL Get query that searches a collection with hybrid (BM25 and vector) search.
+
+    Each object is returned with its ID and fused score under "_additional".
+
+    Raises:
+        ValueError: If fusion is not one of FUSION_METHODS or alpha is not between 0 and 1.
+    """
+    if fusion not in HYBRID_FUSION_TYPES:
+        raise ValueError(f"fusion must be one of {FUSION_METHODS}, got {fusion!r}")
+    if not 0.0 <= alpha <= 1.0:
+        raise ValueError("alpha must be between 0 and 1.")
+    properties_str = " ".join((properties or []) + ["_additional { id score }"])
+    vector_str = ""
+    if vector is not None:
+        values = vector.tolist() if hasattr(vector, "tolist") else list(vector)
+        vector_str = f"\n                    vector: {json.dumps([float(v) for v in values])}"
+    return f"""
+    {{
+        Get {{
+            {collection_name}(
+                hybrid: {{
+                    query: {json.dumps(query)}
+                    alpha: {float(alpha)}
+                    fusionType: {HYBRID_FUSION_TYPES[fusion]}{vector_str}
+                }}
+                limit: {limit}{_where_arg(where)}
+            ) {{
+                {properties_str}
+            }}
+        }}
+    }}
+    """
+
+
+def build_near_vector_clause(collection_name: str,
+                             vector: Any,
+                             properties: Optional[List[str]] = None,
+                             limit: int = 10,
+                             alias: Optional[str] = None,
+                             where: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Build one nearVector sub-query of a GraphQL Get, optionally under an alias and filtered.
+
+    The vector may be a list or a NumPy array. Each object is returned with its ID and its
+    distance and certainty to the query vector under "_additional".
+    """
+    values = vector.tolist() if hasattr(vector, "tolist") else list(vector)
+    properties_str = " ".join((properties or []) + ["_additional { id distance certainty }"])
+    alias_str = f"{alias}: " if alias else ""
+    return f"""
+            {alias_str}{collection_name}(
+                nearVector: {{
+                    vector: {json.dumps([float(v) for v in values])}
+                }}
+                limit: {limit}{_where_arg(where)}
+            ) {{
+                {properties_str}
+            }}"""
+
+
+def build_near_vector_query(collection_name: str,
+                            vectors: List[Any],
+                            properties: Optional[List[str]] = None,
+                            limit: int = 10,
+                            aliased: bool = True,
+                            where: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Build a GraphQL Get query with one nearVector sub-query per vector.
+
+    With aliased=True the sub-queries are named q0, q1, ... so that several of them can
+    share one request and be told apart in the response. The `where` filter applies to
+    every sub-query.
+    """
+    clauses = "".join(
+        build_near_vector_clause(collection_name, vector, properties, limit,
+                                 alias=f"q{i}" if aliased else None, where=where)
+        for i, vector in enumerate(vectors)
+    )
+    return f"""
+    {{
+        Get {{{clauses}
+        }}
+    }}
+    """
+
+
+def build_batch_object(collection_name: str, obj: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert an item passed to insert_objects_batch into a batch API object.
+
+    The item is either a dict of properties, or a dict with a "properties" key and
+    optional "vector" and "id" keys. Objects without an ID get a random UUID.
+    """
+    if isinstance(obj.get("properties"), dict):
+        properties = obj["properties"]
+        vector = obj.get("vector")
+        object_id = obj.get("id")
+    else:
+        properties, vector, object_id = obj, None, None
+
+    batch_object = {
+        "class": collection_name,
+        "id": str(object_id) if object_id else str(uuid.uuid4()),
+        "properties": properties
+    }
+    if vector is not None:
+        # Accept NumPy arrays as well as plain lists
+        batch_object["vector"] = vector.tolist() if hasattr(vector, "tolist") else list(vector)
+    return batch_object
+
+
+def parse_batch_results(batch: List[Dict[str, Any]],
+                        results: List[Dict[str, Any]]) -> Tuple[List[str], Dict[str, str]]:
+    """
+    Match a /v1/batch/objects response to the objects that were sent.
+
+    Returns:
+        Tuple of the IDs that were inserted and a dict mapping the IDs that failed to their error.
+    """
+    results_by_id = {r.get("id"): r for r in results}
+    ids: List[str] = []
+    failures: Dict[str, str] = {}
+
+    for obj in batch:
+        result = results_by_id.get(obj["id"])
+        if result is None:
+            failures[obj["id"]] = "Object missing from batch response"
+            continue
+        object_errors = (result.get("result") or {}).get("errors")
+        if object_errors:
+            messages = [err.get("message", "") for err in object_errors.get("error", [])]
+            failures[obj["id"]] = "; ".join(messages) or "Unknown error"
+        else:
+            ids.append(obj["id"])
+
+    return ids, failures
+
+
+# Substrings of per-object batch errors that can succeed on a retry: timeouts, overload
+# and objects the server dropped. Validation errors (unknown property, wrong type, bad
+# vector length) fail the same way every time and are reported at once.
+TRANSIENT_OBJECT_ERRORS = ("timeout", "timed out", "deadline exceeded", "unavailable", "too many requests",
+                           "resource exhausted", "connection", "temporarily", "try again",
+                           "missing from batch response")
+
+
+def is_transient_object_error(message: str) -> bool:
+    """
+    Return whether a per-object batch error is worth retrying.
+    """
+    message = message.lower()
+    return any(marker in message for marker in TRANSIENT_OBJECT_ERRORS)
+
+
+# Errors of a transport that cannot reach the server, as opposed to errors in the request
+# itself; only these count against the transport's circuit
+TRANSPORT_ERRORS = (WeaviateConnectionError, WeaviateTimeoutError, WeaviateGRPCUnavailableError, WeaviateRetryError,
+                    WeaviateStartUpError, WeaviateClosedClientError, requests.ConnectionError, requests.Timeout,
+                    ConnectionError, TimeoutError)
+
+# gRPC status codes and HTTP statuses of a server that is down or not answering in time
+UNAVAILABLE_GRPC_CODES = ("UNAVAILABLE", "DEADLINE_EXCEEDED")
+UNAVAILABLE_HTTP_STATUSES = (502, 503, 504)
+
+
+def is_transport_error(error: BaseException) -> bool:
+    """
+    Return whether an error means a transport could not reach Weaviate: a connection
+    failure, a timeout or an unavailable server. Errors in the request itself, such as
+    a missing collection or an invalid filter, are not.
+
+    The SDK wraps gRPC errors in WeaviateQueryError, so the causes of an error are checked too.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, TRANSPORT_ERRORS):
+            return True
+        code = getattr(error, "code", None)
+        if callable(code):
+            try:
+                if getattr(code(), "name", None) in UNAVAILABLE_GRPC_CODES:
+                    return True
+            except Exception:
+                pass
+        status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+        if status in UNAVAILABLE_HTTP_STATUSES:
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def sdk_objects_to_graphql(objects: Iterable[Any],
+                           properties: Optional[List[str]],
+                           additional: Tuple[str, ...] = ()) -> List[Dict[str, Any]]:
+    """
+    Convert objects returned by an SDK (gRPC) query to the shape of a GraphQL Get result.
+
+    Without properties an object is returned with only its ID under "_additional", as
+    build_get_query asks for. `additional` lists extra metadata to return under
+    "_additional": "id", "distance", "certainty" and "score".
+    """
+    if not properties and "id" not in additional:
+        additional = ("id",) + additional
+
+    results = []
+    for obj in objects:
+        item = {name: obj.properties.get(name) for name in properties or []}
+        extra = {}
+        for name in additional:
+            extra[name] = str(obj.uuid) if name == "id" else getattr(obj.metadata, name, None)
+        if extra:
+            item["_additional"] = extra
+        results.append(item)
+    return results
+
+
 class WeaviateCloudClient:
     """
     Client for connecting to Weaviate Cloud using the v4 client API.
@@ -42,7 +476,13 @@ class WeaviateCloudClient:
                  url: Optional[str] = None,
                  api_key: Optional[str] = None,
                  openai_api_key: Optional[str] = None,
-                 openrouter_api_key: Optional[str] = None):
+                 openrouter_api_key: Optional[str] = None,
+                 pool_size: int = 10,
+                 timeout: float = 30.0,
+                 max_retries: int = 3,
+                 cache: Optional[QueryResultCache] = None,
+                 metrics: Optional[ClientMetrics] = None,
+                 reprobe_interval: float = 30.0):
         """
         Initialize the Weaviate Cloud client.
 
@@ -51,6 +491,14 @@ class WeaviateCloudClient:
             api_key: The API key for the Weaviate Cloud instance. If None, it will be loaded from the environment.
             openai_api_key: The OpenAI API key for generative search. If None, it will be loaded from the environment.
             openrouter_api_key: The OpenRouter API key for generative search. If None, it will be loaded from the environment.
+            pool_size: Maximum number of keep-alive connections used by the REST API calls.
+            timeout: Timeout in seconds for REST API calls.
+            max_retries: Number of retries for REST API calls that are throttled (429) or fail with a 5xx error.
+            cache: Optional cache for query_objects and search_objects results. Writes through this
+                client invalidate the cached results of the collection they touch.
+            metrics: Optional registry for per-method call, error, fallback and latency metrics.
+            reprobe_interval: Seconds between background health probes of transports that are
+                down or have open circuits.
         """
         # Load environment variables
         load_dotenv()
@@ -79,6 +527,25 @@ class WeaviateCloudClient:
         elif self.openrouter_api_key:
             self.headers["X-OpenAI-Api-Key"] = self.openrouter_api_key
 
+        # Shared pooled transport for all REST API calls
+        self.transport = WeaviateRestTransport(
+            self.url,
+            self.api_key,
+            headers=self.headers,
+            pool_size=pool_size,
+            timeout=timeout,
+            max_retries=max_retries
+        )
+
+        self.cache = cache
+        self.metrics = metrics
+
+        # The SDK transports are unusable until connect() probes them
+        self.transport_manager = TransportManager(
+            (GRPC, SDK, REST), probe=self._probe, cooldown=reprobe_interval,
+            reprobe_interval=reprobe_interval, unavailable=(GRPC, SDK)
+        )
+
         logger.info(f"Initialized Weaviate Cloud client for URL: {self.url}")
 
     def connect(self) -> bool:
@@ -99,18 +566,22 @@ class WeaviateCloudClient:
                 grpc_secure=True  # Use secure gRPC
             )
 
-            # Create the client with skip_init_checks=True to bypass gRPC connection checks
+            # Skip the SDK's init checks, which fail the whole connection when gRPC is blocked;
+            # the transport manager probes gRPC instead and only disables that path
             self.client = weaviate.WeaviateClient(
                 connection_params=self.connection_params,
                 auth_client_secret=self.auth_config,
                 additional_headers=self.headers,
-                skip_init_checks=True  # Skip gRPC connection checks
+                skip_init_checks=True
             )
 
             # Connect to Weaviate
             self.client.connect()
 
-            logger.info(f"Connected to Weaviate Cloud at {self.url}")
+            health = self.transport_manager.probe_all()
+            self.transport_manager.start()
+
+            logger.info(f"Connected to Weaviate Cloud at {self.url} (transport health: {health})")
             return True
         except Exception as e:
             logger.error(f"Failed to connect to Weaviate Cloud: {e}", exc_info=True)
@@ -120,13 +591,16 @@ class WeaviateCloudClient:
         """
         Close the connection to the Weaviate Cloud instance.
         """
+        self.transport_manager.stop()
         if self.client:
             try:
                 self.client.close()
                 logger.info("Closed connection to Weaviate Cloud")
             except Exception as e:
                 logger.error(f"Failed to close connection: {e}", exc_info=True)
+        self.transport.close()
 
+    @instrumented("get_meta_info")
     def get_meta_info(self) -> Dict[str, Any]:
         """
         Get meta information about the Weaviate Cloud instance.
@@ -134,33 +608,29 @@ class WeaviateCloudClient:
         Returns:
             Dict containing meta information.
         """
-        try:
+        def sdk() -> Dict[str, Any]:
             meta_info = self.client.get_meta()
 
             # Convert to dict if it's an object
             if not isinstance(meta_info, dict):
-                meta_info_dict = {
+                return {
                     "version": getattr(meta_info, "version", "Unknown"),
                     "hostname": getattr(meta_info, "hostname", "Unknown")
                 }
-                return meta_info_dict
-
             return meta_info
+
+        def rest() -> Dict[str, Any]:
+            response = self.transport.get("/v1/meta")
+            response.raise_for_status()
+            return response.json()
+
+        try:
+            return self._route("get_meta_info", {SDK: sdk, REST: rest})
         except Exception as e:
             logger.error(f"Failed to get meta information: {e}", exc_info=True)
+            raise
 
-            # Try using REST API directly as fallback
-            try:
-                response = requests.get(
-                    f"https://{self.url}/v1/meta",
-                    headers={"Authorization": f"Bearer {self.api_key}"}
-                )
-                response.raise_for_status()
-                return response.json()
-            except Exception as e2:
-                logger.error(f"Fallback REST API call failed: {e2}", exc_info=True)
-                raise e
-
+    @instrumented("list_collections")
     def list_collections(self) -> List[str]:
         """
         List all collections in the Weaviate Cloud instance.
@@ -168,25 +638,23 @@ class WeaviateCloudClient:
         Returns:
             List of collection names.
         """
-        try:
+        def sdk() -> List[str]:
             collections = self.client.collections.list_all()
-            return [c.name for c in collections]
+            # list_all returns a dict of configs keyed by name in recent SDK versions
+            return list(collections) if isinstance(collections, dict) else [c.name for c in collections]
+
+        def rest() -> List[str]:
+            response = self.transport.get("/v1/schema")
+            response.raise_for_status()
+            return [c["class"] for c in response.json().get("classes", [])]
+
+        try:
+            return self._route("list_collections", {SDK: sdk, REST: rest})
         except Exception as e:
             logger.error(f"Failed to list collections: {e}", exc_info=True)
+            raise
 
-            # Try using REST API directly as fallback
-            try:
-                response = requests.get(
-                    f"https://{self.url}/v1/schema",
-                    headers={"Authorization": f"Bearer {self.api_key}"}
-                )
-                response.raise_for_status()
-                schema = response.json()
-                return [c["class"] for c in schema.get("classes", [])]
-            except Exception as e2:
-                logger.error(f"Fallback REST API call failed: {e2}", exc_info=True)
-                raise e
-
+    @instrumented("create_collection")
     def create_collection(self, name: str, properties: List[Dict[str, Any]]) -> bool:
         """
         Create a new collection in the Weaviate Cloud instance.
@@ -200,34 +668,15 @@ class WeaviateCloudClient:
         """
         # Use REST API directly for collection creation
         try:
-            # Ensure properties are in the correct format for REST API
-            rest_properties = []
-            for prop in properties:
-                # Make a copy to avoid modifying the original
-                rest_prop = prop.copy()
-                # Ensure dataType is present and in the correct format
-                if "dataType" not in rest_prop:
-                    rest_prop["dataType"] = ["text"]  # Default to text
-                rest_properties.append(rest_prop)
-
-            class_obj = {
-                "class": name,
-                "properties": rest_properties,
-                "vectorizer": "none"  # Use 'none' as vectorizer since text2vec-contextionary is not available
-            }
-
-            response = requests.post(
-                f"https://{self.url}/v1/schema",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json=class_obj
-            )
+            class_obj = build_class_definition(name, properties)
 
-            # Log the response for debugging
-            logger.info(f"Response status: {response.status_code}")
-            logger.info(f"Response content: {response.text}")
+            with self._span("create_collection", "network"):
+                response = self.transport.post("/v1/schema", json=class_obj)
+
+            # Response bodies are only logged at DEBUG; formatting them costs time on every call
+            logger.debug(f"Response status: {response.status_code}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Response content: {response.text}")
 
             if response.status_code == 422:
                 # Try with a simpler schema
@@ -238,25 +687,22 @@ class WeaviateCloudClient:
 
                 logger.info(f"Trying with simpler schema: {simple_class_obj}")
 
-                response = requests.post(
-                    f"https://{self.url}/v1/schema",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json=simple_class_obj
-                )
+                with self._span("create_collection", "network"):
+                    response = self.transport.post("/v1/schema", json=simple_class_obj)
 
-                logger.info(f"Simple schema response status: {response.status_code}")
-                logger.info(f"Simple schema response content: {response.text}")
+                logger.debug(f"Simple schema response status: {response.status_code}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Simple schema response content: {response.text}")
 
             response.raise_for_status()
+            self._invalidate(name)
             logger.info(f"Created collection {name} using REST API")
             return True
         except Exception as e:
             logger.error(f"Failed to create collection {name}: {e}", exc_info=True)
             raise
 
+    @instrumented("delete_collection")
     def delete_collection(self, name: str) -> bool:
         """
         Delete a collection from the Weaviate Cloud instance.
@@ -267,26 +713,23 @@ class WeaviateCloudClient:
         Returns:
             True if the collection was deleted successfully.
         """
-        try:
+        def sdk() -> None:
             self.client.collections.delete(name)
+
+        def rest() -> None:
+            response = self.transport.delete(f"/v1/schema/{name}")
+            response.raise_for_status()
+
+        try:
+            self._route("delete_collection", {SDK: sdk, REST: rest})
+            self._invalidate(name)
             logger.info(f"Deleted collection: {name}")
             return True
         except Exception as e:
             logger.error(f"Failed to delete collection {name}: {e}", exc_info=True)
+            raise
 
-            # Try using REST API directly as fallback
-            try:
-                response = requests.delete(
-                    f"https://{self.url}/v1/schema/{name}",
-                    headers={"Authorization": f"Bearer {self.api_key}"}
-                )
-                response.raise_for_status()
-                logger.info(f"Deleted collection using REST API: {name}")
-                return True
-            except Exception as e2:
-                logger.error(f"Fallback REST API call failed: {e2}", exc_info=True)
-                raise e
-
+    @instrumented("insert_object")
     def insert_object(self, collection_name: str, data: Dict[str, Any]) -> str:
         """
         Insert an object into a collection.
@@ -298,37 +741,166 @@ class WeaviateCloudClient:
         Returns:
             The ID of the inserted object.
         """
-        try:
+        # A client-generated ID means a retry, over either transport, cannot create a duplicate
+        object_id = str(uuid.uuid4())
+
+        def sdk() -> str:
             collection = self.client.collections.get(collection_name)
-            result = collection.data.insert(data)
+            return str(collection.data.insert(data, uuid=object_id))
+
+        def rest() -> str:
+            response = self.transport.post(
+                "/v1/objects",
+                json={
+                    "class": collection_name,
+                    "id": object_id,
+                    "properties": data
+                }
+            )
+            response.raise_for_status()
+            return response.json().get("id")
+
+        try:
+            result = self._route("insert_object", {SDK: sdk, REST: rest})
+            self._invalidate(collection_name)
             logger.info(f"Inserted object into {collection_name} with ID: {result}")
             return result
         except Exception as e:
             logger.error(f"Failed to insert object into {collection_name}: {e}", exc_info=True)
+            raise
+
+    @instrumented("insert_objects_batch")
+    def insert_objects_batch(self,
+                             collection_name: str,
+                             objects: Iterable[Dict[str, Any]],
+                             batch_size: int = 100,
+                             workers: int = 4,
+                             max_retries: int = 3) -> Dict[str, Any]:
+        """
+        Insert many objects into a collection using the gRPC or REST batch endpoint.
+
+        Objects are read lazily from the iterable and sent in chunks of batch_size, with at most `workers` requests in flight. Objects that
+        fail transiently are retried on their own, keeping their ID so retries never duplicate data.
+
+        Args:
+            collection_name: The name of the collection.
+            objects: Iterable of objects to insert. Each item is either a dict of properties,
+                or a dict with a "properties" key and optional "vector" and "id" keys.
+            batch_size: Maximum number of objects per batch request.
+            workers: Maximum number of batch requests in flight.
+            max_retries: Number of times an object that failed with a transient error
+                (timeout, overload) is retried. Failed requests are retried by the transport.
+
+        Returns:
+            Dict with the IDs of the inserted objects ("ids") and a list of failures
+            ("errors"), each with the object "id" and the "error" message.
+        """
+        if batch_size < 1 or workers < 1:
+            raise ValueError("batch_size and workers must be at least 1.")
+
+        ids: List[str] = []
+        errors: List[Dict[str, str]] = []
+        iterator = iter(objects)
+        exhausted = False
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = set()
+            while True:
+                # Keep at most `workers` batches in flight, pulling new objects only when needed
+                while not exhausted and len(pending) < workers:
+                    chunk = [build_batch_object(collection_name, obj)
+                             for obj in islice(iterator, batch_size)]
+                    if not chunk:
+                        exhausted = True
+                        break
+                    pending.add(executor.submit(self._send_batch, chunk, max_retries))
+
+                if not pending:
+                    break
+
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch_ids, batch_errors = future.result()
+                    ids.extend(batch_ids)
+                    errors.extend(batch_errors)
+                    if batch_ids:
+                        self._invalidate(collection_name)
+
+        logger.info(f"Batch inserted {len(ids)} objects into {collection_name} ({len(errors)} failed)")
+        return {"ids": ids, "errors": errors}
+
+    @instrumented("batch_request")
+    def _send_batch(self, batch: List[Dict[str, Any]], max_retries: int) -> Tuple[List[str], List[Dict[str, str]]]:
+        """
+        Send one batch over gRPC or to /v1/batch/objects, retrying the objects that failed transiently.
+
+        A failed request is not retried here: the REST transport already retries throttled
+        and 5xx responses, and _route falls back from gRPC to REST. Only objects that the
+        server rejected with a transient error are sent again, up to max_retries times.
+
+        Returns:
+            Tuple of the inserted IDs and the failures left after all retries.
+        """
+        ids: List[str] = []
+        failures: Dict[str, str] = {}
+        remaining = batch
+
+        for attempt in range(max_retries + 1):
+            if attempt:
+                time.sleep(0.5 * 2 ** (attempt - 1))
 
-            # Try using REST API directly as fallback
             try:
-                response = requests.post(
-                    f"https://{self.url}/v1/objects",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "class": collection_name,
-                        "properties": data
-                    }
-                )
-                response.raise_for_status()
-                result = response.json()
-                object_id = result.get("id")
-                logger.info(f"Inserted object using REST API into {collection_name} with ID: {object_id}")
-                return object_id
-            except Exception as e2:
-                logger.error(f"Fallback REST API call failed: {e2}", exc_info=True)
-                raise e
+                inserted, object_failures = self._route("batch_request", {
+                    GRPC: lambda: self._grpc_insert_many(remaining),
+                    REST: lambda: self._rest_insert_many(remaining)
+                })
+            except Exception as e:
+                logger.error(f"Batch request with {len(remaining)} objects failed: {e}")
+                failures.update({obj["id"]: str(e) for obj in remaining})
+                break
+
+            ids.extend(inserted)
+            retryable = {object_id for object_id, error in object_failures.items()
+                         if attempt < max_retries and is_transient_object_error(error)}
+            failures.update({object_id: error for object_id, error in object_failures.items()
+                             if object_id not in retryable})
+            remaining = [obj for obj in remaining if obj["id"] in retryable]
+            if not remaining:
+                break
+            logger.warning(f"{len(remaining)} objects failed transiently in batch "
+                           f"(attempt {attempt + 1}/{max_retries + 1})")
 
-    def query_objects(self, collection_name: str, properties: List[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        return ids, [{"id": object_id, "error": error} for object_id, error in failures.items()]
+
+    def _grpc_insert_many(self, batch: List[Dict[str, Any]]) -> Tuple[List[str], Dict[str, str]]:
+        """
+        Send batch API objects of one collection with the SDK's gRPC insert_many.
+        """
+        collection = self.client.collections.get(batch[0]["class"])
+        with self._span("batch_request", "serialize"):
+            data = [DataObject(properties=obj["properties"], uuid=obj["id"], vector=obj.get("vector"))
+                    for obj in batch]
+        with self._span("batch_request", "network"):
+            result = collection.data.insert_many(data)
+        failures = {batch[index]["id"]: error.message for index, error in result.errors.items()}
+        return [obj["id"] for obj in batch if obj["id"] not in failures], failures
+
+    def _rest_insert_many(self, batch: List[Dict[str, Any]]) -> Tuple[List[str], Dict[str, str]]:
+        """
+        Send batch API objects to /v1/batch/objects.
+        """
+        with self._span("batch_request", "network"):
+            response = self.transport.post("/v1/batch/objects", json={"objects": batch})
+            response.raise_for_status()
+        with self._span("batch_request", "decode"):
+            return parse_batch_results(batch, response.json())
+
+    @instrumented("query_objects")
+    def query_objects(self,
+                      collection_name: str,
+                      properties: List[str] = None,
+                      limit: int = 10,
+                      where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """
         Query objects from a collection.
 
@@ -336,94 +908,425 @@ class WeaviateCloudClient:
             collection_name: The name of the collection.
             properties: List of properties to return. If None, all properties are returned.
             limit: Maximum number of objects to return.
+            where: Filter on properties, e.g. {"path": ["category"], "operator": "Equal",
+                "valueText": "Science"}; see metadata_filter for the supported operators.
 
         Returns:
             List of objects.
         """
-        try:
-            # Try using REST API directly since gRPC is failing
-            url = f"https://{self.url}/v1/graphql"
-
-            # Build the GraphQL query
-            properties_str = " ".join(properties) if properties else "_additional { id }"
-            query = f"""
-            {{
-                Get {{
-                    {collection_name}(limit: {limit}) {{
-                        {properties_str}
-                    }}
-                }}
-            }}
-            """
-
-            response = requests.post(
-                url,
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={"query": query}
-            )
-            response.raise_for_status()
-            result = response.json()
+        sdk_filter = build_sdk_filter(where)
 
-            # Extract the objects from the response
-            objects = result.get("data", {}).get("Get", {}).get(collection_name, [])
+        def grpc() -> List[Dict[str, Any]]:
+            collection = self.client.collections.get(collection_name)
+            response = collection.query.fetch_objects(limit=limit, filters=sdk_filter, return_properties=properties or [])
+            return sdk_objects_to_graphql(response.objects, properties)
+
+        try:
+            # The GraphQL query is built either way; it is also the cache key
+            with self._span("query_objects", "serialize"):
+                query = build_get_query(collection_name, properties, limit, where)
+            # A filter the SDK cannot express is sent over GraphQL only
+            objects = self._run_get_query(collection_name, query, "query_objects",
+                                          grpc if sdk_filter is not None or not where else None)
             logger.info(f"Retrieved {len(objects)} objects from {collection_name}")
             return objects
         except Exception as e:
             logger.error(f"Failed to query objects from {collection_name}: {e}", exc_info=True)
             raise
 
-    def search_objects(self, collection_name: str, query: str, properties: List[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+    def iter_objects(self,
+                     collection_name: str,
+                     properties: List[str] = None,
+                     page_size: int = 100,
+                     include_vector: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over every object in a collection, one page at a time.
+
+        Pages are read with the GraphQL `after` cursor. The next page is fetched in the
+        background while the caller consumes the current one, so at most two pages are
+        held in memory regardless of the collection size.
+
+        Args:
+            collection_name: The name of the collection.
+            properties: List of properties to return. The object ID is always returned
+                under "_additional".
+            page_size: Number of objects fetched per request.
+            include_vector: Whether to return each object's vector under "_additional".
+
+        Yields:
+            Objects from the collection.
+        """
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1.")
+
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            future = executor.submit(self._fetch_page, collection_name, properties, page_size, None, include_vector)
+            total = 0
+            while future is not None:
+                page = future.result()
+
+                # Start fetching the next page before handing this one to the caller
+                future = None
+                if len(page) == page_size:
+                    after = page[-1]["_additional"]["id"]
+                    future = executor.submit(self._fetch_page, collection_name, properties, page_size, after, include_vector)
+
+                total += len(page)
+                yield from page
+
+            logger.info(f"Iterated over {total} objects from {collection_name}")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @instrumented("iter_objects_page")
+    def _fetch_page(self,
+                    collection_name: str,
+                    properties: Optional[List[str]],
+                    page_size: int,
+                    after: Optional[str],
+                    include_vector: bool) -> List[Dict[str, Any]]:
+        """
+        Fetch one page of objects for iter_objects.
+        """
+        query = build_cursor_query(collection_name, properties, page_size, after, include_vector)
+        with self._span("iter_objects_page", "network"):
+            response = self.transport.post("/v1/graphql", json={"query": query})
+            response.raise_for_status()
+        with self._span("iter_objects_page", "decode"):
+            result = response.json()
+
+        # Stopping silently on an error would look like the end of the collection
+        if result.get("errors"):
+            raise RuntimeError(f"Cursor query on {collection_name} failed: {result['errors']}")
+        return result.get("data", {}).get("Get", {}).get(collection_name) or []
+
+    @instrumented("search_objects")
+    def search_objects(self,
+                       collection_name: str,
+                       query: str,
+                       properties: List[str] = None,
+                       limit: int = 10,
+                       where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """
         Search objects in a collection using a text query.
 
         Args:
             collection_name: The name of the collection.
             query: The search query.
-            properties: List of properties to return. If None, all properties are returned.
+            properties: List of properties to return. The ID and distance are always
+                returned under "_additional".
             limit: Maximum number of objects to return.
+            where: Filter on properties. Weaviate applies it before the vector search, so
+                all `limit` results match it, even for rare values.
 
         Returns:
             List of objects.
         """
-        try:
-            # Try using REST API directly since gRPC is failing
-            url = f"https://{self.url}/v1/graphql"
-
-            # Build the GraphQL query
-            properties_str = " ".join(properties) if properties else "_additional { id }"
-            graphql_query = f"""
-            {{
-                Get {{
-                    {collection_name}(
-                        nearText: {{
-                            concepts: ["{query}"]
-                        }}
-                        limit: {limit}
-                    ) {{
-                        {properties_str}
-                    }}
-                }}
-            }}
-            """
-
-            response = requests.post(
-                url,
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={"query": graphql_query}
-            )
-            response.raise_for_status()
-            result = response.json()
+        sdk_filter = build_sdk_filter(where)
 
-            # Extract the objects from the response
-            objects = result.get("data", {}).get("Get", {}).get(collection_name, [])
+        def grpc() -> List[Dict[str, Any]]:
+            collection = self.client.collections.get(collection_name)
+            response = collection.query.near_text(query=query, limit=limit, filters=sdk_filter,
+                                                  return_properties=properties or [],
+                                                  return_metadata=MetadataQuery(distance=True))
+            return sdk_objects_to_graphql(response.objects, properties, ("id", "distance"))
+
+        try:
+            with self._span("search_objects", "serialize"):
+                graphql_query = build_near_text_query(collection_name, query, properties, limit, where)
+            objects = self._run_get_query(collection_name, graphql_query, "search_objects",
+                                          grpc if sdk_filter is not None or not where else None)
             logger.info(f"Search for '{query}' returned {len(objects)} objects from {collection_name}")
             return objects
         except Exception as e:
             logger.error(f"Failed to search objects in {collection_name}: {e}", exc_info=True)
-            raise
\ No newline at end of file
+            raise
+
+    @instrumented("search_by_vector")
+    def search_by_vector(self,
+                         collection_name: str,
+                         vector: Any,
+                         properties: List[str] = None,
+                         limit: int = 10,
+                         where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Search objects in a collection that are nearest to a query vector.
+
+        Unlike search_objects, this works on collections created with "vectorizer": "none",
+        as long as the objects were inserted with vectors.
+
+        Args:
+            collection_name: The name of the collection.
+            vector: The query vector, as a list or a NumPy array.
+            properties: List of properties to return. The ID, distance and certainty are
+                always returned under "_additional".
+            limit: Maximum number of objects to return.
+            where: Filter on properties, applied before the vector search.
+
+        Returns:
+            List of objects, nearest first.
+        """
+        sdk_filter = build_sdk_filter(where)
+
+        def grpc() -> List[Dict[str, Any]]:
+            collection = self.client.collections.get(collection_name)
+            response = collection.query.near_vector(
+                near_vector=[float(v) for v in vector],
+                limit=limit,
+                filters=sdk_filter,
+                return_properties=properties or [],
+                return_metadata=MetadataQuery(distance=True, certainty=True)
+            )
+            return sdk_objects_to_graphql(response.objects, properties, ("id", "distance", "certainty"))
+
+        try:
+            with self._span("search_by_vector", "serialize"):
+                graphql_query = build_near_vector_query(collection_name, [vector], properties, limit,
+                                                        aliased=False, where=where)
+            objects = self._run_get_query(collection_name, graphql_query, "search_by_vector",
+                                          grpc if sdk_filter is not None or not where else None)
+            logger.info(f"Vector search returned {len(objects)} objects from {collection_name}")
+            return objects
+        except Exception as e:
+            logger.error(f"Failed to search objects by vector in {collection_name}: {e}", exc_info=True)
+            raise
+
+    @instrumented("hybrid_search")
+    def hybrid_search(self,
+                      collection_name: str,
+                      query: str,
+                      properties: List[str] = None,
+                      limit: int = 10,
+                      alpha: float = 0.5,
+                      fusion: str = "rrf",
+                      where: Optional[Dict[str, Any]] = None,
+                      vector: Optional[Any] = None) -> List[Dict[str, Any]]:
+        """
+        Search objects by combining a vector search with a BM25 keyword search.
+
+        Weaviate runs both searches and fuses their rankings, so exact matches on rare
+        terms such as model names rank high alongside semantic matches.
+
+        Args:
+            collection_name: The name of the collection.
+            query: The search query.
+            properties: List of properties to return. The ID and fused score are always
+                returned under "_additional".
+            limit: Maximum number of objects to return.
+            alpha: Weight of the vector search, from 0 (keyword only) to 1 (vector only).
+            fusion: "rrf" (ranked fusion) or "relative_score" (relative score fusion).
+            where: Filter on properties, applied to both searches.
+            vector: Query vector, for collections without a vectorizer.
+
+        Returns:
+            List of objects, best first.
+        """
+        sdk_filter = build_sdk_filter(where)
+
+        def grpc() -> List[Dict[str, Any]]:
+            collection = self.client.collections.get(collection_name)
+            response = collection.query.hybrid(
+                query=query,
+                alpha=alpha,
+                vector=None if vector is None else [float(v) for v in vector],
+                fusion_type=HybridFusion.RANKED if fusion == "rrf" else HybridFusion.RELATIVE_SCORE,
+                limit=limit,
+                filters=sdk_filter,
+                return_properties=properties or [],
+                return_metadata=MetadataQuery(score=True)
+            )
+            return sdk_objects_to_graphql(response.objects, properties, ("id", "score"))
+
+        try:
+            with self._span("hybrid_search", "serialize"):
+                graphql_query = build_hybrid_query(collection_name, query, properties, limit,
+                                                   alpha, fusion, where, vector)
+            objects = self._run_get_query(collection_name, graphql_query, "hybrid_search",
+                                          grpc if sdk_filter is not None or not where else None)
+            logger.info(f"Hybrid search for '{query}' returned {len(objects)} objects from {collection_name}")
+            return objects
+        except Exception as e:
+            logger.error(f"Failed to run hybrid search in {collection_name}: {e}", exc_info=True)
+            raise
+
+    @instrumented("search_by_vectors")
+    def search_by_vectors(self,
+                          collection_name: str,
+                          vectors: Iterable[Any],
+                          properties: List[str] = None,
+                          limit: int = 10,
+                          queries_per_request: int = 50,
+                          where: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Run many vector searches with as few round trips as possible.
+
+        The query vectors are sent as aliased sub-queries of a single GraphQL request,
+        up to queries_per_request at a time, and the response is split back per query.
+
+        Args:
+            collection_name: The name of the collection.
+            vectors: The query vectors, as lists or as the rows of a 2-D NumPy array.
+            properties: List of properties to return. The ID, distance and certainty are
+                always returned under "_additional".
+            limit: Maximum number of objects to return per query.
+            queries_per_request: Maximum number of sub-queries per GraphQL request.
+            where: Filter on properties, applied to every query.
+
+        Returns:
+            One list of objects per query vector, in the same order as the vectors.
+
+        Raises:
+            RuntimeError: If a request returns GraphQL errors and no results, e.g. for an
+                unknown collection or an invalid filter.
+        """
+        if queries_per_request < 1:
+            raise ValueError("queries_per_request must be at least 1.")
+
+        results: List[List[Dict[str, Any]]] = []
+        iterator = iter(vectors)
+        try:
+            while True:
+                chunk = list(islice(iterator, queries_per_request))
+                if not chunk:
+                    break
+
+                with self._span("search_by_vectors", "serialize"):
+                    graphql_query = build_near_vector_query(collection_name, chunk, properties, limit, where=where)
+                with self._span("search_by_vectors", "network"):
+                    response = self.transport.post("/v1/graphql", json={"query": graphql_query})
+                    response.raise_for_status()
+                with self._span("search_by_vectors", "decode"):
+                    result = response.json()
+
+                data = (result.get("data") or {}).get("Get")
+                if result.get("errors"):
+                    if data is None or all(data.get(f"q{i}") is None for i in range(len(chunk))):
+                        raise RuntimeError(f"Vector search on {collection_name} failed: {result['errors']}")
+                    logger.error(f"Vector search on {collection_name} returned errors: {result['errors']}")
+                data = data or {}
+                results.extend(data.get(f"q{i}") or [] for i in range(len(chunk)))
+
+            logger.info(f"Ran {len(results)} vector searches on {collection_name}")
+            return results
+        except Exception as e:
+            logger.error(f"Failed to search objects by vectors in {collection_name}: {e}", exc_info=True)
+            raise
+
+    def _run_get_query(self,
+                       collection_name: str,
+                       query: str,
+                       method: str = "graphql",
+                       grpc: Optional[Callable[[], List[Dict[str, Any]]]] = None) -> List[Dict[str, Any]]:
+        """
+        Run a Get query and return the objects, using the result cache if enabled.
+
+        The query goes over gRPC when a grpc callable is given and the transport manager
+        routes it there, and otherwise as GraphQL over REST. The GraphQL query is the
+        cache key either way. The method name labels the spans.
+        """
+        generation = None
+        if self.cache is not None:
+            cached = self.cache.get(collection_name, query)
+            if cached is not None:
+                return cached
+            generation = self.cache.generation(collection_name)
+
+        def rest() -> Tuple[List[Dict[str, Any]], bool]:
+            with self._span(method, "network"):
+                response = self.transport.post("/v1/graphql", json={"query": query})
+                response.raise_for_status()
+            with self._span(method, "decode"):
+                result = response.json()
+            # Extract the objects from the response
+            return result.get("data", {}).get("Get", {}).get(collection_name, []), not result.get("errors")
+
+        attempts = {REST: rest}
+        if grpc is not None:
+            attempts = {GRPC: lambda: (grpc(), True), REST: rest}
+        objects, complete = self._route(method, attempts)
+
+        # Only successful results are cached, never partial results with errors
+        if self.cache is not None and complete:
+            self.cache.put(collection_name, query, objects, generation)
+        return objects
+
+    def _route(self, method: str, attempts: Dict[str, Callable[[], Any]]) -> Any:
+        """
+        Run an operation over the first transport that works, as chosen by the transport manager.
+
+        Only transport errors (see is_transport_error) count against a transport's circuit
+        and fall back to the next transport. Any other error is raised at once, since the
+        request would fail the same way over every transport.
+
+        Args:
+            method: The operation name, used for routing, spans and fallback metrics.
+            attempts: Callable per transport that can serve the operation, in order of preference.
+
+        Returns:
+            The result of the first attempt that succeeded.
+
+        Raises:
+            The first error that is not a transport error, or else the error of the first
+            failed attempt, if every attempt failed.
+        """
+        error = None
+        for transport in self.transport_manager.route(method, tuple(attempts)):
+            if error is not None:
+                self._record_fallback(method)
+            try:
+                with self._span(method, transport):
+                    result = attempts[transport]()
+            except Exception as e:
+                if not is_transport_error(e):
+                    raise
+                self.transport_manager.record_failure(method, transport)
+                logger.warning(f"{method} over {transport} failed: {e}")
+                error = error or e
+                continue
+            self.transport_manager.record_success(method, transport)
+            return result
+        raise error
+
+    def _probe(self, transport: str) -> Optional[bool]:
+        """
+        Check whether a transport works. Used by the transport manager at connect time and to re-probe.
+        """
+        if transport == REST:
+            return self.transport.get("/v1/meta").status_code < 400
+        if self.client is None:
+            return False
+        if transport == SDK:
+            return bool(self.client.is_ready())
+
+        # A one-object read is the cheapest public SDK call that goes over gRPC
+        response = self.transport.get("/v1/schema")
+        response.raise_for_status()
+        classes = response.json().get("classes") or []
+        if not classes:
+            # Nothing to read; gRPC is tried on the first query and judged by its circuit
+            return None
+        self.client.collections.get(classes[0]["class"]).query.fetch_objects(limit=1)
+        return True
+
+    def _invalidate(self, collection_name: str) -> None:
+        """
+        Drop cached query results for a collection after a write.
+        """
+        if self.cache is not None:
+            self.cache.invalidate(collection_name)
+
+    def _span(self, method: str, phase: str):
+        """
+        Return the span for a request phase, or a no-op if metrics are disabled.
+        """
+        if self.metrics is None:
+            return _NO_SPAN
+        return self.metrics.span(method, phase)
+
+    def _record_fallback(self, method: str) -> None:
+        """
+        Count a fallback from a failed transport to the next one.
+        """
+        if self.metrics is not None:
+            self.metrics.record_fallback(method)
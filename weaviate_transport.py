@@ -0,0 +1,149 @@
+"""
+Weaviate REST Transport
+
+This module provides RestTransport, a pooled HTTP transport for JSON APIs with
+bearer-token auth, and WeaviateRestTransport, its use for the Weaviate REST API. A
+single transport keeps warm keep-alive connections to the server, sends the auth
+headers on every request, applies timeouts, and retries throttled (429) and server
+(5xx) responses with jittered exponential backoff. OpenRouterClient uses
+RestTransport directly.
+
+Usage:
+    from weaviate_transport import WeaviateRestTransport
+
+    transport = WeaviateRestTransport("my-cluster.weaviate.network", api_key="...")
+    response = transport.get("/v1/meta")
+    print(response.json()["version"])
+    transport.close()
+"""
+
+import time
+import random
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, Optional, Union, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Status codes that are worth retrying: throttling and transient server errors
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class RestTransport:
+    """
+    Pooled, retrying HTTP transport for a JSON API with bearer-token auth.
+    """
+
+    def __init__(self,
+                 url: str,
+                 api_key: str,
+                 headers: Optional[Dict[str, str]] = None,
+                 pool_size: int = 10,
+                 timeout: Union[float, Tuple[float, float]] = (5.0, 30.0),
+                 max_retries: int = 3,
+                 backoff_factor: float = 0.5,
+                 max_backoff: float = 10.0):
+        """
+        Initialize the transport.
+
+        Args:
+            url: The base URL of the API. Without a scheme, https is used (e.g. "my-cluster.weaviate.network").
+            api_key: The API key sent as a bearer token.
+            headers: Extra headers sent with every request.
+            pool_size: Maximum number of keep-alive connections kept open to the instance.
+            timeout: Request timeout in seconds, or a (connect, read) tuple.
+            max_retries: Number of retries for 429/5xx responses and connection errors.
+            backoff_factor: Base delay in seconds for the exponential backoff.
+            max_backoff: Upper bound in seconds for a single backoff delay.
+        """
+        self.base_url = url if url.startswith(("http://", "https://")) else f"https://{url}"
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+
+        # Retries are handled in request() so they can use jittered backoff
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(headers or {})
+        self.session.headers["Authorization"] = f"Bearer {api_key}"
+
+    def request(self, method: str, path: str, max_retries: Optional[int] = None, **kwargs: Any) -> requests.Response:
+        """
+        Send a request, retrying throttled and transient failures.
+
+        Args:
+            method: The HTTP method.
+            path: The path relative to the base URL (e.g. "/v1/schema").
+            max_retries: Overrides the transport's retry count for this request.
+            **kwargs: Extra arguments passed to requests.Session.request.
+
+        Returns:
+            The response. The caller is responsible for checking the status code.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        url = f"{self.base_url}{path}"
+        max_retries = self.max_retries if max_retries is None else max_retries
+
+        for attempt in range(max_retries + 1):
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(f"{method} {path} failed: {e}. Retrying in {delay:.2f}s")
+                time.sleep(delay)
+                continue
+
+            if response.status_code not in RETRY_STATUS_CODES or attempt == max_retries:
+                return response
+
+            delay = self._backoff(attempt, response.headers.get("Retry-After"))
+            logger.warning(f"{method} {path} returned {response.status_code}. Retrying in {delay:.2f}s")
+            response.close()
+            time.sleep(delay)
+
+        # Not reached: the last attempt always returns or raises
+        raise RuntimeError(f"{method} {path} exhausted all retries")
+
+    def get(self, path: str, **kwargs: Any) -> requests.Response:
+        """Send a GET request."""
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, **kwargs: Any) -> requests.Response:
+        """Send a POST request."""
+        return self.request("POST", path, **kwargs)
+
+    def delete(self, path: str, **kwargs: Any) -> requests.Response:
+        """Send a DELETE request."""
+        return self.request("DELETE", path, **kwargs)
+
+    def close(self) -> None:
+        """
+        Close all pooled connections.
+        """
+        self.session.close()
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        Compute the delay before the next attempt using full jitter.
+
+        A numeric Retry-After header from the server takes precedence.
+        """
+        if retry_after:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** attempt))
+
+
+class WeaviateRestTransport(RestTransport):
+    """
+    Pooled, retrying HTTP transport for the Weaviate REST API.
+    """